@@ -14,8 +14,21 @@ class NetBoxScionConfig(PluginConfig):
     # The default_settings can be empty if you have none
     default_settings = {
         'top_level_menu': True,
+        # Interface ID range used by the free interface ID allocator
+        'interface_id_min': 1,
+        'interface_id_max': 65535,
+        # Seconds a rendered topology.json stays cached (keys change whenever the data does)
+        'topology_cache_timeout': 86400,
+        # Seconds before a change is reported by the changes API (longer than any write transaction)
+        'changes_settle_time': 5,
+        # Seconds tombstones of deleted objects are kept; older changes API cursors are rejected
+        'changes_retention': 2592000,
+        # Seconds the data of the dashboard widgets stays cached
+        'dashboard_cache_timeout': 60,
     }
     required_settings = []
+    # core.ObjectChange, core.events and the events queue used by the bulk changelog
+    min_version = '4.1.0'
     # Set the base URL for the plugin's views
     base_url = 'scion'
     # Wire UI and API URLConfs (module-relative paths per NetBox expectations)
@@ -25,6 +38,13 @@ class NetBoxScionConfig(PluginConfig):
     # Optional settings
     required_settings = []
 
+    def ready(self):
+        super().ready()
+        # Keep the cached link graph in sync with model changes
+        from . import signals  # noqa: F401
+        # Register the dashboard widgets
+        from . import widgets  # noqa: F401
+
 
 # This is REQUIRED. It tells NetBox which class is the configuration entry point.
 config = NetBoxScionConfig
@@ -0,0 +1,79 @@
+import base64
+import json
+
+from django.db.models import Q
+from netbox.api.pagination import OptionalLimitOffsetPagination
+from netbox.config import get_config
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def keyset_condition(fields, values):
+    """
+    Rows sorting after `values` in `fields` order, i.e. (f1, f2, ...) > (v1, v2, ...).
+    The leading `>=` bound lets the database seek on an index over `fields`.
+    """
+    condition = Q(**{f'{fields[-1]}__gt': values[-1]})
+    for field, value in zip(reversed(fields[:-1]), reversed(values[:-1])):
+        condition = Q(**{f'{field}__gt': value}) | (Q(**{field: value}) & condition)
+    return Q(**{f'{fields[0]}__gte': values[0]}) & condition
+
+
+class KeysetPagination(OptionalLimitOffsetPagination):
+    """
+    Limit/offset pagination with an opt-in keyset mode. Passing `cursor`
+    (empty for the first page) orders the results by the view's
+    `keyset_fields`, which must be unique together and indexed, and returns
+    pages that start after the last row of the previous page. Each page costs
+    the same regardless of its depth, and concurrent writes do not shift
+    later pages. `ordering` and `offset` are ignored and no `count` is returned.
+    """
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.fields = view.keyset_fields
+        self.limit = self.get_limit(request) or get_config().PAGINATE_COUNT
+        queryset = queryset.order_by(*self.fields)
+        if cursor := request.query_params[self.cursor_query_param]:
+            queryset = queryset.filter(keyset_condition(self.fields, self.decode_cursor(cursor)))
+
+        results = list(queryset[:self.limit + 1])
+        self.has_next = len(results) > self.limit
+        self.page = results[:self.limit]
+        return self.page
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except ValueError:
+            values = None
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise ValidationError({self.cursor_query_param: ["Invalid cursor"]})
+        return values
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, field) for field in self.fields]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        })
@@ -1,6 +1,16 @@
+from django.db import transaction
 from rest_framework import serializers
 from netbox.api.serializers import NetBoxModelSerializer, WritableNestedSerializer
-from ..models import Organization, ISDAS, SCIONLinkAssignment
+from ..appliances import invalidate_appliance_names
+from ..models import Organization, ISDAS, ISDASLinkSummary, Appliance, SCIONLinkAssignment
+
+
+class ApplianceNamesField(serializers.ListField):
+    """Represents an ISD-AS's appliances as a list of names."""
+    child = serializers.CharField(max_length=255)
+
+    def to_representation(self, value):
+        return [appliance.name for appliance in value.all()]
 
 
 class NestedOrganizationSerializer(WritableNestedSerializer):
@@ -31,15 +41,80 @@ class ISDASSerializer(NetBoxModelSerializer):
         queryset=Organization.objects.all()
     )
     organization_display = serializers.CharField(source='organization.display', read_only=True)
+    appliances = ApplianceNamesField(required=False)
     link_assignments_count = serializers.IntegerField(read_only=True)
+    link_summary = serializers.SerializerMethodField()
 
     class Meta:
         model = ISDAS
         fields = (
-            'id', 'display', 'isd_as', 'description', 'organization', 'organization_display',
-            'appliances', 'comments', 'link_assignments_count', 'created', 'last_updated'
+            'id', 'display', 'isd_as', 'isd', 'asn', 'description', 'organization', 'organization_display',
+            'appliances', 'comments', 'link_assignments_count', 'link_summary', 'created', 'last_updated'
         )
 
+    def get_link_summary(self, obj):
+        """Link counts by status, relationship and appliance name, read from the maintained summary."""
+        try:
+            summary = obj.link_summary
+        except ISDASLinkSummary.DoesNotExist:
+            summary = ISDASLinkSummary()
+        names = {str(appliance.pk): appliance.name for appliance in obj.appliances.all()}
+        return {
+            'links': summary.link_count,
+            'status': {
+                SCIONLinkAssignment.STATUS_ACTIVE: summary.active_count,
+                SCIONLinkAssignment.STATUS_RESERVED: summary.reserved_count,
+                SCIONLinkAssignment.STATUS_PLANNED: summary.planned_count,
+            },
+            'relationship': {
+                SCIONLinkAssignment.RELATIONSHIP_PARENT: summary.parent_count,
+                SCIONLinkAssignment.RELATIONSHIP_CHILD: summary.child_count,
+                SCIONLinkAssignment.RELATIONSHIP_CORE: summary.core_count,
+            },
+            'appliances': {names.get(pk, pk): count for pk, count in summary.appliance_counts.items()},
+        }
+
+    def validate_appliances(self, value):
+        names = []
+        for name in value:
+            name = name.strip()
+            if name and name not in names:
+                names.append(name)
+        if self.instance is not None:
+            in_use = Appliance.objects.filter(isd_as=self.instance, link_assignments__isnull=False).exclude(
+                name__in=names
+            ).values_list('name', flat=True).distinct()
+            if in_use:
+                raise serializers.ValidationError(
+                    f"Cannot remove appliances with link assignments: {', '.join(sorted(in_use))}"
+                )
+        return names
+
+    def _set_appliances(self, instance, names):
+        instance.appliances.exclude(name__in=names).delete()
+        existing = set(instance.appliances.values_list('name', flat=True))
+        Appliance.objects.bulk_create([
+            Appliance(isd_as=instance, name=name) for name in names if name not in existing
+        ])
+        # bulk_create() sends no signals
+        invalidate_appliance_names(instance.pk)
+
+    def create(self, validated_data):
+        names = validated_data.pop('appliances', None)
+        with transaction.atomic():
+            instance = super().create(validated_data)
+            if names is not None:
+                self._set_appliances(instance, names)
+        return instance
+
+    def update(self, instance, validated_data):
+        names = validated_data.pop('appliances', None)
+        with transaction.atomic():
+            if names is not None:
+                self._set_appliances(instance, names)
+            instance = super().update(instance, validated_data)
+        return instance
+
 
 class NestedSCIONLinkAssignmentSerializer(WritableNestedSerializer):
     class Meta:
@@ -52,6 +127,8 @@ class SCIONLinkAssignmentSerializer(NetBoxModelSerializer):
         queryset=ISDAS.objects.all()
     )
     isd_as_display = serializers.CharField(source='isd_as.display', read_only=True)
+    # Appliance is exchanged by name; names are unique per ISD-AS
+    core = serializers.CharField(source='core.name', max_length=255)
     # Placeholder for future external ticket URL if implemented
     ticket_url = serializers.CharField(source='get_ticket_url', read_only=True)
 
@@ -59,6 +136,65 @@ class SCIONLinkAssignmentSerializer(NetBoxModelSerializer):
         model = SCIONLinkAssignment
         fields = (
             'id', 'display', 'isd_as', 'isd_as_display', 'core', 'interface_id',
-            'relationship', 'status', 'peer_name', 'peer', 'local_underlay', 'peer_underlay', 'ticket', 'ticket_url',
-            'comments', 'created', 'last_updated'
+            'relationship', 'status', 'peer_name', 'peer', 'peer_isd_as', 'peer_interface_id',
+            'local_underlay', 'peer_underlay', 'ticket', 'ticket_url', 'comments', 'created', 'last_updated'
         )
+
+    def validate(self, data):
+        core = data.get('core')
+        if isinstance(core, dict):
+            isd_as = data.get('isd_as') or getattr(self.instance, 'isd_as', None)
+            try:
+                data['core'] = Appliance.objects.get(isd_as=isd_as, name=core['name'])
+            except Appliance.DoesNotExist:
+                raise serializers.ValidationError({'core': f"Appliance \"{core['name']}\" not found for this ISD-AS"})
+        return super().validate(data)
+
+
+class SCIONLinkAssignmentBulkItemSerializer(serializers.Serializer):
+    """
+    Query-free field validation for one item of a bulk request. Relations,
+    underlays and uniqueness are validated for the whole batch at once.
+    """
+    id = serializers.IntegerField(required=False)
+    isd_as = serializers.IntegerField()
+    core = serializers.CharField(max_length=255)
+    interface_id = serializers.IntegerField(min_value=0)
+    relationship = serializers.ChoiceField(choices=SCIONLinkAssignment.RELATIONSHIP_CHOICES)
+    status = serializers.ChoiceField(choices=SCIONLinkAssignment.STATUS_CHOICES, default=SCIONLinkAssignment.STATUS_ACTIVE)
+    peer_name = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    peer = serializers.CharField(max_length=255, required=False, allow_blank=True, allow_null=True)
+    local_underlay = serializers.CharField(max_length=300, required=False, allow_blank=True)
+    peer_underlay = serializers.CharField(max_length=300, required=False, allow_blank=True)
+    ticket = serializers.CharField(max_length=512, required=False, allow_blank=True)
+    comments = serializers.CharField(required=False, allow_blank=True)
+
+
+class InterfaceAllocationSerializer(serializers.Serializer):
+    """Parameters for allocating (and optionally reserving) free interface IDs."""
+    isd_as = serializers.PrimaryKeyRelatedField(queryset=ISDAS.objects.all())
+    count = serializers.IntegerField(min_value=1, max_value=1000, default=1)
+    start = serializers.IntegerField(min_value=0, required=False)
+    end = serializers.IntegerField(min_value=0, required=False)
+    # Only used when reserving
+    core = serializers.CharField(max_length=255, required=False)
+    relationship = serializers.ChoiceField(choices=SCIONLinkAssignment.RELATIONSHIP_CHOICES, required=False)
+    peer_name = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    ticket = serializers.CharField(max_length=512, required=False, allow_blank=True)
+    comments = serializers.CharField(required=False, allow_blank=True)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # ISD-ASes the user may not view are reported as not found
+        if request := self.context.get('request'):
+            self.fields['isd_as'].queryset = ISDAS.objects.restrict(request.user, 'view')
+
+    def validate(self, data):
+        if 'start' in data and 'end' in data and data['start'] > data['end']:
+            raise serializers.ValidationError({'end': "Must be greater than or equal to start"})
+        return data
+
+
+class ApplianceRenameSerializer(serializers.Serializer):
+    """New name of an appliance."""
+    name = serializers.CharField(max_length=255)
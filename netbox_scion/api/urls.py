@@ -11,5 +11,8 @@ router.register('isd-ases', views.ISDAViewSet)
 router.register('link-assignments', views.SCIONLinkAssignmentViewSet)
 
 urlpatterns = router.urls + [
+    path('changes/', views.ChangesView.as_view(), name='changes'),
+    # Deprecated, kept for existing clients
     path('isdas-cores/', views.ISDACoreLookupView.as_view(), name='isdas-cores'),
+    path('isd-ases/<int:pk>/appliances/<str:name>/', views.ApplianceView.as_view(), name='appliance'),
 ]
@@ -1,45 +1,526 @@
+import hashlib
+
+from netbox.api.authentication import IsAuthenticatedOrLoginNotRequired
 from netbox.api.viewsets import NetBoxModelViewSet
-from django.db.models import Count
-from django.http import JsonResponse
-from django.views import View
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from utilities.query import count_related
 from .. import filtersets, models
-from .serializers import OrganizationSerializer, ISDASSerializer, SCIONLinkAssignmentSerializer
+from ..appliances import get_appliance_names, remove_appliance, rename_appliance
+from ..bulk import LinkAssignmentBatch
+from ..changes import DEFAULT_LIMIT, MAX_LIMIT, CursorExpired, get_changes
+from ..consistency import CHECKS, check_links
+from ..export import EXPORT_FORMATS, streaming_export
+from ..graph import MAX_SEGMENT_LENGTH, invalidate_graph, link_graph
+from ..search import SCIONLinkAssignmentIndex, reindex
+from ..summary import schedule_summary_refresh
+from ..topology import DEFAULT_STATUSES, render_topology
+from ..changelog import ObjectChangeActionChoices, delete_with_changelog, log_bulk_changes
+from .pagination import KeysetPagination
+from .serializers import (
+    OrganizationSerializer, ISDASSerializer, SCIONLinkAssignmentSerializer, SCIONLinkAssignmentBulkItemSerializer,
+    InterfaceAllocationSerializer, ApplianceRenameSerializer,
+)
 
 
-class ISDACoreLookupView(View):
+class ISDACoreLookupView(APIView):
     """
-    AJAX endpoint to get available cores for a specific ISD-AS
+    Deprecated: appliance names of the ISD-AS `?isdas_id=` as {"cores": [...]}
+    (empty if it does not exist or may not be viewed). Use the `appliances`
+    field of the ISD-AS endpoint instead.
     """
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get_view_name(self):
+        return "ISD-AS Cores (deprecated)"
+
     def get(self, request):
-        isdas_id = request.GET.get('isdas_id')
-        if not isdas_id:
-            return JsonResponse({'cores': []})
-        
+        names = []
+        isdas_id = request.query_params.get('isdas_id', '')
+        if isdas_id.isdigit() and models.ISDAS.objects.restrict(request.user, 'view').filter(pk=isdas_id).exists():
+            names = get_appliance_names([int(isdas_id)])[int(isdas_id)]
+        response = Response({'cores': names})
+        response['Deprecation'] = 'true'
+        return response
+
+
+class StreamingExportMixin:
+    """
+    Adds an `export/` list endpoint streaming all filtered objects as CSV or
+    NDJSON (`?export_format=ndjson`) in constant memory, without pagination.
+    """
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'export_format': [f"Must be one of: {', '.join(EXPORT_FORMATS)}"]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        return streaming_export(queryset, export_format)
+
+
+class ConditionalGetMixin:
+    """
+    Serves list and detail GETs with an ETag and Last-Modified derived from one
+    aggregate query over the filtered queryset (row count and latest
+    `last_updated`, plus `etag_aggregates` covering related rows joined into the
+    representation). Annotations such as related counts are not part of the
+    query; changes to them bump `last_updated` of the object instead. When the
+    client's validators still match, 304 Not Modified is returned without
+    fetching or serializing any object.
+
+    Deleting a row other than the latest changes the count but not the
+    latest `last_updated`, so clients should prefer If-None-Match over
+    If-Modified-Since.
+    """
+    etag_aggregates = {}
+
+    def get_validators(self, request, queryset):
+        # Unreferenced annotations (count_related() subqueries) are left out of the aggregate query
+        state = queryset.order_by().aggregate(
+            count=Count('pk'), last_updated=Max('last_updated'), **self.etag_aggregates
+        )
+        # The representation depends on the requested URL (filters, pagination, brief mode),
+        # the renderer and the user's object permissions
+        key = repr((
+            request.user.pk, request.get_full_path(), request.accepted_renderer.format, sorted(state.items())
+        ))
+        etag = quote_etag(hashlib.sha256(key.encode()).hexdigest()[:32])
+        last_modified = int(state['last_updated'].timestamp()) if state['last_updated'] else None
+        return etag, last_modified
+
+    def conditional_response(self, request, queryset, handler, *args, **kwargs):
+        etag, last_modified = self.get_validators(request, queryset)
+        response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(request, queryset, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
         try:
-            isdas = models.ISDAS.objects.get(id=isdas_id)
-            cores = isdas.cores or []
-            return JsonResponse({'cores': cores})
-        except models.ISDAS.DoesNotExist:
-            return JsonResponse({'cores': []})
+            # Prepares the lookup value like get_object(), so invalid IDs are a 404 as well
+            queryset = self.get_queryset().filter(**{self.lookup_field: lookup})
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound()
+        return self.conditional_response(request, queryset, super().retrieve, *args, **kwargs)
 
 
-class OrganizationViewSet(NetBoxModelViewSet):
-    queryset = models.Organization.objects.prefetch_related('isd_ases').annotate(
-        isd_ases_count=Count('isd_ases')
+class OrganizationViewSet(ConditionalGetMixin, StreamingExportMixin, NetBoxModelViewSet):
+    queryset = models.Organization.objects.annotate(
+        isd_ases_count=count_related(models.ISDAS, 'organization')
     )
     serializer_class = OrganizationSerializer
     filterset_class = filtersets.OrganizationFilterSet
+    pagination_class = KeysetPagination
+    keyset_fields = ('short_name',)
 
 
-class ISDAViewSet(NetBoxModelViewSet):
-    queryset = models.ISDAS.objects.select_related('organization').prefetch_related('link_assignments').annotate(
-        link_assignments_count=Count('link_assignments')
+class ISDAViewSet(ConditionalGetMixin, StreamingExportMixin, NetBoxModelViewSet):
+    queryset = models.ISDAS.objects.select_related('organization', 'link_summary').prefetch_related(
+        'appliances'
+    ).annotate(
+        link_assignments_count=count_related(models.SCIONLinkAssignment, 'isd_as')
     )
+    # Appliance changes are saved through the ISD-AS and update its `last_updated`;
+    # link assignment changes refresh the link summary (and its `last_updated`)
+    etag_aggregates = {
+        'organization_last_updated': Max('organization__last_updated'),
+        'link_summary_last_updated': Max('link_summary__last_updated'),
+    }
     serializer_class = ISDASSerializer
     filterset_class = filtersets.ISDAFilterSet
+    pagination_class = KeysetPagination
+    # Uses the (isd, asn) index; the ID breaks ties between notations of the same AS
+    keyset_fields = ('isd', 'asn', 'pk')
+
+    @action(detail=True, methods=['get'], url_path='topology')
+    def topology(self, request, pk=None):
+        """
+        Render the border router section of this ISD-AS's topology.json, optionally
+        for a single appliance (`?core=<name>`) and other statuses (`?status=`).
+        """
+        isdas = self.get_object()
+        core = None
+        if core_name := request.query_params.get('core'):
+            core = isdas.appliances.filter(name=core_name).first()
+            if core is None:
+                return Response({'core': ["Appliance not found for this ISD-AS"]}, status=status.HTTP_404_NOT_FOUND)
+
+        statuses = tuple(request.query_params.getlist('status')) or DEFAULT_STATUSES
+        valid_statuses = {choice[0] for choice in models.SCIONLinkAssignment.STATUS_CHOICES}
+        if not set(statuses) <= valid_statuses:
+            return Response(
+                {'status': [f"Must be one of: {', '.join(sorted(valid_statuses))}"]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
+        return Response(render_topology(isdas, core=core, statuses=statuses))
 
-class SCIONLinkAssignmentViewSet(NetBoxModelViewSet):
-    queryset = models.SCIONLinkAssignment.objects.select_related('isd_as', 'isd_as__organization')
+    # Link graph queries, answered from the cached in-memory graph
+
+    @action(detail=True, methods=['get'], url_path='neighbors')
+    def neighbors(self, request, pk=None):
+        isdas = self.get_object()
+        with link_graph() as graph:
+            neighbors = graph.neighbors(isdas.pk)
+            return Response({
+                'isd_as': graph.node_data(isdas.pk),
+                'outbound': [graph.link_data(edge) for edge in neighbors['outbound']],
+                'inbound': [graph.link_data(edge) for edge in neighbors['inbound']],
+            })
+
+    @action(detail=True, methods=['get'], url_path='reachability')
+    def reachability(self, request, pk=None):
+        """Core ISD-ASes reachable from this ISD-AS by following PARENT links."""
+        isdas = self.get_object()
+        with link_graph() as graph:
+            cores = sorted(graph.reachable_cores(isdas.pk))
+            return Response({
+                'isd_as': graph.node_data(isdas.pk),
+                'is_core': graph.is_core(isdas.pk),
+                'reachable': bool(cores),
+                'cores': [graph.node_data(node_id) for node_id in cores],
+            })
+
+    @action(detail=True, methods=['get'], url_path='up-segments')
+    def up_segments(self, request, pk=None):
+        """The `k` shortest PARENT chains from this ISD-AS to a core ISD-AS."""
+        try:
+            k = min(max(int(request.query_params.get('k', 3)), 1), 100)
+            max_length = min(max(int(request.query_params.get('max_length', MAX_SEGMENT_LENGTH)), 1), 32)
+        except ValueError:
+            return Response({'detail': "k and max_length must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        isdas = self.get_object()
+        with link_graph() as graph:
+            segments = graph.up_segments(isdas.pk, k=k, max_length=max_length)
+            return Response({
+                'isd_as': graph.node_data(isdas.pk),
+                'segments': [
+                    {'hops': [graph.node_data(node_id) for node_id in hops], 'links': list(links)}
+                    for hops, links in segments
+                ],
+            })
+
+    @action(detail=False, methods=['get'], url_path='core-mesh')
+    def core_mesh(self, request):
+        """CORE connectivity between the core ISD-ASes of ISD `?isd=`."""
+        try:
+            isd = int(request.query_params['isd'])
+        except (KeyError, ValueError):
+            return Response({'isd': ["An integer ISD is required"]}, status=status.HTTP_400_BAD_REQUEST)
+
+        with link_graph() as graph:
+            mesh = graph.core_mesh(isd)
+            return Response({
+                'isd': isd,
+                'cores': [graph.node_data(node_id) for node_id in mesh['cores']],
+                'links': [graph.link_data(edge) for edge in mesh['links']],
+                'components': [[graph.node_data(node_id) for node_id in component] for component in mesh['components']],
+                'fully_meshed': not mesh['missing'],
+                'missing': [[graph.node_data(a), graph.node_data(b)] for a, b in mesh['missing']],
+            })
+
+
+class SCIONLinkAssignmentViewSet(ConditionalGetMixin, StreamingExportMixin, NetBoxModelViewSet):
+    queryset = models.SCIONLinkAssignment.objects.select_related('isd_as', 'isd_as__organization', 'core')
+    etag_aggregates = {
+        'isd_as_last_updated': Max('isd_as__last_updated'),
+    }
     serializer_class = SCIONLinkAssignmentSerializer
     filterset_class = filtersets.SCIONLinkAssignmentFilterSet
+    pagination_class = KeysetPagination
+    # Uses the unique (isd_as, interface_id) index
+    keyset_fields = ('isd_as_id', 'interface_id')
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Create (POST), update (PATCH) or delete (DELETE) many link assignments in a
+        single transaction. All items are validated together; if any item is invalid
+        nothing is written and errors are returned per item, in request order.
+        """
+        if not isinstance(request.data, list):
+            return Response({'detail': "Expected a list of items."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            if request.method == 'DELETE':
+                return self._bulk_delete(request)
+            return self._bulk_write(request, partial=request.method == 'PATCH')
+        except IntegrityError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT)
+
+    @action(detail=False, methods=['get', 'post'], url_path='allocate')
+    def allocate(self, request):
+        """
+        GET: list the next `count` free interface IDs of `isd_as` (optionally within
+        `start`..`end`). POST: additionally reserve them on appliance `core` by creating
+        RESERVED link assignments; the ISD-AS is locked so concurrent calls never collide.
+        """
+        params = InterfaceAllocationSerializer(
+            data=request.data if request.method == 'POST' else request.query_params,
+            context=self.get_serializer_context()
+        )
+        params.is_valid(raise_exception=True)
+        data = dict(params.validated_data)
+        isdas = data.pop('isd_as')
+        count = data.pop('count')
+        start, end = data.pop('start', None), data.pop('end', None)
+
+        if request.method == 'GET':
+            return Response({
+                'isd_as': isdas.pk,
+                'interface_ids': isdas.get_free_interface_ids(count, start=start, end=end),
+            })
+
+        errors = {field: ["This field is required."] for field in ('core', 'relationship') if field not in data}
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        core = isdas.appliances.filter(name=data.pop('core')).first()
+        if core is None:
+            return Response({'core': ["Appliance not found for this ISD-AS"]}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                assignments = isdas.reserve_interface_ids(count, core, data.pop('relationship'), start=start, end=end, **data)
+                # Enforce object-level permissions on the created assignments
+                if self.queryset.filter(pk__in=[a.pk for a in assignments]).count() != len(assignments):
+                    raise PermissionDenied()
+        except ValidationError as e:
+            return Response({'detail': e.messages}, status=status.HTTP_409_CONFLICT)
+
+        serializer = self.get_serializer(assignments, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], url_path='consistency')
+    def consistency(self, request):
+        """
+        Check the (filtered) link assignments against their counterparts on the peer
+        ISD-AS. `?check=` limits the report to specific checks.
+        """
+        checks = request.query_params.getlist('check') or CHECKS
+        unknown = set(checks) - set(CHECKS)
+        if unknown:
+            return Response(
+                {'check': [f"Unknown check(s): {', '.join(sorted(unknown))}"]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(check_links(self.filter_queryset(self.get_queryset()), checks))
+
+    def _bulk_write(self, request, partial):
+        item_serializer = SCIONLinkAssignmentBulkItemSerializer(data=request.data, many=True, partial=partial)
+        if not item_serializer.is_valid():
+            return Response({'errors': item_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        rows = [dict(row) for row in item_serializer.validated_data]
+
+        instances = None
+        if partial:
+            # Updates: fetch every target (restricted to permitted objects) in one query
+            ids = [row.pop('id', None) for row in rows]
+            existing = self.queryset.select_related('isd_as', 'core').prefetch_related('tags').in_bulk(
+                [pk for pk in ids if pk is not None]
+            )
+            errors = []
+            seen = set()
+            for pk in ids:
+                if pk is None:
+                    errors.append({'id': ["This field is required."]})
+                elif pk not in existing:
+                    errors.append({'id': ["Link assignment not found"]})
+                elif pk in seen:
+                    errors.append({'id': ["Duplicated in this request"]})
+                else:
+                    errors.append({})
+                seen.add(pk)
+            if any(errors):
+                return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+            instances = [existing[pk] for pk in ids]
+            for instance in instances:
+                instance.snapshot()
+            # Summaries of ISD-ASes assignments move away from are refreshed too
+            isdas_ids = {instance.isd_as_id for instance in instances}
+        else:
+            for row in rows:
+                row.pop('id', None)
+            isdas_ids = set()
+
+        batch = LinkAssignmentBatch(rows, instances=instances)
+        if not batch.validate():
+            return Response({'errors': batch.errors}, status=status.HTTP_400_BAD_REQUEST)
+        objects = batch.objects
+
+        with transaction.atomic():
+            if partial:
+                now = timezone.now()
+                fields = {field for row in rows for field in row} | {'last_updated'}
+                if 'isd_as' in fields:
+                    # The appliance is re-resolved when an assignment moves to another ISD-AS
+                    fields.add('core')
+                if 'peer' in fields:
+                    fields |= {'peer_isd_as', 'peer_interface_id'}
+                if 'local_underlay' in fields:
+                    fields |= {'local_underlay_ip', 'local_underlay_port'}
+                if 'peer_underlay' in fields:
+                    fields |= {'peer_underlay_ip', 'peer_underlay_port'}
+                for obj in objects:
+                    obj.last_updated = now
+                models.SCIONLinkAssignment.objects.bulk_update(objects, fields)
+                change_action = ObjectChangeActionChoices.ACTION_UPDATE
+            else:
+                models.SCIONLinkAssignment.objects.bulk_create(objects)
+                change_action = ObjectChangeActionChoices.ACTION_CREATE
+
+            # Enforce object-level permissions on the resulting objects
+            if self.queryset.filter(pk__in=[obj.pk for obj in objects]).count() != len(objects):
+                raise PermissionDenied()
+
+            log_bulk_changes(objects, change_action, request)
+            # bulk_create()/bulk_update() send no signals
+            invalidate_graph()
+            schedule_summary_refresh(*isdas_ids, *(obj.isd_as_id for obj in objects))
+            reindex(SCIONLinkAssignmentIndex, models.SCIONLinkAssignment.objects.select_related('core').filter(
+                pk__in=[obj.pk for obj in objects]
+            ))
+
+        serializer = self.get_serializer(objects, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK if partial else status.HTTP_201_CREATED)
+
+    def _bulk_delete(self, request):
+        ids = [item.get('id') if isinstance(item, dict) else item for item in request.data]
+        if not all(isinstance(pk, int) for pk in ids):
+            return Response({'detail': "Expected a list of IDs."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Restricted to permitted objects
+        objects = list(self.queryset.filter(pk__in=ids))
+        found = {obj.pk for obj in objects}
+        errors = [{} if pk in found else {'id': ["Link assignment not found"]} for pk in ids]
+        if any(errors):
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        delete_with_changelog(objects, request)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ChangesView(APIView):
+    """
+    Delta sync: organizations, ISD-ASes and link assignments created, updated
+    or deleted after `?since=<cursor>`, oldest first, at most `?limit=` per page.
+    """
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+    viewsets = (OrganizationViewSet, ISDAViewSet, SCIONLinkAssignmentViewSet)
+
+    def get_view_name(self):
+        return "Changes"
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except ValueError:
+            return Response({'limit': ["Must be an integer"]}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Only models the user may view; objects are restricted by object permissions as well
+        querysets = {}
+        serializers = {}
+        for viewset in self.viewsets:
+            model = viewset.queryset.model
+            if request.user.has_perm(f'{model._meta.app_label}.view_{model._meta.model_name}'):
+                querysets[model] = viewset.queryset.restrict(request.user, 'view')
+                serializers[model] = viewset.serializer_class
+
+        try:
+            changes, cursor, has_more = get_changes(querysets, since=request.query_params.get('since'), limit=limit)
+        except CursorExpired as e:
+            return Response({'since': [str(e)]}, status=status.HTTP_410_GONE)
+        except ValueError as e:
+            return Response({'since': [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = {}
+        for model, serializer_class in serializers.items():
+            objects = [change.object for change in changes if change.model is model and change.object is not None]
+            if objects:
+                serializer = serializer_class(objects, many=True, context={'request': request})
+                data[model] = {obj['id']: obj for obj in serializer.data}
+
+        results = [
+            {
+                'object_type': f'{change.model._meta.app_label}.{change.model._meta.model_name}',
+                'id': change.object_id,
+                'action': 'upsert' if change.object is not None else 'delete',
+                'time': change.time,
+                'data': data[change.model][change.object_id] if change.object is not None else None,
+            }
+            for change in changes
+        ]
+        return Response({'changes': results, 'next': cursor, 'has_more': has_more})
+
+
+class ApplianceView(APIView):
+    """
+    Rename (PATCH `{"name": ...}`) or remove (DELETE) an appliance of an ISD-AS
+    in one transaction. Removing an appliance deletes its link assignments.
+    """
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get_view_name(self):
+        return "Appliance"
+
+    def _get_isdas(self, request, pk):
+        # Appliances are part of their ISD-AS: changing them requires permission to change it
+        return get_object_or_404(models.ISDAS.objects.restrict(request.user, 'change'), pk=pk)
+
+    def patch(self, request, pk, name):
+        isdas = self._get_isdas(request, pk)
+        serializer = ApplianceRenameSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            appliance = rename_appliance(isdas, name, serializer.validated_data['name'])
+        except models.Appliance.DoesNotExist:
+            return Response({'detail': "Appliance not found for this ISD-AS"}, status=status.HTTP_404_NOT_FOUND)
+        except ValidationError as e:
+            return Response(e.message_dict, status=status.HTTP_409_CONFLICT)
+        return Response({
+            'id': appliance.pk,
+            'isd_as': isdas.pk,
+            'name': appliance.name,
+            'link_assignments_count': appliance.link_assignments.count(),
+        })
+
+    def delete(self, request, pk, name):
+        isdas = self._get_isdas(request, pk)
+        appliance = isdas.appliances.filter(name=name).first()
+        if appliance is None:
+            return Response({'detail': "Appliance not found for this ISD-AS"}, status=status.HTTP_404_NOT_FOUND)
+        # The cascade must only delete link assignments the user may delete
+        assignments = appliance.link_assignments.all()
+        if assignments.restrict(request.user, 'delete').count() != assignments.count():
+            raise PermissionDenied()
+        try:
+            deleted = remove_appliance(isdas, name)
+        except models.Appliance.DoesNotExist:
+            return Response({'detail': "Appliance not found for this ISD-AS"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'deleted_link_assignments': deleted})
@@ -0,0 +1,99 @@
+"""
+Appliance names per ISD-AS and appliance rename/removal.
+
+Cached names back the appliance dropdown of the link assignment form. Entries
+are kept until the appliances of the ISD-AS change: model signals cover saves
+and deletions, bulk code paths call `invalidate_appliance_names()` themselves.
+
+`rename_appliance()` and `remove_appliance()` change an appliance and its link
+assignments in one transaction with a lock on the ISD-AS, using one statement
+for all assignments of the appliance.
+"""
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .changelog import delete_with_changelog
+from .models import ISDAS, Appliance, SCIONLinkAssignment
+from .search import reindex_link_assignments
+
+CACHE_PREFIX = 'netbox_scion:appliances'
+CACHE_TIMEOUT = 86400
+
+
+def _cache_key(isdas_id):
+    return f'{CACHE_PREFIX}:{isdas_id}'
+
+
+def get_appliance_names(isdas_ids):
+    """Return {ISD-AS ID: [appliance names]} for `isdas_ids`, querying only the ISD-ASes not cached."""
+    keys = {_cache_key(isdas_id): isdas_id for isdas_id in isdas_ids}
+    names = {keys[key]: value for key, value in cache.get_many(keys).items()}
+
+    missing = [isdas_id for isdas_id in isdas_ids if isdas_id not in names]
+    if missing:
+        fetched = defaultdict(list)
+        for isdas_id, name in Appliance.objects.filter(isd_as_id__in=missing).order_by('name').values_list(
+            'isd_as_id', 'name'
+        ):
+            fetched[isdas_id].append(name)
+        # Unknown IDs are cached as empty too; creating an appliance invalidates them
+        fetched = {isdas_id: fetched[isdas_id] for isdas_id in missing}
+        cache.set_many({_cache_key(isdas_id): value for isdas_id, value in fetched.items()}, CACHE_TIMEOUT)
+        names.update(fetched)
+
+    return {isdas_id: names[isdas_id] for isdas_id in isdas_ids}
+
+
+def invalidate_appliance_names(*isdas_ids):
+    """Drop the cached names of `isdas_ids` once the current transaction commits."""
+    keys = [_cache_key(isdas_id) for isdas_id in isdas_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def rename_appliance(isdas, name, new_name):
+    """
+    Rename appliance `name` of `isdas` to `new_name` and return it. Assignments
+    reference the appliance by ID, so they only get their `last_updated` bumped
+    (their API representation carries the name) with one UPDATE and are
+    re-indexed for search. The rename is recorded in the ISD-AS changelog.
+    Raises Appliance.DoesNotExist, or ValidationError if `new_name` is taken.
+    """
+    with transaction.atomic():
+        isdas = ISDAS.objects.select_for_update().get(pk=isdas.pk)
+        appliance = isdas.appliances.get(name=name)
+        if new_name == name:
+            return appliance
+        if isdas.appliances.filter(name=new_name).exists():
+            raise ValidationError({'name': f'Appliance "{new_name}" already exists.'})
+
+        isdas.snapshot()
+        Appliance.objects.filter(pk=appliance.pk).update(name=new_name)
+        appliance.name = new_name
+        SCIONLinkAssignment.objects.filter(core=appliance).update(last_updated=timezone.now())
+        isdas.save()
+        reindex_link_assignments(appliance)
+        # update() sends no signals
+        invalidate_appliance_names(isdas.pk)
+    return appliance
+
+
+def remove_appliance(isdas, name):
+    """
+    Remove appliance `name` of `isdas` together with its link assignments and
+    return the number of assignments deleted. The deletions are recorded with
+    one bulk changelog INSERT and the removal in the ISD-AS changelog.
+    Raises Appliance.DoesNotExist.
+    """
+    with transaction.atomic():
+        isdas = ISDAS.objects.select_for_update().get(pk=isdas.pk)
+        appliance = isdas.appliances.get(name=name)
+
+        isdas.snapshot()
+        # The appliance's link assignments are deleted and logged in bulk with it
+        _, deleted = delete_with_changelog([appliance])
+        isdas.save()
+    return deleted.get(SCIONLinkAssignment._meta.label, 0)
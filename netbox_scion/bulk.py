@@ -0,0 +1,175 @@
+"""
+Batch validation of SCION link assignments.
+
+Validates many assignments at once with a fixed number of queries: ISD-ASes,
+appliances and peer ISD-ASes are resolved in one query each, and uniqueness
+of `interface_id`, `peer` and the local underlay endpoint is checked with a
+single query per ISD-AS instead of running `full_clean()` per row.
+"""
+from collections import defaultdict
+
+from django.db.models import Q
+
+from .models import ISDAS, Appliance, SCIONLinkAssignment
+from .utils import parse_underlay
+
+# Fields that can be set through batch operations (`core` is the appliance name)
+ASSIGNMENT_FIELDS = (
+    'isd_as', 'core', 'interface_id', 'relationship', 'status', 'peer_name', 'peer',
+    'local_underlay', 'peer_underlay', 'ticket', 'comments',
+)
+
+
+class LinkAssignmentBatch:
+    """
+    Validate a batch of link assignment rows.
+
+    Each row is a dict of already type-checked values using the API
+    representation: `isd_as` is the ISD-AS ID and `core` the appliance name.
+    Pass `instances` (aligned with `rows`) to validate updates of existing
+    assignments; rows then only need to contain the fields being changed.
+    ISD-ASes given in `isdases` ({pk: ISDAS}) are not fetched again.
+
+    After `validate()`, `objects` holds the unsaved/modified instances and
+    `errors` a dict of field errors per row (empty when the row is valid).
+    """
+
+    def __init__(self, rows, instances=None, isdases=None):
+        self.rows = rows
+        self.instances = instances
+        # ISD-ASes already fetched by the caller ({pk: ISDAS}), e.g. by earlier batches of an import
+        self.known_isdases = isdases or {}
+        self.objects = []
+        self.errors = [{} for _ in rows]
+
+    @property
+    def is_valid(self):
+        return not any(self.errors)
+
+    def _add_error(self, index, field, message):
+        self.errors[index].setdefault(field, []).append(message)
+
+    def validate(self):
+        isdases, appliances = self._resolve_related()
+
+        for index, row in enumerate(self.rows):
+            instance = self.instances[index] if self.instances is not None else SCIONLinkAssignment()
+            self.objects.append(instance)
+            self._apply_row(index, row, instance, isdases, appliances)
+
+        self._check_uniqueness()
+        # bulk_create()/bulk_update() bypass save(), which keeps the structured peer in sync
+        SCIONLinkAssignment.resolve_peers(self.objects)
+        return self.is_valid
+
+    def _resolve_related(self):
+        """Fetch all referenced ISD-ASes and their appliances with one query each."""
+        isd_as_ids = {row['isd_as'] for row in self.rows if row.get('isd_as') is not None}
+        if self.instances is not None:
+            isd_as_ids.update(instance.isd_as_id for instance in self.instances)
+        isdases = {pk: self.known_isdases[pk] for pk in isd_as_ids if pk in self.known_isdases}
+        isdases.update(ISDAS.objects.in_bulk(isd_as_ids - isdases.keys()))
+        appliances = {
+            (appliance.isd_as_id, appliance.name): appliance
+            for appliance in Appliance.objects.filter(isd_as_id__in=isd_as_ids)
+        }
+        return isdases, appliances
+
+    def _apply_row(self, index, row, instance, isdases, appliances):
+        for field in ASSIGNMENT_FIELDS:
+            if field in row and field not in ('isd_as', 'core'):
+                setattr(instance, field, row[field])
+        # bulk_create()/bulk_update() bypass save(), which keeps the parsed endpoints in sync
+        instance.set_underlay_endpoints()
+
+        # ISD-AS
+        isd_as_id = row.get('isd_as', instance.isd_as_id)
+        if isd_as_id not in isdases:
+            self._add_error(index, 'isd_as', f'ISD-AS {isd_as_id} not found')
+            return
+        instance.isd_as = isdases[isd_as_id]
+
+        # Appliance (must belong to the ISD-AS)
+        if 'core' in row or 'isd_as' in row:
+            core_name = row.get('core') or (instance.core.name if instance.core_id else None)
+            appliance = appliances.get((isd_as_id, core_name))
+            if appliance is None:
+                self._add_error(index, 'core', f'Appliance "{core_name}" not found for ISD-AS {instance.isd_as}')
+            else:
+                instance.core = appliance
+
+        # Normalize as the model form does
+        if isinstance(instance.peer, str):
+            instance.peer = instance.peer.strip() or None
+        if isinstance(instance.ticket, str):
+            instance.ticket = instance.ticket.strip()
+
+        for field in ('local_underlay', 'peer_underlay'):
+            value = getattr(instance, field) or ''
+            if value:
+                try:
+                    parse_underlay(value)
+                except ValueError as e:
+                    self._add_error(index, field, str(e))
+
+    def _check_uniqueness(self):
+        """
+        Check uniqueness of `interface_id` and `peer` per ISD-AS and of the local
+        underlay endpoint per appliance, within the batch and against the database.
+        """
+        by_isdas = defaultdict(list)
+        for index, obj in enumerate(self.objects):
+            if obj.isd_as_id is not None:
+                by_isdas[obj.isd_as_id].append(index)
+
+        batch_pks = [obj.pk for obj in self.objects if obj.pk]
+        for isd_as_id, indexes in by_isdas.items():
+            interface_ids = {}
+            peers = {}
+            endpoints = {}
+            for index in indexes:
+                obj = self.objects[index]
+                if obj.interface_id in interface_ids:
+                    self._add_error(index, 'interface_id', f'Interface ID {obj.interface_id} is duplicated in this batch')
+                interface_ids.setdefault(obj.interface_id, index)
+                if obj.peer:
+                    if obj.peer in peers:
+                        self._add_error(index, 'peer', f'Peer {obj.peer} is duplicated in this batch')
+                    peers.setdefault(obj.peer, index)
+                if obj.core_id and obj.local_underlay_ip is not None:
+                    endpoint = (obj.core_id, str(obj.local_underlay_ip), obj.local_underlay_port)
+                    if endpoint in endpoints:
+                        self._add_error(
+                            index, 'local_underlay',
+                            f'Underlay endpoint {obj.local_underlay} is duplicated on this appliance in this batch'
+                        )
+                    endpoints.setdefault(endpoint, index)
+
+            # One query per ISD-AS for rows outside of this batch
+            conditions = Q(interface_id__in=interface_ids) | Q(peer__in=peers)
+            if endpoints:
+                # Superset of the endpoints, narrowed down below
+                conditions |= Q(
+                    core_id__in={core_id for core_id, _, _ in endpoints},
+                    local_underlay_ip__in={ip for _, ip, _ in endpoints},
+                    local_underlay_port__in={port for _, _, port in endpoints},
+                )
+            existing = SCIONLinkAssignment.objects.filter(isd_as_id=isd_as_id).filter(conditions).exclude(
+                pk__in=batch_pks
+            ).values_list('interface_id', 'peer', 'core_id', 'local_underlay_ip', 'local_underlay_port')
+            for interface_id, peer, core_id, ip, port in existing:
+                if interface_id in interface_ids:
+                    self._add_error(
+                        interface_ids[interface_id], 'interface_id',
+                        f'Interface ID {interface_id} is already assigned in this ISD-AS'
+                    )
+                if peer and peer in peers:
+                    self._add_error(peers[peer], 'peer', f'Peer {peer} is already assigned in this ISD-AS')
+                if ip is not None:
+                    endpoint = (core_id, str(ip.ip), port)
+                    if endpoint in endpoints:
+                        self._add_error(
+                            endpoints[endpoint], 'local_underlay',
+                            f'Underlay endpoint {self.objects[endpoints[endpoint]].local_underlay} '
+                            f'is already used on this appliance'
+                        )
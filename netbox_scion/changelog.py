@@ -0,0 +1,152 @@
+"""
+Change logging for bulk operations on plugin models.
+
+NetBox records one ObjectChange per object from its model signal handlers.
+Bulk code paths (bulk_create/bulk_update) bypass those signals, so they
+record their changes here with a single bulk INSERT instead. Deletions, which
+cascade from organizations to ISD-ASes to link assignments, go through
+`delete_with_changelog()` for the same reason.
+
+NetBox's signal handlers skip objects deleted outside of a request context,
+which is how per-object change logging is suppressed; they also enqueue the
+object for event rules (webhooks, scripts), so `delete_with_changelog()`
+enqueues the deleted objects itself.
+"""
+from contextlib import contextmanager
+
+from core.choices import ObjectChangeActionChoices
+from core.events import OBJECT_DELETED
+from core.models import ObjectChange
+from django.db import router, transaction
+from django.db.models import prefetch_related_objects
+from django.db.models.deletion import Collector
+from extras.events import enqueue_event
+from netbox.context import current_request, events_queue
+
+__all__ = (
+    'ObjectChangeActionChoices',
+    'change_logging_suppressed',
+    'delete_with_changelog',
+    'enqueue_deleted',
+    'log_bulk_changes',
+)
+
+
+def log_bulk_changes(instances, action, request=None):
+    """
+    Record an ObjectChange for each of `instances` using one bulk INSERT.
+    For updates and deletions, call `snapshot()` on each instance before
+    modifying it. Nothing is recorded outside of a request context.
+    """
+    request = request or current_request.get()
+    if request is None or not instances:
+        return []
+
+    # serialize_object() reads tags; fetch them for all instances at once
+    if action != ObjectChangeActionChoices.ACTION_DELETE:
+        prefetch_related_objects(instances, 'tags')
+
+    changes = []
+    for instance in instances:
+        objectchange = instance.to_objectchange(action)
+        if objectchange is None or not getattr(objectchange, 'has_changes', True):
+            continue
+        objectchange.user = request.user
+        objectchange.user_name = request.user.username
+        objectchange.request_id = request.id
+        changes.append(objectchange)
+
+    return ObjectChange.objects.bulk_create(changes)
+
+
+@contextmanager
+def change_logging_suppressed():
+    """
+    Disable NetBox's per-object change logging for the enclosed block. Use only
+    after the affected changes have been recorded with `log_bulk_changes()`
+    and the affected objects enqueued with `enqueue_deleted()`: the handlers
+    that are skipped also trigger event rules.
+    """
+    token = current_request.set(None)
+    try:
+        yield
+    finally:
+        current_request.reset(token)
+
+
+def enqueue_deleted(instances, request=None):
+    """
+    Enqueue `instances` for event rule processing as deleted objects, as
+    NetBox's `pre_delete` handler would. Call before the rows are deleted.
+    Nothing is enqueued outside of a request context.
+    """
+    request = request or current_request.get()
+    if request is None or not instances:
+        return
+    queue = events_queue.get()
+    for instance in instances:
+        # Skips models that do not support event rules
+        enqueue_event(queue, instance, request.user, request.id, OBJECT_DELETED)
+    events_queue.set(queue)
+
+
+def _cache_collected_relations(collector):
+    """
+    Point foreign keys of the collected objects at collected instances of the
+    related model, so that e.g. `str()` of a cascaded link assignment does not
+    fetch its ISD-AS again.
+    """
+    by_model = {model: {obj.pk: obj for obj in instances} for model, instances in collector.data.items()}
+    for model, instances in collector.data.items():
+        for field in model._meta.concrete_fields:
+            related = by_model.get(field.related_model) if field.many_to_one else None
+            if not related:
+                continue
+            for obj in instances:
+                target = related.get(getattr(obj, field.attname))
+                if target is not None and not field.is_cached(obj):
+                    field.set_cached_value(obj, target)
+
+
+def delete_with_changelog(objects, request=None, using=None):
+    """
+    Delete `objects` (instances or a queryset of one model) and everything
+    their deletion cascades to. Every deleted change-logged object is recorded
+    with one bulk INSERT instead of one ObjectChange per object and enqueued
+    for event rules, tombstones for the changes API are written with one
+    INSERT, and the link graph is invalidated once. Returns what
+    `Model.delete()` returns.
+
+    Models may list the relations their `serialize_object()` reads in
+    `changelog_prefetch`; they are fetched once per model (default: tags).
+    """
+    from .changes import deletions_recorded, record_deletions
+    from .graph import graph_updates_deferred
+
+    objects = list(objects)
+    if not objects:
+        return 0, {}
+    using = using or router.db_for_write(type(objects[0]))
+
+    with transaction.atomic(using=using):
+        collector = Collector(using=using)
+        collector.collect(objects)
+        _cache_collected_relations(collector)
+
+        logged = []
+        for model, instances in collector.data.items():
+            if not hasattr(model, 'to_objectchange'):
+                continue
+            instances = list(instances)
+            prefetch_related_objects(instances, *getattr(model, 'changelog_prefetch', ('tags',)))
+            for instance in instances:
+                instance.snapshot()
+            logged.extend(instances)
+        log_bulk_changes(logged, ObjectChangeActionChoices.ACTION_DELETE, request)
+        # Event data is serialized from the instances, which lose their primary keys once deleted
+        enqueue_deleted(logged, request)
+        record_deletions(logged)
+
+        # Changes are already recorded; skip NetBox's per-object change logging and tombstones
+        with change_logging_suppressed(), deletions_recorded(), graph_updates_deferred():
+            return collector.delete()
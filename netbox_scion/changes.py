@@ -0,0 +1,184 @@
+"""
+Delta synchronisation of the plugin inventory.
+
+Consumers page through changes with an opaque cursor. Created and updated
+objects are read from the model tables by `last_updated`; deletions are read
+from `Tombstone` rows, which are written for every deletion (model signals,
+or in bulk by `delete_with_changelog()`). The streams are merged in
+(timestamp, stream, ID) order, so the cursor only ever moves forward and each
+page costs one indexed query per stream regardless of the inventory size.
+
+`last_updated` and tombstone times are set when a row is written, not when
+its transaction commits, so a long transaction (e.g. a bulk import) commits
+rows older than cursors handed out meanwhile. Changes are therefore only
+reported up to the start of the oldest transaction still writing to the
+database, read from `pg_stat_activity`; this requires that the database role
+can see the other NetBox sessions (true when all processes share one role).
+Changes younger than the `changes_settle_time` plugin setting are held back
+as well, covering clock differences and the moment between setting a
+timestamp and writing it.
+
+Tombstones are kept for the `changes_retention` plugin setting and pruned
+when new ones are written. Once a consumer has caught up, its cursor points
+at the end of the reported range rather than the last change, so cursors of
+regular pollers stay recent; a cursor older than the retention may have
+missed pruned deletions and is rejected with `CursorExpired`.
+"""
+import base64
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ISDAS, Organization, SCIONLinkAssignment, Tombstone
+
+# Streams in merge order; tombstones come last among changes with the same timestamp
+MODELS = (Organization, ISDAS, SCIONLinkAssignment)
+TOMBSTONES = len(MODELS)
+# Cursor stream after all others: every change up to the cursor time has been reported
+CAUGHT_UP = TOMBSTONES + 1
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# `object` is None for tombstones; `pk` is the row (or tombstone) ID ordering the stream
+Change = namedtuple('Change', ('time', 'stream', 'pk', 'model', 'object_id', 'object'))
+
+
+# Deletions recorded in bulk by the caller, per thread
+_state = threading.local()
+
+
+class CursorExpired(Exception):
+    """The cursor is older than the tombstone retention; the consumer must resync from scratch."""
+
+
+def _settle_time():
+    return settings.PLUGINS_CONFIG.get('netbox_scion', {}).get('changes_settle_time', 5)
+
+
+def _retention():
+    return timedelta(seconds=settings.PLUGINS_CONFIG.get('netbox_scion', {}).get('changes_retention', 2592000))
+
+
+def oldest_open_transaction():
+    """Start time of the oldest other transaction of this database that has written data, or None."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT min(xact_start) FROM pg_stat_activity "
+            "WHERE datname = current_database() AND backend_xid IS NOT NULL AND pid <> pg_backend_pid()"
+        )
+        return cursor.fetchone()[0]
+
+
+def record_deletions(instances):
+    """
+    Write tombstones for the deleted organizations, ISD-ASes and link
+    assignments in `instances` (one INSERT) and prune those past the retention.
+    """
+    if getattr(_state, 'recorded', False):
+        return
+    instances = [instance for instance in instances if type(instance) in MODELS]
+    if not instances:
+        return
+    object_types = ContentType.objects.get_for_models(*{type(instance) for instance in instances})
+    now = timezone.now()
+    Tombstone.objects.bulk_create([
+        Tombstone(object_type=object_types[type(instance)], object_id=instance.pk, time=now)
+        for instance in instances
+    ])
+    # Served by the (time, id) index
+    Tombstone.objects.filter(time__lt=now - _retention()).delete()
+
+
+@contextmanager
+def deletions_recorded():
+    """Skip tombstones from signals in the enclosed block, e.g. after `record_deletions()` for a whole cascade."""
+    previous = getattr(_state, 'recorded', False)
+    _state.recorded = True
+    try:
+        yield
+    finally:
+        _state.recorded = previous
+
+
+def encode_cursor(time, stream, pk):
+    return base64.urlsafe_b64encode(f'{time.isoformat()} {stream} {pk}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return (time, stream, pk) from a cursor; raise ValueError if it is malformed."""
+    try:
+        time, stream, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split(' ')
+        return datetime.fromisoformat(time), int(stream), int(pk)
+    except (TypeError, UnicodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _after(field, cursor, stream):
+    """Keyset condition selecting the rows of `stream` that sort after `cursor`."""
+    if cursor is None:
+        return Q()
+    time, cursor_stream, pk = cursor
+    if stream > cursor_stream:
+        return Q(**{f'{field}__gte': time})
+    if stream < cursor_stream:
+        return Q(**{f'{field}__gt': time})
+    return Q(**{f'{field}__gt': time}) | Q(**{field: time, 'pk__gt': pk})
+
+
+def get_changes(querysets, since=None, limit=DEFAULT_LIMIT):
+    """
+    Return (changes, next_cursor, has_more) for the objects of `querysets`
+    ({model: queryset}, e.g. restricted to what a user may view) that were
+    created, updated or deleted after the cursor `since`. Deletions of models
+    absent from `querysets` are not reported. Raises `CursorExpired` if
+    deletions after the cursor may have been pruned.
+    """
+    cursor = decode_cursor(since) if since else None
+    now = timezone.now()
+    if cursor is not None and cursor[0] < now - _retention():
+        raise CursorExpired("Cursor is older than the retention of deleted objects; restart without `since`")
+    until = now - timedelta(seconds=_settle_time())
+    # Rows of open transactions carry timestamps from after their start
+    if (oldest := oldest_open_transaction()) is not None:
+        until = min(until, oldest - timedelta(seconds=_settle_time()))
+
+    changes = []
+    for stream, model in enumerate(MODELS):
+        if model not in querysets:
+            continue
+        rows = querysets[model].filter(
+            _after('last_updated', cursor, stream), last_updated__lte=until
+        ).order_by('last_updated', 'pk')[:limit + 1]
+        changes.extend(Change(obj.last_updated, stream, obj.pk, model, obj.pk, obj) for obj in rows)
+
+    object_types = ContentType.objects.get_for_models(*querysets)
+    tombstones = Tombstone.objects.filter(
+        _after('time', cursor, TOMBSTONES),
+        object_type__in=object_types.values(),
+        time__lte=until,
+    ).order_by('time', 'pk').values_list('time', 'pk', 'object_type_id', 'object_id')[:limit + 1]
+    models_by_type = {object_type.pk: model for model, object_type in object_types.items()}
+    changes.extend(
+        Change(time, TOMBSTONES, pk, models_by_type[object_type_id], object_id, None)
+        for time, pk, object_type_id, object_id in tombstones
+    )
+
+    changes.sort(key=lambda change: (change.time, change.stream, change.pk))
+    page = changes[:limit]
+    has_more = len(changes) > limit
+    if has_more:
+        next_cursor = encode_cursor(*page[-1][:3])
+    elif cursor is None or until > cursor[0]:
+        # Everything up to `until` has been reported
+        next_cursor = encode_cursor(until, CAUGHT_UP, 0)
+    else:
+        next_cursor = since
+    return page, next_cursor, has_more
@@ -0,0 +1,146 @@
+"""
+Link symmetry checks.
+
+Every link assignment whose `peer` resolves to an ISD-AS in the inventory is
+compared with its counterpart (the assignment of the peer ISD-AS on the peer
+interface). Local underlay endpoints are also checked for reuse on the same
+appliance. Each check is a single SQL query joining both ends of the link;
+rows are streamed, so a full run costs a fixed number of queries regardless
+of the number of links.
+"""
+from django.db.models import Exists, F, OuterRef, Q
+
+from .models import SCIONLinkAssignment
+
+# Path from an assignment to its counterpart, joined on the peer ISD-AS and interface
+COUNTERPART = 'peer_isd_as__link_assignments__'
+
+# Relationship each side must have given the other side's relationship
+DUAL_RELATIONSHIPS = {
+    SCIONLinkAssignment.RELATIONSHIP_PARENT: SCIONLinkAssignment.RELATIONSHIP_CHILD,
+    SCIONLinkAssignment.RELATIONSHIP_CHILD: SCIONLinkAssignment.RELATIONSHIP_PARENT,
+    SCIONLinkAssignment.RELATIONSHIP_CORE: SCIONLinkAssignment.RELATIONSHIP_CORE,
+}
+
+CHECKS = (
+    'dangling_peer',
+    'missing_counterpart',
+    'relationship_mismatch',
+    'peer_mismatch',
+    'underlay_mismatch',
+    'underlay_conflict',
+)
+
+# Report key -> queryset column
+REPORT_COLUMNS = {
+    'id': 'pk',
+    'isd_as': 'isd_as__isd_as',
+    'interface_id': 'interface_id',
+    'relationship': 'relationship',
+    'peer': 'peer',
+}
+COUNTERPART_COLUMNS = {
+    'counterpart_id': 'cp_id',
+    'counterpart_relationship': 'cp_relationship',
+    'counterpart_peer': 'cp_peer',
+}
+
+
+def _report_rows(queryset, check, with_counterpart=False):
+    columns = {**REPORT_COLUMNS, **(COUNTERPART_COLUMNS if with_counterpart else {})}
+    rows = queryset.order_by('pk').values_list(*columns.values())
+    for row in rows.iterator(chunk_size=2000):
+        yield {'check': check, **dict(zip(columns, row))}
+
+
+def with_counterparts(queryset):
+    """
+    Join each assignment of `queryset` to its counterpart and expose the
+    counterpart's columns as `cp_*` annotations. The annotations reuse the join
+    made by the filter, so conditions on them (including negated ones) compare
+    both ends of the same link instead of turning into subqueries.
+    """
+    return queryset.filter(**{f'{COUNTERPART}interface_id': F('peer_interface_id')}).annotate(
+        cp_id=F(f'{COUNTERPART}pk'),
+        cp_relationship=F(f'{COUNTERPART}relationship'),
+        cp_peer=F(f'{COUNTERPART}peer'),
+        cp_peer_isd_as=F(f'{COUNTERPART}peer_isd_as'),
+        cp_peer_interface_id=F(f'{COUNTERPART}peer_interface_id'),
+        cp_local_underlay=F(f'{COUNTERPART}local_underlay'),
+        cp_peer_underlay=F(f'{COUNTERPART}peer_underlay'),
+    )
+
+
+def dangling_peers(queryset):
+    """Peers that do not resolve to an ISD-AS in the inventory."""
+    return queryset.filter(peer__isnull=False, peer_isd_as__isnull=True).exclude(peer='')
+
+
+def missing_counterparts(queryset):
+    """Resolved peers with no assignment on the peer ISD-AS's peer interface."""
+    counterpart = SCIONLinkAssignment.objects.filter(
+        isd_as=OuterRef('peer_isd_as'), interface_id=OuterRef('peer_interface_id')
+    )
+    return queryset.filter(peer_isd_as__isnull=False).filter(~Exists(counterpart))
+
+
+def relationship_mismatches(queryset):
+    """Counterparts whose relationship is not the dual of this one (PARENT/CHILD, CORE/CORE)."""
+    dual = Q()
+    for relationship, expected in DUAL_RELATIONSHIPS.items():
+        dual |= Q(relationship=relationship, cp_relationship=expected)
+    return with_counterparts(queryset).exclude(dual)
+
+
+def peer_mismatches(queryset):
+    """Counterparts whose own peer does not point back at this ISD-AS and interface."""
+    return with_counterparts(queryset).filter(
+        Q(cp_peer_isd_as__isnull=True)
+        | ~Q(cp_peer_isd_as=F('isd_as'))
+        | ~Q(cp_peer_interface_id=F('interface_id'))
+    )
+
+
+def underlay_mismatches(queryset):
+    """Counterparts whose underlays are not this assignment's underlays swapped (where both are set)."""
+    local_differs = ~Q(local_underlay='') & ~Q(cp_peer_underlay='') & ~Q(local_underlay=F('cp_peer_underlay'))
+    peer_differs = ~Q(peer_underlay='') & ~Q(cp_local_underlay='') & ~Q(peer_underlay=F('cp_local_underlay'))
+    return with_counterparts(queryset).filter(local_differs | peer_differs)
+
+
+def underlay_conflicts(queryset):
+    """Assignments sharing their local underlay IP and port with another assignment of the same appliance."""
+    other = SCIONLinkAssignment.objects.filter(
+        core=OuterRef('core'),
+        local_underlay_ip=OuterRef('local_underlay_ip'),
+        local_underlay_port=OuterRef('local_underlay_port'),
+    ).exclude(pk=OuterRef('pk'))
+    return queryset.filter(local_underlay_ip__isnull=False).filter(Exists(other))
+
+
+CHECK_QUERIES = {
+    'dangling_peer': (dangling_peers, False),
+    'missing_counterpart': (missing_counterparts, False),
+    'relationship_mismatch': (relationship_mismatches, True),
+    'peer_mismatch': (peer_mismatches, True),
+    'underlay_mismatch': (underlay_mismatches, True),
+    'underlay_conflict': (underlay_conflicts, False),
+}
+
+
+def iter_issues(queryset=None, checks=CHECKS):
+    """Yield one dict per inconsistency found among `queryset` (all assignments by default)."""
+    if queryset is None:
+        queryset = SCIONLinkAssignment.objects.all()
+    for check in checks:
+        query, with_counterpart = CHECK_QUERIES[check]
+        yield from _report_rows(query(queryset), check, with_counterpart=with_counterpart)
+
+
+def check_links(queryset=None, checks=CHECKS):
+    """Run `checks` and return a report: {'summary': {check: count}, 'issues': [...]}."""
+    issues = list(iter_issues(queryset, checks))
+    summary = {check: 0 for check in checks}
+    for issue in issues:
+        summary[issue['check']] += 1
+    return {'summary': summary, 'issues': issues}
@@ -0,0 +1,106 @@
+"""
+Streaming CSV/NDJSON export of plugin objects.
+
+Rows are read with a server-side cursor (`QuerySet.iterator()`) and written
+to a `StreamingHttpResponse` one chunk at a time, so memory use does not
+depend on the number of exported objects.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from .models import Organization, ISDAS, SCIONLinkAssignment
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows fetched per round trip to the database
+CHUNK_SIZE = 2000
+
+# (CSV header, NDJSON key, value getter) per model, matching the CSV export templates
+EXPORT_COLUMNS = {
+    Organization: (
+        ('ID', 'id', lambda obj: obj.pk),
+        ('Short Name', 'short_name', lambda obj: obj.short_name),
+        ('Full Name', 'full_name', lambda obj: obj.full_name),
+        ('Description', 'description', lambda obj: obj.description),
+        ('Created', 'created', lambda obj: obj.created),
+        ('Last Updated', 'last_updated', lambda obj: obj.last_updated),
+    ),
+    ISDAS: (
+        ('ID', 'id', lambda obj: obj.pk),
+        ('ISD-AS', 'isd_as', lambda obj: obj.isd_as),
+        ('Organization', 'organization', lambda obj: obj.organization.short_name),
+        ('Description', 'description', lambda obj: obj.description),
+        ('Appliances', 'appliances', lambda obj: obj.appliance_names),
+        ('Created', 'created', lambda obj: obj.created),
+        ('Last Updated', 'last_updated', lambda obj: obj.last_updated),
+    ),
+    SCIONLinkAssignment: (
+        ('ID', 'id', lambda obj: obj.pk),
+        ('ISD-AS', 'isd_as', lambda obj: obj.isd_as.isd_as),
+        ('Appliance', 'core', lambda obj: obj.core.name),
+        ('Interface ID', 'interface_id', lambda obj: obj.interface_id),
+        ('Relationship', 'relationship', lambda obj: obj.relationship),
+        ('Status', 'status', lambda obj: obj.status),
+        ('Peer Name', 'peer_name', lambda obj: obj.peer_name),
+        ('Peer', 'peer', lambda obj: obj.peer),
+        ('Local Underlay', 'local_underlay', lambda obj: obj.local_underlay),
+        ('Peer Underlay', 'peer_underlay', lambda obj: obj.peer_underlay),
+        ('Ticket', 'ticket', lambda obj: obj.ticket),
+        ('Ticket URL', 'ticket_url', lambda obj: obj.get_ticket_url()),
+        ('Created', 'created', lambda obj: obj.created),
+        ('Last Updated', 'last_updated', lambda obj: obj.last_updated),
+    ),
+}
+
+
+class _Echo:
+    """File-like object that returns what is written, for use with csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ', '.join(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(queryset, columns, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([header for header, _, _ in columns])
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        yield writer.writerow([_csv_value(getter(obj)) for _, _, getter in columns])
+
+
+def iter_ndjson(queryset, columns, chunk_size=CHUNK_SIZE):
+    encoder = DjangoJSONEncoder()
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        yield encoder.encode({key: getter(obj) for _, key, getter in columns}) + '\n'
+
+
+def streaming_export(queryset, export_format='csv', filename=None):
+    """
+    Return a StreamingHttpResponse exporting `queryset` as CSV or NDJSON.
+    Related objects needed by the columns must already be selected or
+    prefetched on `queryset` (prefetches are applied per chunk).
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    columns = EXPORT_COLUMNS[queryset.model]
+    rows = iter_csv if export_format == 'csv' else iter_ndjson
+
+    response = StreamingHttpResponse(rows(queryset, columns), content_type=EXPORT_FORMATS[export_format])
+    filename = filename or f'netbox_scion_{queryset.model._meta.model_name}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
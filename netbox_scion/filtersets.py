@@ -1,7 +1,28 @@
 import django_filters
+import netaddr
+from django import forms
 from django.db.models import Q
 from netbox.filtersets import NetBoxModelFilterSet
-from .models import Organization, ISDAS, SCIONLinkAssignment
+from utilities.filters import MultiValueCharFilter, MultiValueNumberFilter
+from .models import Organization, ISDAS, Appliance, SCIONLinkAssignment
+from .utils import parse_as
+
+
+class ASNumberField(forms.CharField):
+    """Form field accepting an AS in hex ('ff00:0:110') or decimal form, cleaned to its integer value."""
+
+    def to_python(self, value):
+        value = super().to_python(value)
+        if not value:
+            return None
+        try:
+            return parse_as(value)
+        except ValueError as e:
+            raise forms.ValidationError(str(e))
+
+
+class ASNumberFilter(django_filters.Filter):
+    field_class = ASNumberField
 
 
 class OrganizationFilterSet(NetBoxModelFilterSet):
@@ -32,6 +53,24 @@ class ISDAFilterSet(NetBoxModelFilterSet):
         label='Search',
     )
     
+    isd = MultiValueNumberFilter(
+        label='ISD',
+    )
+    # `as` is a Python keyword, so the AS number filters are named `asn`
+    asn = ASNumberFilter(
+        label='AS number',
+    )
+    asn__gte = ASNumberFilter(
+        field_name='asn',
+        lookup_expr='gte',
+        label='AS number (from)',
+    )
+    asn__lte = ASNumberFilter(
+        field_name='asn',
+        lookup_expr='lte',
+        label='AS number (to)',
+    )
+    
     class Meta:
         model = ISDAS
         fields = ['id', 'isd_as', 'organization']
@@ -40,11 +79,14 @@ class ISDAFilterSet(NetBoxModelFilterSet):
         """Perform the filtered search."""
         if not value.strip():
             return queryset
+        # Match joined tables in subqueries so every branch of the OR can use an index
+        organizations = Organization.objects.filter(
+            Q(short_name__icontains=value) | Q(full_name__icontains=value)
+        ).values('pk')
         qs_filter = (
                 Q(isd_as__icontains=value)
                 | Q(description__icontains=value)
-                | Q(organization__short_name__icontains=value)
-                | Q(organization__full_name__icontains=value)
+                | Q(organization__in=organizations)
         )
         return queryset.filter(qs_filter)
 
@@ -54,21 +96,86 @@ class SCIONLinkAssignmentFilterSet(NetBoxModelFilterSet):
         method='search',
         label='Search',
     )
+    core_id = django_filters.ModelMultipleChoiceFilter(
+        queryset=Appliance.objects.all(),
+        label='Appliance (ID)',
+    )
+    core = MultiValueCharFilter(
+        field_name='core__name',
+        label='Appliance (name)',
+    )
+    peer_isd_as_id = django_filters.ModelMultipleChoiceFilter(
+        queryset=ISDAS.objects.all(),
+        label='Peer ISD-AS (ID)',
+    )
+    peer_resolved = django_filters.BooleanFilter(
+        field_name='peer_isd_as',
+        lookup_expr='isnull',
+        exclude=True,
+        label='Peer ISD-AS is in the inventory',
+    )
+    local_underlay_ip = MultiValueCharFilter(
+        method='filter_underlay_ip',
+        label='Local underlay IP',
+    )
+    local_underlay_ip__net_contained = django_filters.CharFilter(
+        field_name='local_underlay_ip',
+        method='filter_underlay_prefix',
+        label='Local underlay IP within prefix',
+    )
+    local_underlay_port = MultiValueNumberFilter(
+        label='Local underlay port',
+    )
+    peer_underlay_ip = MultiValueCharFilter(
+        method='filter_underlay_ip',
+        label='Peer underlay IP',
+    )
+    peer_underlay_ip__net_contained = django_filters.CharFilter(
+        field_name='peer_underlay_ip',
+        method='filter_underlay_prefix',
+        label='Peer underlay IP within prefix',
+    )
+    peer_underlay_port = MultiValueNumberFilter(
+        label='Peer underlay port',
+    )
     
     class Meta:
         model = SCIONLinkAssignment
-        fields = ['id', 'isd_as', 'core', 'relationship', 'status', 'peer_name', 'peer']
+        fields = ['id', 'isd_as', 'relationship', 'status', 'peer_name', 'peer']
 
     def search(self, queryset, name, value):
         """Perform the filtered search."""
         if not value.strip():
             return queryset
+        # Match joined tables in subqueries and statuses against the choices, so every
+        # branch of the OR can use an index (trigram or foreign key) on this table
+        isdases = ISDAS.objects.filter(isd_as__icontains=value).values('pk')
+        appliances = Appliance.objects.filter(name__icontains=value).values('pk')
+        statuses = [
+            status for status, label in SCIONLinkAssignment.STATUS_CHOICES
+            if value.lower() in status.lower() or value.lower() in label.lower()
+        ]
         qs_filter = (
-            Q(isd_as__isd_as__icontains=value)
-            | Q(core__icontains=value)
+            Q(isd_as__in=isdases)
+            | Q(core__in=appliances)
             | Q(peer_name__icontains=value)
             | Q(peer__icontains=value)
             | Q(ticket__icontains=value)
-            | Q(status__icontains=value)
+            | Q(status__in=statuses)
         )
-        return queryset.filter(qs_filter)
\ No newline at end of file
+        return queryset.filter(qs_filter)
+
+    def filter_underlay_ip(self, queryset, name, value):
+        try:
+            ips = [str(netaddr.IPAddress(ip)) for ip in value]
+        except (netaddr.AddrFormatError, ValueError):
+            return queryset.none()
+        return queryset.filter(**{f'{name}__in': ips})
+
+    def filter_underlay_prefix(self, queryset, name, value):
+        # `net_contained_or_equal` also matches host prefixes (/32, /128) of the IP itself
+        try:
+            prefix = str(netaddr.IPNetwork(value.strip()).cidr)
+        except (netaddr.AddrFormatError, ValueError):
+            return queryset.none()
+        return queryset.filter(**{f'{name}__net_contained_or_equal': prefix})
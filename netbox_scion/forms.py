@@ -1,7 +1,8 @@
 from django import forms
 from netbox.forms import NetBoxModelForm, NetBoxModelFilterSetForm
 from utilities.forms.fields import DynamicModelChoiceField, TagFilterField
-from .models import Organization, ISDAS, SCIONLinkAssignment
+from .importer import IMPORT_FORMATS
+from .models import Organization, ISDAS, Appliance, SCIONLinkAssignment
 
 
 class OrganizationForm(NetBoxModelForm):
@@ -15,16 +16,11 @@ class OrganizationForm(NetBoxModelForm):
 
 
 class ISDAForm(NetBoxModelForm):
-    appliances = forms.CharField(
-        required=False,
-        help_text="Appliances are managed in the detail page",
-        label="Appliances",
-        widget=forms.HiddenInput()
-    )
-    
+    # Appliances are managed through the detail page
+
     class Meta:
         model = ISDAS
-        fields = ('isd_as', 'description', 'organization', 'appliances', 'comments')
+        fields = ('isd_as', 'description', 'organization', 'comments')
         labels = {
             'isd_as': 'ISD-AS',
         }
@@ -36,27 +32,9 @@ class ISDAForm(NetBoxModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Keep appliances as hidden, they'll be managed through the detail page
-        if self.instance and self.instance.pk and self.instance.appliances:
-            # Only show appliances if they actually exist and are not empty
-            if isinstance(self.instance.appliances, list) and self.instance.appliances:
-                self.initial['appliances'] = ', '.join(self.instance.appliances)
-            else:
-                self.initial['appliances'] = ''
-        else:
-            self.initial['appliances'] = ''
-        
         # Manually set the organization choices to avoid API lookup
         self.fields['organization'].queryset = Organization.objects.all()
 
-    def clean_appliances(self):
-        appliances_str = self.cleaned_data.get('appliances', '')
-        if not appliances_str or appliances_str.strip() == '':
-            return []
-        # Split by comma and clean up whitespace
-        appliances = [appliance.strip() for appliance in appliances_str.split(',') if appliance.strip()]
-        return appliances
-
 
 # New form for managing appliances in the ISD-AS detail page
 class ApplianceManagementForm(forms.Form):
@@ -71,12 +49,37 @@ class ApplianceManagementForm(forms.Form):
     )
 
 
+class CachedModelChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField that remembers the objects it has resolved in `cache`
+    (primary key -> object). Forms sharing one cache, e.g. the rows of a bulk
+    import, fetch each distinct object once.
+    """
+
+    def __init__(self, *args, cache=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = {} if cache is None else cache
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            key = int(value)
+        except (TypeError, ValueError):
+            return super().to_python(value)
+        if key not in self.cache:
+            self.cache[key] = super().to_python(value)
+        return self.cache[key]
+
+
 class SCIONLinkAssignmentForm(NetBoxModelForm):
-    core = forms.ChoiceField(
+    # Appliances are submitted by name (unique per ISD-AS); the queryset is narrowed to the selected ISD-AS
+    core = forms.ModelChoiceField(
+        queryset=Appliance.objects.none(),
+        to_field_name='name',
         required=True,
         help_text="Select the appliance for this assignment",
         label="Appliance",
-        choices=[]
     )
 
     class Meta:
@@ -85,6 +88,9 @@ class SCIONLinkAssignmentForm(NetBoxModelForm):
             'isd_as', 'core', 'interface_id', 'relationship', 'status', 'peer_name', 'peer',
             'local_underlay', 'peer_underlay', 'ticket', 'comments'
         )
+        field_classes = {
+            'isd_as': CachedModelChoiceField,
+        }
         labels = {
             'isd_as': 'ISD-AS',
             'interface_id': 'Interface ID',
@@ -97,8 +103,15 @@ class SCIONLinkAssignmentForm(NetBoxModelForm):
             'comments': 'Comments',
         }
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, isdas_cache=None, **kwargs):
+        """
+        `isdas_cache` ({pk: ISDAS}) may be shared between forms so that each
+        ISD-AS is fetched once per batch rather than once per form.
+        """
         super().__init__(*args, **kwargs)
+        if isdas_cache is not None:
+            self.fields['isd_as'].cache = isdas_cache
+
         # Make optional fields not required
         self.fields['ticket'].required = False
         self.fields['peer_name'].required = False
@@ -106,66 +119,36 @@ class SCIONLinkAssignmentForm(NetBoxModelForm):
         self.fields['local_underlay'].required = False
         self.fields['peer_underlay'].required = False
         
-        # Set up the core field choices based on the selected ISD-AS
-        isd_as = None
-        
-        # Try to get ISD-AS from instance first
-        if self.instance and self.instance.pk and hasattr(self.instance, 'isd_as') and self.instance.isd_as:
-            isd_as = self.instance.isd_as
-        # Try to get from form data if available
-        elif args and len(args) > 0 and args[0] is not None:
-            form_data = args[0]
-            if isinstance(form_data, dict) and 'isd_as' in form_data and form_data['isd_as']:
-                try:
-                    isd_as = ISDAS.objects.get(pk=form_data['isd_as'])
-                except (ISDAS.DoesNotExist, ValueError, TypeError):
-                    pass
-        
-        # Set up choices based on available appliances
-        if isd_as and hasattr(isd_as, 'appliances'):
-            appliances = isd_as.appliances or []
-            choices = [(appliance, appliance) for appliance in appliances]
-            if choices:
-                choices.insert(0, ('', '--- Select Appliance ---'))
-            else:
-                choices = [('', 'No appliances available')]
-        else:
-            # For new instances or when no ISD-AS is selected
-            choices = [('', '--- Select ISD-AS first ---')]
-        
-        self.fields['core'].choices = choices
-        
+        # Narrow the appliance choices by ISD-AS ID; the ISD-AS itself is fetched
+        # only once, when the isd_as field is cleaned. Submitted data takes
+        # precedence over the instance (the ISD-AS may be changing).
+        isd_as_id = self.instance.isd_as_id if self.instance else None
+        if self.is_bound and self.data.get('isd_as'):
+            isd_as_id = self.data['isd_as']
+        self._set_appliance_choices(isd_as_id)
+
         # Auto-select appliance field when editing an existing link
         # Must happen AFTER choices are set
-        if self.instance and self.instance.pk and self.instance.core:
-            # Ensure the current core value is in the choices
-            if self.instance.core not in [choice[0] for choice in choices]:
-                # Add the current value if it's not in the choices (safety fallback)
-                choices.append((self.instance.core, self.instance.core))
-                self.fields['core'].choices = choices
-            # Set the initial value to pre-select in the dropdown
-            self.initial['core'] = self.instance.core
+        if self.instance and self.instance.pk and self.instance.core_id:
+            # Set the initial value (by name) to pre-select in the dropdown
+            self.initial['core'] = self.instance.core.name
             # Also add a data attribute to help JavaScript
-            self.fields['core'].widget.attrs['data-initial-value'] = self.instance.core
-    
-    def full_clean(self):
-        # Override full_clean to update core choices before validation
-        if self.data and 'isd_as' in self.data and self.data['isd_as']:
-            try:
-                isd_as = ISDAS.objects.get(pk=self.data['isd_as'])
-                appliances = isd_as.appliances or []
-                choices = [(appliance, appliance) for appliance in appliances]
-                if choices:
-                    choices.insert(0, ('', '--- Select Appliance ---'))
-                else:
-                    choices = [('', 'No appliances available')]
-                self.fields['core'].choices = choices
-                    
-            except (ISDAS.DoesNotExist, ValueError, TypeError):
-                pass
-        
-        # Now run the normal validation
-        super().full_clean()
+            self.fields['core'].widget.attrs['data-initial-value'] = self.instance.core.name
+
+    def _set_appliance_choices(self, isd_as_id):
+        """Limit the appliance field to the appliances of ISD-AS `isd_as_id`."""
+        field = self.fields['core']
+        try:
+            isd_as_id = int(isd_as_id) if isd_as_id is not None else None
+        except (TypeError, ValueError):
+            isd_as_id = None
+        if isd_as_id is None:
+            # For new instances or when no ISD-AS is selected
+            field.queryset = Appliance.objects.none()
+            field.empty_label = '--- Select ISD-AS first ---'
+            return
+        field.queryset = Appliance.objects.filter(isd_as_id=isd_as_id)
+        field.empty_label = '--- Select Appliance ---'
 
     def clean_ticket(self):
         # No special validation; allow any trimmed string (may become a URL on display)
@@ -191,11 +174,27 @@ class SCIONLinkAssignmentForm(NetBoxModelForm):
         return cleaned_data
     
     def clean_core(self):
-        core = self.cleaned_data.get('core', '')
-        # Just return the appliance - validation happens via choices
+        core = self.cleaned_data.get('core')
+        # Just return the appliance - validation happens via the ISD-AS-limited queryset
         return core
 
 
+class LinkAssignmentImportForm(forms.Form):
+    data = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={'rows': 12, 'class': 'font-monospace'}),
+        help_text="Records in the selected format, using the export's column names",
+    )
+    upload_file = forms.FileField(required=False, label="File")
+    format = forms.ChoiceField(choices=[(name, name.upper()) for name in IMPORT_FORMATS], initial='csv')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('data') and not cleaned_data.get('upload_file'):
+            raise forms.ValidationError("Paste the records or upload a file.")
+        return cleaned_data
+
+
 # Filter Forms
 class OrganizationFilterForm(NetBoxModelFilterSetForm):
     q = forms.CharField(required=False, label="Search")
@@ -210,6 +209,9 @@ class ISDAFilterForm(NetBoxModelFilterSetForm):
         queryset=Organization.objects.all(), 
         required=False
     )
+    isd = forms.IntegerField(required=False, min_value=0, label="ISD")
+    asn__gte = forms.CharField(required=False, label="AS from", help_text="e.g. ff00:0:100 or 64512")
+    asn__lte = forms.CharField(required=False, label="AS to", help_text="e.g. ff00:0:1ff or 65534")
     tag = TagFilterField(ISDAS)
 
     model = ISDAS
@@ -0,0 +1,308 @@
+"""
+In-memory inter-AS graph built from link assignments.
+
+Each link assignment whose `peer` resolves to an ISD-AS is a directed edge
+from its ISD-AS to the peer ISD-AS, labelled with the relationship of the
+neighbour (PARENT, CHILD or CORE). The graph is built once per process with
+two queries and then kept up to date incrementally from model signals.
+
+A version counter in the shared cache coordinates processes: every change
+increments it after the transaction commits and stores the change (a method
+of `LinkGraph` and its argument) in the cache under the new version. The
+process that made the change applies it in place when it was up to date; any
+other process notices the new version on its next read and replays the
+changes it missed. A process rebuilds its graph only when the log has a gap
+(expired entries, more than `MAX_REPLAY` changes behind, or a bulk change
+that invalidated the graph).
+"""
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import ISDAS, SCIONLinkAssignment
+
+VERSION_KEY = 'netbox_scion:graph:version'
+CHANGE_PREFIX = 'netbox_scion:graph:change'
+
+# Seconds a change stays in the log, and most changes replayed instead of rebuilding
+CHANGE_TIMEOUT = 3600
+MAX_REPLAY = 1000
+
+# Logged in place of a change when the graph must be rebuilt
+REBUILD = ('rebuild', None)
+
+Node = namedtuple('Node', ('id', 'isd_as', 'isd'))
+Edge = namedtuple('Edge', ('id', 'source', 'target', 'relationship', 'interface_id', 'peer_interface_id'))
+
+EDGE_FIELDS = ('pk', 'isd_as_id', 'peer_isd_as_id', 'relationship', 'interface_id', 'peer_interface_id')
+
+# Longest up-segment searched by default
+MAX_SEGMENT_LENGTH = 8
+
+
+class LinkGraph:
+
+    def __init__(self, nodes=(), edges=()):
+        self.nodes = {}
+        self.edges = {}
+        self.outbound = defaultdict(dict)
+        self.inbound = defaultdict(dict)
+        for node in nodes:
+            self.set_node(node)
+        for edge in edges:
+            self.set_edge(edge)
+
+    @classmethod
+    def from_database(cls):
+        nodes = (Node(*row) for row in ISDAS.objects.values_list('pk', 'isd_as', 'isd').iterator())
+        edges = (
+            Edge(*row) for row in SCIONLinkAssignment.objects.filter(
+                peer_isd_as__isnull=False
+            ).values_list(*EDGE_FIELDS).iterator(chunk_size=5000)
+        )
+        return cls(nodes, edges)
+
+    # Mutation
+
+    def set_node(self, node):
+        self.nodes[node.id] = node
+
+    def remove_node(self, node_id):
+        self.nodes.pop(node_id, None)
+        # Assignments of the ISD-AS are deleted with it; peers pointing at it are set to NULL in SQL
+        for edge_id in list(self.outbound.get(node_id, ())) + list(self.inbound.get(node_id, ())):
+            self.remove_edge(edge_id)
+
+    def set_edge(self, edge):
+        self.remove_edge(edge.id)
+        if edge.target is None:
+            return
+        self.edges[edge.id] = edge
+        self.outbound[edge.source][edge.id] = edge
+        self.inbound[edge.target][edge.id] = edge
+
+    def remove_edge(self, edge_id):
+        edge = self.edges.pop(edge_id, None)
+        if edge is not None:
+            self.outbound[edge.source].pop(edge_id, None)
+            self.inbound[edge.target].pop(edge_id, None)
+
+    # Representation
+
+    def node_data(self, node_id):
+        node = self.nodes.get(node_id)
+        return {'id': node_id, 'isd_as': node.isd_as if node else None}
+
+    def link_data(self, edge):
+        return {
+            'id': edge.id,
+            'isd_as': self.node_data(edge.source),
+            'interface_id': edge.interface_id,
+            'relationship': edge.relationship,
+            'peer_isd_as': self.node_data(edge.target),
+            'peer_interface_id': edge.peer_interface_id,
+        }
+
+    # Queries
+
+    def is_core(self, node_id):
+        return any(
+            edge.relationship == SCIONLinkAssignment.RELATIONSHIP_CORE
+            for edge in (*self.outbound.get(node_id, {}).values(), *self.inbound.get(node_id, {}).values())
+        )
+
+    def neighbors(self, node_id):
+        """Links declared by the ISD-AS (outbound) and by its neighbours towards it (inbound)."""
+        return {
+            'outbound': sorted(self.outbound.get(node_id, {}).values(), key=lambda edge: edge.interface_id),
+            'inbound': sorted(self.inbound.get(node_id, {}).values(), key=lambda edge: edge.id),
+        }
+
+    def parents(self, node_id):
+        """Yield (parent ISD-AS ID, link ID) declared by either end of the link."""
+        for edge in self.outbound.get(node_id, {}).values():
+            if edge.relationship == SCIONLinkAssignment.RELATIONSHIP_PARENT:
+                yield edge.target, edge.id
+        for edge in self.inbound.get(node_id, {}).values():
+            if edge.relationship == SCIONLinkAssignment.RELATIONSHIP_CHILD:
+                yield edge.source, edge.id
+
+    def up_segments(self, node_id, k=3, max_length=MAX_SEGMENT_LENGTH):
+        """
+        Return up to `k` shortest loop-free PARENT chains from `node_id` to a core
+        ISD-AS, as (ISD-AS IDs, link IDs) tuples ordered by length.
+        """
+        if self.is_core(node_id):
+            return [((node_id,), ())]
+        segments = []
+        queue = deque([((node_id,), ())])
+        while queue and len(segments) < k:
+            path, links = queue.popleft()
+            if len(links) >= max_length:
+                continue
+            for parent, link_id in self.parents(path[-1]):
+                if parent in path:
+                    continue
+                segment = (path + (parent,), links + (link_id,))
+                if self.is_core(parent):
+                    segments.append(segment)
+                    if len(segments) >= k:
+                        break
+                else:
+                    queue.append(segment)
+        return segments
+
+    def reachable_cores(self, node_id):
+        """Return the core ISD-ASes reachable from `node_id` by following PARENT links."""
+        seen = {node_id}
+        queue = deque([node_id])
+        cores = set()
+        while queue:
+            current = queue.popleft()
+            if self.is_core(current):
+                cores.add(current)
+                continue
+            for parent, _ in self.parents(current):
+                if parent not in seen:
+                    seen.add(parent)
+                    queue.append(parent)
+        return cores
+
+    def core_mesh(self, isd):
+        """Describe CORE connectivity between the core ISD-ASes of `isd`."""
+        cores = sorted(
+            (node for node in self.nodes.values() if node.isd == isd and self.is_core(node.id)),
+            key=lambda node: node.isd_as
+        )
+        core_ids = {node.id for node in cores}
+        links = [
+            edge for node_id in core_ids for edge in self.outbound.get(node_id, {}).values()
+            if edge.relationship == SCIONLinkAssignment.RELATIONSHIP_CORE and edge.target in core_ids
+        ]
+        connected = {frozenset((edge.source, edge.target)) for edge in links}
+
+        # Connected components (links are treated as undirected)
+        component_of = {node_id: node_id for node_id in core_ids}
+
+        def find(node_id):
+            while component_of[node_id] != node_id:
+                component_of[node_id] = component_of[component_of[node_id]]
+                node_id = component_of[node_id]
+            return node_id
+
+        for edge in links:
+            component_of[find(edge.source)] = find(edge.target)
+        components = defaultdict(list)
+        for node in cores:
+            components[find(node.id)].append(node.id)
+
+        missing = [
+            (a.id, b.id) for i, a in enumerate(cores) for b in cores[i + 1:]
+            if frozenset((a.id, b.id)) not in connected
+        ]
+        return {
+            'cores': [node.id for node in cores],
+            'links': sorted(links, key=lambda edge: edge.id),
+            'components': list(components.values()),
+            'missing': missing,
+        }
+
+
+_lock = threading.RLock()
+_graph = None
+_version = None
+_state = threading.local()
+
+
+def _init_version():
+    # Starts from the clock so that a counter lost from the cache never repeats versions already seen
+    cache.add(VERSION_KEY, time.time_ns() // 1000000, None)
+
+
+def _current_version():
+    _init_version()
+    return cache.get(VERSION_KEY)
+
+
+def _change_key(version):
+    return f'{CHANGE_PREFIX}:{version}'
+
+
+def _replay(graph, since, version):
+    """Apply the logged changes after version `since` up to `version`; return False if the log has a gap."""
+    if version - since > MAX_REPLAY:
+        return False
+    keys = [_change_key(v) for v in range(since + 1, version + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) != len(keys) or REBUILD in changes.values():
+        return False
+    for key in keys:
+        method, argument = changes[key]
+        getattr(graph, method)(argument)
+    return True
+
+
+@contextmanager
+def link_graph():
+    """
+    Yield this process's graph, first catching up with changes made by other
+    processes. The graph is locked against concurrent updates while in use.
+    """
+    global _graph, _version
+    with _lock:
+        version = _current_version()
+        if _graph is None or version < _version or (version != _version and not _replay(_graph, _version, version)):
+            _graph = LinkGraph.from_database()
+        _version = version
+        yield _graph
+
+
+def _publish(change=REBUILD):
+    global _graph, _version
+    _init_version()
+    version = cache.incr(VERSION_KEY)
+    # Readers seeing the version before the change is logged treat it as a gap and rebuild
+    cache.set(_change_key(version), change, CHANGE_TIMEOUT)
+    with _lock:
+        if change != REBUILD and _graph is not None and _version == version - 1:
+            method, argument = change
+            getattr(_graph, method)(argument)
+            _version = version
+
+
+def on_commit(method, argument):
+    """Apply `graph.<method>(argument)` to the graphs of all processes once the current transaction commits."""
+    if getattr(_state, 'deferred', False):
+        return
+    transaction.on_commit(lambda: _publish((method, argument)))
+
+
+def invalidate_graph():
+    """Discard cached graphs in every process, e.g. after bulk changes that bypass signals."""
+    transaction.on_commit(_publish)
+
+
+@contextmanager
+def graph_updates_deferred():
+    """
+    Skip per-object graph updates from signals in the enclosed block and
+    invalidate the graph once instead. Use around bulk deletions.
+    """
+    _state.deferred = True
+    try:
+        yield
+    finally:
+        _state.deferred = False
+    invalidate_graph()
+
+
+def edge_for(assignment):
+    return Edge(*(getattr(assignment, field) for field in EDGE_FIELDS))
+
+
+def node_for(isdas):
+    return Node(isdas.pk, isdas.isd_as, isdas.isd)
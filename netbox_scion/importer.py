@@ -0,0 +1,290 @@
+"""
+Bulk import of SCION link assignments from CSV, JSON, NDJSON or YAML.
+
+Records are read from a text stream and processed in chunks: the ISD-ASes
+of a chunk are resolved with one query (and remembered for later chunks),
+the chunk is validated as a whole with `LinkAssignmentBatch` and its valid
+rows are written with `bulk_create()`. Every chunk is validated even after
+errors, so all problems are reported at once; the import runs in a single
+transaction that is rolled back unless every record is valid (the changes
+API holds back changes while such a transaction is open).
+
+Input is read incrementally: CSV and NDJSON line by line, JSON arrays one
+element at a time and YAML one document at a time. Only a YAML document
+holding a list of records is loaded as a whole.
+
+Columns use the link assignment export's names (CSV headers or NDJSON keys),
+so exported files can be imported again. `isd_as` is an ISD-AS identifier
+(e.g. `1-ff00:0:110`) or ID and `core` the appliance name.
+"""
+import csv
+import itertools
+import json
+
+import yaml
+from django.db import transaction
+from django.db.models import Q
+
+from .bulk import LinkAssignmentBatch
+from .changelog import ObjectChangeActionChoices, log_bulk_changes
+from .export import EXPORT_COLUMNS
+from .graph import invalidate_graph
+from .models import ISDAS, SCIONLinkAssignment
+from .search import SCIONLinkAssignmentIndex, reindex
+from .summary import schedule_summary_refresh
+
+IMPORT_FORMATS = ('csv', 'json', 'ndjson', 'yaml')
+
+# Records validated and written per round trip
+CHUNK_SIZE = 1000
+
+# Characters read from JSON input at a time
+READ_SIZE = 65536
+
+# Exported columns that cannot be imported
+READ_ONLY_FIELDS = ('id', 'ticket_url', 'created', 'last_updated')
+
+# CSV header or key -> field (comments are not exported but can be imported)
+FIELD_NAMES = {
+    name: key
+    for header, key, _ in (*EXPORT_COLUMNS[SCIONLinkAssignment], ('Comments', 'comments', None))
+    if key not in READ_ONLY_FIELDS
+    for name in (header, key)
+}
+
+
+def guess_format(filename):
+    """Return the import format matching the extension of `filename`, or None."""
+    extension = filename.rsplit('.', 1)[-1].lower()
+    extension = {'yml': 'yaml', 'jsonl': 'ndjson'}.get(extension, extension)
+    return extension if extension in IMPORT_FORMATS else None
+
+
+def iter_json(stream, read_size=READ_SIZE):
+    """
+    Yield the elements of a top-level JSON array (or the top-level value if it
+    is not an array), decoding one element at a time so that memory use is
+    bounded by the largest element. Raises ValueError if the input is invalid.
+    """
+    decoder = json.JSONDecoder()
+    buffer, eof = '', False
+
+    def read():
+        nonlocal buffer, eof
+        chunk = stream.read(read_size)
+        eof = not chunk
+        buffer += chunk
+
+    def peek():
+        # Next non-whitespace character ('' at the end of the input)
+        nonlocal buffer
+        while True:
+            buffer = buffer.lstrip()
+            if buffer or eof:
+                return buffer[:1]
+            read()
+
+    def decode():
+        nonlocal buffer
+        peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer)
+                # A value ending with the buffer (e.g. a number) may continue in the next read
+                if end < len(buffer) or eof:
+                    buffer = buffer[end:]
+                    return value
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f"Invalid JSON: {e}") from e
+            read()
+
+    if peek() != '[':
+        yield decode()
+    else:
+        buffer = buffer[1:]
+        if peek() == ']':
+            buffer = buffer[1:]
+        else:
+            while True:
+                yield decode()
+                separator = peek()
+                buffer = buffer[1:]
+                if separator == ']':
+                    break
+                if separator != ',':
+                    raise ValueError("Invalid JSON: expected ',' or ']' between records")
+    if peek():
+        raise ValueError("Invalid JSON: unexpected data after the document")
+
+
+def iter_yaml(stream):
+    """Yield the records of a YAML stream: each document, or the items of documents holding a list."""
+    try:
+        for document in yaml.safe_load_all(stream):
+            if isinstance(document, list):
+                yield from document
+            elif document is not None:
+                yield document
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid YAML: {e}") from e
+
+
+def iter_records(stream, import_format):
+    """
+    Yield (record number, record) from a text stream. Records are numbered by
+    line (CSV, NDJSON) or position (JSON, YAML). Raises ValueError if a JSON
+    or YAML document cannot be parsed; records before the error are yielded.
+    """
+    if import_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # Empty cells fall back to the field defaults
+            yield reader.line_num, {key: value for key, value in row.items() if value not in ('', None)}
+    elif import_format == 'ndjson':
+        for number, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    yield number, json.loads(line)
+                except ValueError as e:
+                    yield number, ValueError(f"Invalid JSON: {e}")
+    elif import_format == 'json':
+        yield from enumerate(iter_json(stream), 1)
+    elif import_format == 'yaml':
+        yield from enumerate(iter_yaml(stream), 1)
+    else:
+        raise ValueError(f"Unsupported import format: {import_format}")
+
+
+class LinkAssignmentImporter:
+    """
+    Import link assignments from a stream. After `run()`, `created` holds the
+    number of assignments written (zero unless the import succeeded) and
+    `errors` a list of (record number, {field: [messages]}) for invalid records.
+    """
+
+    def __init__(self, chunk_size=CHUNK_SIZE, request=None, queryset=None):
+        self.chunk_size = chunk_size
+        self.request = request
+        # Created assignments must be part of `queryset` (e.g. restricted by object permissions)
+        self.queryset = queryset
+        self.created = 0
+        self.errors = []
+        # ISD-AS identifier or ID -> ISDAS (None if not found), shared by all chunks
+        self._isdases = {}
+        # ISD-ASes that received assignments
+        self._isdas_ids = set()
+
+    def run(self, stream, import_format, dry_run=False):
+        """Import all records of `stream`; return True if every record was valid."""
+        records = iter_records(stream, import_format)
+        with transaction.atomic():
+            try:
+                while chunk := list(itertools.islice(records, self.chunk_size)):
+                    self._import_chunk(chunk)
+            except ValueError as e:
+                self.errors.append((None, {'__all__': [str(e)]}))
+
+            if self.errors or dry_run:
+                transaction.set_rollback(True)
+                if self.errors:
+                    self.created = 0
+            else:
+                # bulk_create() sends no signals
+                invalidate_graph()
+                schedule_summary_refresh(*self._isdas_ids)
+        return not self.errors
+
+    def _resolve_isdases(self, identifiers):
+        """Fetch the ISD-ASes of `identifiers` (ISD-AS strings or IDs) not seen before with one query."""
+        missing = {identifier for identifier in identifiers if identifier not in self._isdases}
+        if not missing:
+            return
+        ids = {int(identifier) for identifier in missing if identifier.isdigit()}
+        names = missing - {str(pk) for pk in ids}
+        for isdas in ISDAS.objects.filter(Q(pk__in=ids) | Q(isd_as__in=names)):
+            self._isdases[str(isdas.pk)] = isdas
+            self._isdases[isdas.isd_as] = isdas
+        for identifier in missing:
+            self._isdases.setdefault(identifier, None)
+
+    def _normalize(self, record):
+        """Return (row, errors) mapping the record's columns to link assignment fields."""
+        if isinstance(record, Exception):
+            return None, {'__all__': [str(record)]}
+        if not isinstance(record, dict):
+            return None, {'__all__': ["Expected a mapping of column names to values"]}
+        row, errors = {}, {}
+        for name, value in record.items():
+            field = FIELD_NAMES.get(name)
+            if field is None:
+                if name not in READ_ONLY_FIELDS:
+                    errors.setdefault(name, []).append("Unknown column")
+                continue
+            row[field] = str(value) if field == 'isd_as' and value is not None else value
+        return row, errors
+
+    def _import_chunk(self, chunk):
+        from .api.serializers import SCIONLinkAssignmentBulkItemSerializer
+
+        numbers, rows, chunk_errors = [], [], []
+        for number, record in chunk:
+            row, errors = self._normalize(record)
+            numbers.append(number)
+            rows.append(row)
+            chunk_errors.append(errors)
+
+        self._resolve_isdases({row['isd_as'] for row in rows if row and row.get('isd_as')})
+        for row, errors in zip(rows, chunk_errors):
+            if row and row.get('isd_as'):
+                isdas = self._isdases[row['isd_as']]
+                if isdas is None:
+                    errors.setdefault('isd_as', []).append(f"ISD-AS {row['isd_as']} not found")
+                else:
+                    row['isd_as'] = isdas.pk
+
+        # Type checks per row (no queries), then relations and uniqueness for the whole chunk
+        valid = []
+        for index, errors in enumerate(chunk_errors):
+            if errors:
+                continue
+            item = SCIONLinkAssignmentBulkItemSerializer(data=rows[index])
+            if item.is_valid():
+                valid.append((index, dict(item.validated_data)))
+            else:
+                errors.update({
+                    field: [str(message) for message in messages] for field, messages in item.errors.items()
+                })
+
+        batch = LinkAssignmentBatch([row for _, row in valid], isdases={
+            isdas.pk: isdas for isdas in self._isdases.values() if isdas is not None
+        })
+        batch.validate()
+        created = []
+        for (index, _), obj, errors in zip(valid, batch.objects, batch.errors):
+            if errors:
+                chunk_errors[index].update(errors)
+            else:
+                created.append((index, obj))
+        objects = [obj for _, obj in created]
+
+        # Valid rows are written even if others failed, so that later chunks are
+        # checked against them; the transaction is rolled back if any row failed
+        SCIONLinkAssignment.objects.bulk_create(objects)
+        self.created += len(objects)
+        self._isdas_ids.update(obj.isd_as_id for obj in objects)
+
+        if self.queryset is not None and objects:
+            permitted = set(self.queryset.filter(pk__in=[obj.pk for obj in objects]).values_list('pk', flat=True))
+            for index, obj in created:
+                if obj.pk not in permitted:
+                    chunk_errors[index]['__all__'] = ["Permission denied for this link assignment"]
+
+        self.errors.extend(
+            (number, errors) for number, errors in zip(numbers, chunk_errors) if errors
+        )
+        if objects and not self.errors:
+            log_bulk_changes(objects, ObjectChangeActionChoices.ACTION_CREATE, self.request)
+            reindex(SCIONLinkAssignmentIndex, SCIONLinkAssignment.objects.select_related('core').filter(
+                pk__in=[obj.pk for obj in objects]
+            ))
@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from netbox_scion.consistency import CHECKS, check_links
+
+
+class Command(BaseCommand):
+    help = (
+        "Check every SCION link assignment against its counterpart on the peer ISD-AS "
+        "(relationship duality, back-reference, swapped underlays) and report inconsistencies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='append', choices=CHECKS, dest='checks',
+            help="Run only this check (may be repeated); all checks by default"
+        )
+        parser.add_argument(
+            '--format', choices=('json', 'text'), default='json',
+            help="Report format (default: json)"
+        )
+        parser.add_argument('--output', help="Write the report to this file instead of stdout")
+        parser.add_argument(
+            '--fail-on-issues', action='store_true',
+            help="Exit with an error if any inconsistency is found"
+        )
+
+    def handle(self, *args, **options):
+        report = check_links(checks=options['checks'] or CHECKS)
+
+        if options['format'] == 'json':
+            output = json.dumps(report, indent=2)
+        else:
+            lines = [f"{check:<24} {count}" for check, count in report['summary'].items()]
+            lines += [
+                f"{issue['check']}: #{issue['id']} {issue['isd_as']} interface {issue['interface_id']} "
+                f"({issue['relationship']}) peer {issue['peer'] or '-'}"
+                + (f" <-> #{issue['counterpart_id']} ({issue['counterpart_relationship']}) "
+                   f"peer {issue['counterpart_peer'] or '-'}" if 'counterpart_id' in issue else "")
+                for issue in report['issues']
+            ]
+            output = "\n".join(lines)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if options['fail_on_issues'] and report['issues']:
+            raise CommandError(f"{len(report['issues'])} link inconsistencies found")
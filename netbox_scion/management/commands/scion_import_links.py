@@ -0,0 +1,47 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from netbox_scion.importer import CHUNK_SIZE, IMPORT_FORMATS, LinkAssignmentImporter, guess_format
+
+
+class Command(BaseCommand):
+    help = (
+        "Import SCION link assignments from a CSV, JSON, NDJSON or YAML file in chunks. "
+        "Nothing is written unless every record is valid; all errors are reported at once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help="File to import, or - for standard input")
+        parser.add_argument(
+            '--format', choices=IMPORT_FORMATS,
+            help="Input format (default: guessed from the file extension)"
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help=f"Records validated and written per batch (default: {CHUNK_SIZE})"
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Validate only; roll back all changes")
+
+    def handle(self, *args, **options):
+        import_format = options['format'] or (guess_format(options['file']) if options['file'] != '-' else None)
+        if import_format is None:
+            raise CommandError("Cannot guess the input format; use --format")
+
+        importer = LinkAssignmentImporter(chunk_size=options['chunk_size'])
+        if options['file'] == '-':
+            importer.run(sys.stdin, import_format, dry_run=options['dry_run'])
+        else:
+            with open(options['file'], newline='', encoding='utf-8-sig') as stream:
+                importer.run(stream, import_format, dry_run=options['dry_run'])
+
+        for number, errors in importer.errors:
+            location = f"Record {number}" if number is not None else "Input"
+            for field, messages in errors.items():
+                for message in messages:
+                    self.stderr.write(f"{location}: {field}: {message}")
+        if importer.errors:
+            raise CommandError(f"{len(importer.errors)} invalid record(s); nothing was imported")
+
+        verb = "Would import" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {importer.created} link assignment(s)"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from netbox_scion.models import ISDASLinkSummary
+from netbox_scion.summary import refresh_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the per-ISD-AS link summaries (counts by status, relationship and appliance) "
+        "from the link assignments, e.g. after writing assignments outside of the plugin."
+    )
+
+    def handle(self, *args, **options):
+        refresh_summaries()
+        self.stdout.write(self.style.SUCCESS(f"{ISDASLinkSummary.objects.count()} ISD-AS link summaries refreshed"))
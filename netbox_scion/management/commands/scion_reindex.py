@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from netbox_scion.search import indexes, reindex
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the global search cache for the SCION plugin's models in batches, "
+        "without loading whole tables into memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*', metavar='model',
+            help="Model names to reindex (e.g. scionlinkassignment); all plugin models by default"
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help="Objects read per query (default: 1000)")
+
+    def handle(self, *args, **options):
+        selected = {name.lower() for name in options['models']}
+        unknown = selected - {index.model._meta.model_name for index in indexes}
+        if unknown:
+            raise CommandError(f"Unknown model(s): {', '.join(sorted(unknown))}")
+
+        for index in indexes:
+            model_name = index.model._meta.model_name
+            if selected and model_name not in selected:
+                continue
+            # Swap the cached values atomically so search never sees a half-built index
+            with transaction.atomic():
+                count = reindex(index, batch_size=options['batch_size'])
+            self.stdout.write(f"{index.model._meta.verbose_name_plural}: {count} cached values")
+        self.stdout.write(self.style.SUCCESS("Search cache rebuilt"))
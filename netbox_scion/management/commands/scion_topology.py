@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from netbox_scion.models import ISDAS, SCIONLinkAssignment
+from netbox_scion.topology import DEFAULT_STATUSES, dump_topologies, render_topology
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the border router section of SCION topology.json for one ISD-AS (optionally a single "
+        "appliance), or dump the topology of every ISD-AS to a directory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('isd_as', nargs='*', help="ISD-AS identifiers (e.g. 1-ff00:0:110); all with --output-dir")
+        parser.add_argument('--core', help="Render only this appliance (requires a single ISD-AS)")
+        parser.add_argument(
+            '--status', action='append', dest='statuses',
+            choices=[choice[0] for choice in SCIONLinkAssignment.STATUS_CHOICES],
+            help="Link assignment status to include (may be repeated; default: ACTIVE)"
+        )
+        parser.add_argument('--output-dir', help="Write one <isd_as>.json per ISD-AS to this directory")
+        parser.add_argument('--workers', type=int, default=4, help="Parallel workers for --output-dir (default: 4)")
+
+    def handle(self, *args, **options):
+        statuses = tuple(options['statuses'] or DEFAULT_STATUSES)
+        isdases = None
+        if options['isd_as']:
+            isdases = list(ISDAS.objects.filter(isd_as__in=options['isd_as']))
+            missing = set(options['isd_as']) - {isdas.isd_as for isdas in isdases}
+            if missing:
+                raise CommandError(f"ISD-AS not found: {', '.join(sorted(missing))}")
+
+        if options['output_dir']:
+            if options['core']:
+                raise CommandError("--core cannot be combined with --output-dir")
+            paths = dump_topologies(
+                options['output_dir'], isdases=isdases, statuses=statuses, workers=options['workers']
+            )
+            self.stdout.write(self.style.SUCCESS(f"Wrote {len(paths)} topologies to {options['output_dir']}"))
+            return
+
+        if not isdases or len(isdases) != 1:
+            raise CommandError("Specify exactly one ISD-AS, or use --output-dir")
+        isdas = isdases[0]
+        core = None
+        if options['core']:
+            core = isdas.appliances.filter(name=options['core']).first()
+            if core is None:
+                raise CommandError(f"Appliance {options['core']} not found for {isdas}")
+        self.stdout.write(json.dumps(render_topology(isdas, core=core, statuses=statuses), indent=2))
@@ -0,0 +1,21 @@
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# Shared with the migration that creates the indexes when pg_trgm is available
+trigram = import_module('netbox_scion.migrations.0022_search_trigram_indexes')
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the trigram indexes used by SCION search, e.g. after pg_trgm was installed "
+        "once the plugin migrations had already been applied. Existing indexes are kept."
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Trigram indexes require PostgreSQL")
+        if not trigram.add_trigram_indexes(connection):
+            raise CommandError("pg_trgm is not available; run 'CREATE EXTENSION pg_trgm' as a superuser first")
+        self.stdout.write(self.style.SUCCESS(f"{len(trigram.TRIGRAM_INDEXES)} trigram indexes in place"))
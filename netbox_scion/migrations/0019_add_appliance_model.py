@@ -0,0 +1,47 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_scion', '0018_fix_peer_unique_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Appliance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('name', models.CharField(help_text='Name of the appliance', max_length=255)),
+                ('isd_as', models.ForeignKey(
+                    help_text='ISD-AS this appliance belongs to',
+                    on_delete=django.db.models.deletion.CASCADE,
+                    # No reverse accessor while ISDAS.appliances (JSON) still exists; named in 0021
+                    related_name='+',
+                    to='netbox_scion.isdas',
+                    verbose_name='ISD-AS',
+                )),
+            ],
+            options={
+                'verbose_name': 'Appliance',
+                'verbose_name_plural': 'Appliances',
+                'ordering': ['isd_as', 'name'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='appliance',
+            constraint=models.UniqueConstraint(fields=('isd_as', 'name'), name='unique_appliance_per_isdas'),
+        ),
+        # Temporary nullable FK; populated in 0020 and renamed to `core` in 0021
+        migrations.AddField(
+            model_name='scionlinkassignment',
+            name='appliance',
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='+',
+                to='netbox_scion.appliance',
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def appliances_to_rows(apps, schema_editor):
+    """
+    Create an Appliance row for every entry of ISDAS.appliances (plus any
+    appliance referenced only by a link assignment) and point each link
+    assignment at its Appliance.
+    """
+    ISDAS = apps.get_model('netbox_scion', 'ISDAS')
+    Appliance = apps.get_model('netbox_scion', 'Appliance')
+    Assignment = apps.get_model('netbox_scion', 'SCIONLinkAssignment')
+
+    for isdas_id, appliances in ISDAS.objects.values_list('pk', 'appliances').iterator(chunk_size=BATCH_SIZE):
+        names = []
+        for name in appliances or []:
+            name = str(name).strip()
+            if name and name not in names:
+                names.append(name)
+        for name in Assignment.objects.filter(isd_as_id=isdas_id).values_list('core', flat=True).distinct():
+            if name not in names:
+                names.append(name)
+        if not names:
+            continue
+
+        Appliance.objects.bulk_create([Appliance(isd_as_id=isdas_id, name=name) for name in names])
+        for appliance in Appliance.objects.filter(isd_as_id=isdas_id):
+            Assignment.objects.filter(isd_as_id=isdas_id, core=appliance.name).update(appliance=appliance)
+
+
+def rows_to_appliances(apps, schema_editor):
+    ISDAS = apps.get_model('netbox_scion', 'ISDAS')
+    Appliance = apps.get_model('netbox_scion', 'Appliance')
+    Assignment = apps.get_model('netbox_scion', 'SCIONLinkAssignment')
+
+    for isdas_id in ISDAS.objects.values_list('pk', flat=True).iterator(chunk_size=BATCH_SIZE):
+        appliances = list(Appliance.objects.filter(isd_as_id=isdas_id).order_by('pk'))
+        ISDAS.objects.filter(pk=isdas_id).update(appliances=[appliance.name for appliance in appliances])
+        for appliance in appliances:
+            Assignment.objects.filter(appliance=appliance).update(core=appliance.name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_scion', '0019_add_appliance_model'),
+    ]
+
+    operations = [
+        migrations.RunPython(appliances_to_rows, rows_to_appliances),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_scion', '0020_migrate_appliances'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='scionlinkassignment',
+            name='core',
+        ),
+        migrations.RenameField(
+            model_name='scionlinkassignment',
+            old_name='appliance',
+            new_name='core',
+        ),
+        migrations.AlterField(
+            model_name='scionlinkassignment',
+            name='core',
+            field=models.ForeignKey(
+                help_text='Appliance for this assignment',
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='link_assignments',
+                to='netbox_scion.appliance',
+                verbose_name='Appliance',
+            ),
+        ),
+        migrations.RemoveField(
+            model_name='isdas',
+            name='appliances',
+        ),
+        migrations.AlterField(
+            model_name='appliance',
+            name='isd_as',
+            field=models.ForeignKey(
+                help_text='ISD-AS this appliance belongs to',
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='appliances',
+                to='netbox_scion.isdas',
+                verbose_name='ISD-AS',
+            ),
+        ),
+    ]
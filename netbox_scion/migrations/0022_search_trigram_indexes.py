@@ -0,0 +1,79 @@
+import logging
+
+from django.db import DatabaseError, migrations, transaction
+
+logger = logging.getLogger('netbox_scion')
+
+# (table, column) pairs searched with `icontains` by the filtersets
+TRIGRAM_INDEXES = (
+    ('netbox_scion_organization', 'short_name'),
+    ('netbox_scion_organization', 'full_name'),
+    ('netbox_scion_organization', 'description'),
+    ('netbox_scion_isdas', 'isd_as'),
+    ('netbox_scion_isdas', 'description'),
+    ('netbox_scion_appliance', 'name'),
+    ('netbox_scion_scionlinkassignment', 'peer_name'),
+    ('netbox_scion_scionlinkassignment', 'peer'),
+    ('netbox_scion_scionlinkassignment', 'ticket'),
+)
+
+
+def _index_name(table, column):
+    return f'{table}_{column}_trgm'
+
+
+def add_trigram_indexes(connection):
+    """
+    Create GIN trigram indexes matching the expression Django generates for
+    `icontains` on PostgreSQL (UPPER(col::text) LIKE UPPER(...)). Returns False
+    when pg_trgm is not installed and cannot be created by the database user.
+    Also used by the `scion_trigram_indexes` management command.
+    """
+    with connection.cursor() as cursor:
+        try:
+            with transaction.atomic(using=connection.alias):
+                cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except DatabaseError:
+            pass
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return False
+
+        for table, column in TRIGRAM_INDEXES:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {_index_name(table, column)} '
+                f'ON {table} USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+            )
+    return True
+
+
+def create_trigram_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    if not add_trigram_indexes(connection):
+        logger.warning(
+            "pg_trgm is not available; SCION search will work without trigram indexes. "
+            "Run 'CREATE EXTENSION pg_trgm' as a superuser, then 'python manage.py scion_trigram_indexes' "
+            "to add them."
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for table, column in TRIGRAM_INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS {_index_name(table, column)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_scion', '0021_link_assignment_appliance_fk'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
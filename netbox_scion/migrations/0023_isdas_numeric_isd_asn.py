@@ -0,0 +1,51 @@
+import logging
+
+from django.db import migrations, models
+
+from netbox_scion.utils import parse_isd_as
+
+logger = logging.getLogger('netbox_scion')
+
+BATCH_SIZE = 1000
+
+
+def populate_isd_asn(apps, schema_editor):
+    """Derive the numeric ISD and AS number of every existing ISD-AS."""
+    ISDAS = apps.get_model('netbox_scion', 'ISDAS')
+
+    batch = []
+    for isdas in ISDAS.objects.only('pk', 'isd_as').iterator(chunk_size=BATCH_SIZE):
+        try:
+            isdas.isd, isdas.asn = parse_isd_as(isdas.isd_as)
+        except ValueError as e:
+            logger.warning("ISD-AS %s (ID %s) could not be parsed (%s); storing 0-0", isdas.isd_as, isdas.pk, e)
+            isdas.isd, isdas.asn = 0, 0
+        batch.append(isdas)
+        if len(batch) >= BATCH_SIZE:
+            ISDAS.objects.bulk_update(batch, ['isd', 'asn'])
+            batch = []
+    if batch:
+        ISDAS.objects.bulk_update(batch, ['isd', 'asn'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_scion', '0022_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='isdas',
+            name='isd',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='ISD'),
+        ),
+        migrations.AddField(
+            model_name='isdas',
+            name='asn',
+            field=models.PositiveBigIntegerField(
+                blank=True, editable=False, null=True, verbose_name='AS number', help_text='48-bit AS number'
+            ),
+        ),
+        migrations.RunPython(populate_isd_asn, migrations.RunPython.noop),
+    ]
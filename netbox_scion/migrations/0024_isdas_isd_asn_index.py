@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_scion', '0023_isdas_numeric_isd_asn'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='isdas',
+            name='isd',
+            field=models.PositiveIntegerField(blank=True, editable=False, verbose_name='ISD'),
+        ),
+        migrations.AlterField(
+            model_name='isdas',
+            name='asn',
+            field=models.PositiveBigIntegerField(
+                blank=True, db_index=True, editable=False, verbose_name='AS number', help_text='48-bit AS number'
+            ),
+        ),
+        migrations.AlterModelOptions(
+            name='isdas',
+            options={
+                'ordering': ['isd', 'asn', 'isd_as'],
+                'verbose_name': 'ISD-AS',
+                'verbose_name_plural': 'ISD-ASes',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='isdas',
+            index=models.Index(fields=['isd', 'asn'], name='netbox_scion_isdas_isd_asn'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+from netbox_scion.utils import parse_peer
+
+BATCH_SIZE = 1000
+
+
+def populate_peer_reference(apps, schema_editor):
+    """Resolve the `peer` string of every link assignment into peer ISD-AS and interface."""
+    ISDAS = apps.get_model('netbox_scion', 'ISDAS')
+    Assignment = apps.get_model('netbox_scion', 'SCIONLinkAssignment')
+
+    isdas_ids = {(isd, asn): pk for pk, isd, asn in ISDAS.objects.values_list('pk', 'isd', 'asn').iterator()}
+
+    batch = []
+    queryset = Assignment.objects.filter(peer__isnull=False).exclude(peer='').only('pk', 'peer')
+    for assignment in queryset.iterator(chunk_size=BATCH_SIZE):
+        try:
+            isd, asn, interface_id = parse_peer(assignment.peer)
+        except ValueError:
+            continue
+        assignment.peer_isd_as_id = isdas_ids.get((isd, asn))
+        assignment.peer_interface_id = interface_id
+        batch.append(assignment)
+        if len(batch) >= BATCH_SIZE:
+            Assignment.objects.bulk_update(batch, ['peer_isd_as', 'peer_interface_id'])
+            batch = []
+    if batch:
+        Assignment.objects.bulk_update(batch, ['peer_isd_as', 'peer_interface_id'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_scion', '0024_isdas_isd_asn_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scionlinkassignment',
+            name='peer_isd_as',
+            field=models.ForeignKey(
+                blank=True, db_index=False, editable=False, null=True,
+                on_delete=django.db.models.deletion.SET_NULL, related_name='inbound_link_assignments',
+                to='netbox_scion.isdas', verbose_name='Peer ISD-AS'
+            ),
+        ),
+        migrations.AddField(
+            model_name='scionlinkassignment',
+            name='peer_interface_id',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Peer interface ID'),
+        ),
+        migrations.AddIndex(
+            model_name='scionlinkassignment',
+            index=models.Index(fields=['peer_isd_as', 'peer_interface_id'], name='netbox_scion_link_peer'),
+        ),
+        migrations.AddIndex(
+            model_name='scionlinkassignment',
+            index=models.Index(
+                condition=models.Q(peer__isnull=False, peer_isd_as__isnull=True),
+                fields=['peer'], name='netbox_scion_link_dangling'
+            ),
+        ),
+        # Data last: no schema changes may follow row updates in the same transaction
+        migrations.RunPython(populate_peer_reference, migrations.RunPython.noop),
+    ]
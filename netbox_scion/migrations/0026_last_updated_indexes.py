@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_scion', '0025_link_assignment_peer_reference'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='organization',
+            index=models.Index(fields=['last_updated', 'id'], name='netbox_scion_org_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='isdas',
+            index=models.Index(fields=['last_updated', 'id'], name='netbox_scion_isdas_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='scionlinkassignment',
+            index=models.Index(fields=['last_updated', 'id'], name='netbox_scion_link_updated'),
+        ),
+    ]
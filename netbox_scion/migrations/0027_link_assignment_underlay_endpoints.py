@@ -0,0 +1,78 @@
+from django.contrib.postgres.indexes import GistIndex
+from django.db import migrations, models
+import ipam.fields
+
+from netbox_scion.utils import parse_underlay
+
+BATCH_SIZE = 1000
+
+
+def populate_underlay_endpoints(apps, schema_editor):
+    """Parse the underlay strings of every link assignment into IP and port columns."""
+    Assignment = apps.get_model('netbox_scion', 'SCIONLinkAssignment')
+
+    fields = ['local_underlay_ip', 'local_underlay_port', 'peer_underlay_ip', 'peer_underlay_port']
+    batch = []
+    queryset = Assignment.objects.exclude(local_underlay='', peer_underlay='').only(
+        'pk', 'local_underlay', 'peer_underlay'
+    )
+    for assignment in queryset.iterator(chunk_size=BATCH_SIZE):
+        for prefix in ('local', 'peer'):
+            try:
+                ip, port = parse_underlay(getattr(assignment, f'{prefix}_underlay') or '')
+            except ValueError:
+                continue
+            setattr(assignment, f'{prefix}_underlay_ip', str(ip))
+            setattr(assignment, f'{prefix}_underlay_port', port)
+        batch.append(assignment)
+        if len(batch) >= BATCH_SIZE:
+            Assignment.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        Assignment.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_scion', '0026_last_updated_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scionlinkassignment',
+            name='local_underlay_ip',
+            field=ipam.fields.IPAddressField(blank=True, editable=False, null=True, verbose_name='Local underlay IP'),
+        ),
+        migrations.AddField(
+            model_name='scionlinkassignment',
+            name='local_underlay_port',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Local underlay port'),
+        ),
+        migrations.AddField(
+            model_name='scionlinkassignment',
+            name='peer_underlay_ip',
+            field=ipam.fields.IPAddressField(blank=True, editable=False, null=True, verbose_name='Peer underlay IP'),
+        ),
+        migrations.AddField(
+            model_name='scionlinkassignment',
+            name='peer_underlay_port',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Peer underlay port'),
+        ),
+        migrations.AddIndex(
+            model_name='scionlinkassignment',
+            index=GistIndex(fields=['local_underlay_ip'], name='netbox_scion_link_local_ip', opclasses=['inet_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='scionlinkassignment',
+            index=GistIndex(fields=['peer_underlay_ip'], name='netbox_scion_link_peer_ip', opclasses=['inet_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='scionlinkassignment',
+            index=models.Index(
+                fields=['core', 'local_underlay_ip', 'local_underlay_port'], name='netbox_scion_link_local_ep'
+            ),
+        ),
+        # Data last: no schema changes may follow row updates in the same transaction
+        migrations.RunPython(populate_underlay_endpoints, migrations.RunPython.noop),
+    ]
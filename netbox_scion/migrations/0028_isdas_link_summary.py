@@ -0,0 +1,79 @@
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils import timezone
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+
+COUNTS = {
+    'link_count': None,
+    'active_count': Q(link_assignments__status='ACTIVE'),
+    'reserved_count': Q(link_assignments__status='RESERVED'),
+    'planned_count': Q(link_assignments__status='PLANNED'),
+    'parent_count': Q(link_assignments__relationship='PARENT'),
+    'child_count': Q(link_assignments__relationship='CHILD'),
+    'core_count': Q(link_assignments__relationship='CORE'),
+}
+
+
+def populate_link_summaries(apps, schema_editor):
+    """Compute the link summary of every ISD-AS."""
+    ISDAS = apps.get_model('netbox_scion', 'ISDAS')
+    Assignment = apps.get_model('netbox_scion', 'SCIONLinkAssignment')
+    Summary = apps.get_model('netbox_scion', 'ISDASLinkSummary')
+
+    appliance_counts = defaultdict(dict)
+    for isdas_id, core_id, count in Assignment.objects.values('isd_as_id', 'core_id').annotate(
+        count=Count('pk')
+    ).order_by().values_list('isd_as_id', 'core_id', 'count').iterator():
+        appliance_counts[isdas_id][str(core_id)] = count
+
+    now = timezone.now()
+    rows = ISDAS.objects.annotate(**{
+        column: Count('link_assignments', filter=condition) for column, condition in COUNTS.items()
+    }).values_list('pk', *COUNTS)
+    batch = []
+    for pk, *counts in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(Summary(
+            isd_as_id=pk, appliance_counts=appliance_counts[pk], last_updated=now, **dict(zip(COUNTS, counts))
+        ))
+        if len(batch) >= BATCH_SIZE:
+            Summary.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Summary.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_scion', '0027_link_assignment_underlay_endpoints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ISDASLinkSummary',
+            fields=[
+                ('isd_as', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='link_summary',
+                    serialize=False, to='netbox_scion.isdas', verbose_name='ISD-AS'
+                )),
+                ('link_count', models.PositiveIntegerField(default=0, verbose_name='Links')),
+                ('active_count', models.PositiveIntegerField(default=0, verbose_name='Active')),
+                ('reserved_count', models.PositiveIntegerField(default=0, verbose_name='Reserved')),
+                ('planned_count', models.PositiveIntegerField(default=0, verbose_name='Planned')),
+                ('parent_count', models.PositiveIntegerField(default=0, verbose_name='Parent links')),
+                ('child_count', models.PositiveIntegerField(default=0, verbose_name='Child links')),
+                ('core_count', models.PositiveIntegerField(default=0, verbose_name='Core links')),
+                ('appliance_counts', models.JSONField(blank=True, default=dict)),
+                ('last_updated', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'ISD-AS link summary',
+                'verbose_name_plural': 'ISD-AS link summaries',
+            },
+        ),
+        migrations.RunPython(populate_link_summaries, migrations.RunPython.noop),
+    ]
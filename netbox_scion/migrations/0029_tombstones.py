@@ -0,0 +1,67 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import netbox_scion.models
+
+BATCH_SIZE = 1000
+
+MODELS = ('organization', 'isdas', 'scionlinkassignment')
+
+
+def copy_deletions(apps, schema_editor):
+    """Create tombstones for the deletions recorded in the change log so far."""
+    ObjectChange = apps.get_model('core', 'ObjectChange')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Tombstone = apps.get_model('netbox_scion', 'Tombstone')
+
+    object_types = ContentType.objects.filter(app_label='netbox_scion', model__in=MODELS)
+    deletions = ObjectChange.objects.filter(
+        action='delete', changed_object_type__in=object_types
+    ).order_by('time', 'pk').values_list('changed_object_type_id', 'changed_object_id', 'time')
+    batch = []
+    for object_type_id, object_id, time in deletions.iterator(chunk_size=BATCH_SIZE):
+        batch.append(Tombstone(object_type_id=object_type_id, object_id=object_id, time=time))
+        if len(batch) >= BATCH_SIZE:
+            Tombstone.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Tombstone.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        # ObjectChange moved from extras to core in NetBox 4.1
+        ('core', '0011_move_objectchange'),
+        ('netbox_scion', '0028_isdas_link_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('time', models.DateTimeField(default=django.utils.timezone.now)),
+                ('object_type', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype'
+                )),
+            ],
+            options={
+                'verbose_name': 'tombstone',
+                'verbose_name_plural': 'tombstones',
+                'indexes': [models.Index(fields=['time', 'id'], name='netbox_scion_tombstone_time')],
+            },
+        ),
+        migrations.AlterField(
+            model_name='scionlinkassignment',
+            name='peer_isd_as',
+            field=models.ForeignKey(
+                blank=True, db_index=False, editable=False, null=True,
+                on_delete=netbox_scion.models.SET_NULL_TOUCH, related_name='inbound_link_assignments',
+                to='netbox_scion.isdas', verbose_name='Peer ISD-AS'
+            ),
+        ),
+        migrations.RunPython(copy_deletions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_scion', '0029_tombstones'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='isdas',
+            name='isd_as',
+            field=models.CharField(
+                help_text="ISD-AS identifier in format '{isd}-{as}' (e.g., '1-ff00:0:110' or '1-1')",
+                max_length=32,
+                unique=True,
+                validators=[
+                    django.core.validators.RegexValidator(
+                        code='invalid_isd_as',
+                        message="ISD-AS must be in format '{isd}-{as}' (e.g., '1-ff00:0:110' or '1-1')",
+                        regex='^\\d{1,5}-([0-9a-fA-F]{1,4}:[0-9a-fA-F]{1,4}:[0-9a-fA-F]{1,4}|\\d{1,10})$',
+                    )
+                ],
+            ),
+        ),
+    ]
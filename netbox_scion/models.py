@@ -1,9 +1,17 @@
-from django.db import models
+import itertools
+
+from django.conf import settings
+from django.contrib.postgres.indexes import GistIndex
+from django.db import models, transaction
+from django.db.models import F, Window
+from django.db.models.functions import Lead
 from django.core.exceptions import ValidationError
-import ipaddress
 from django.urls import reverse
+from django.utils import timezone
 from django.core.validators import RegexValidator
+from ipam.fields import IPAddressField
 from netbox.models import NetBoxModel
+from .utils import parse_isd_as, parse_peer, parse_underlay
 
 try:
     from django.contrib.postgres.fields import ArrayField
@@ -12,6 +20,16 @@ except ImportError:
     POSTGRES_AVAILABLE = False
 
 
+def SET_NULL_TOUCH(collector, field, sub_objs, using):
+    """
+    `on_delete` handler that sets the reference to NULL like `SET_NULL` and
+    bumps `last_updated` of the referencing rows, so that API clients (ETags,
+    changes feed) see them as changed.
+    """
+    collector.add_field_update(field, None, sub_objs)
+    collector.add_field_update(sub_objs.model._meta.get_field('last_updated'), timezone.now(), sub_objs)
+
+
 class Organization(NetBoxModel):
     """
     An organization that operates ISD-ASes.
@@ -38,10 +56,19 @@ class Organization(NetBoxModel):
         verbose_name = "Organization"
         verbose_name_plural = "Organizations"
         ordering = ['short_name']
+        indexes = [
+            # Delta sync (changes since a cursor)
+            models.Index(fields=['last_updated', 'id'], name='netbox_scion_org_updated'),
+        ]
 
     def __str__(self):
         return self.short_name
 
+    def delete(self, using=None, keep_parents=False):
+        # Record the cascade to ISD-ASes and link assignments in the changelog in bulk
+        from .changelog import delete_with_changelog
+        return delete_with_changelog([self], using=using)
+
     @property
     def display(self):
         return self.short_name
@@ -54,8 +81,8 @@ class ISDAS(NetBoxModel):
     """
     An ISD-AS (Isolation Domain - Autonomous System) in the SCION network.
     """
-    # Updated regex to support both formats: 1-ff00:0:110 and 1-1
-    ISD_AS_REGEX = r'^\d+-([0-9a-fA-F]+:[0-9a-fA-F]+:[0-9a-fA-F]+|\d+)$'
+    # Supports both formats: 1-ff00:0:110 and 1-1; the ranges are checked by parse_isd_as() in clean()
+    ISD_AS_REGEX = r'^\d{1,5}-([0-9a-fA-F]{1,4}:[0-9a-fA-F]{1,4}:[0-9a-fA-F]{1,4}|\d{1,10})$'
     
     isd_as = models.CharField(
         max_length=32,
@@ -69,6 +96,19 @@ class ISDAS(NetBoxModel):
         ],
         help_text="ISD-AS identifier in format '{isd}-{as}' (e.g., '1-ff00:0:110' or '1-1')"
     )
+    # Numeric parts of `isd_as`, derived in clean()/save() for natural ordering and range queries
+    isd = models.PositiveIntegerField(
+        blank=True,
+        editable=False,
+        verbose_name='ISD',
+    )
+    asn = models.PositiveBigIntegerField(
+        blank=True,
+        editable=False,
+        db_index=True,
+        verbose_name='AS number',
+        help_text="48-bit AS number"
+    )
     description = models.TextField(
         blank=True,
         help_text="Optional description"
@@ -83,22 +123,86 @@ class ISDAS(NetBoxModel):
         related_name='isd_ases',
         help_text="Organization that operates this ISD-AS"
     )
-    
-    # Use JSONField for consistency with NetBox
-    appliances = models.JSONField(
-        default=list,
-        blank=True,
-        help_text="List of appliances for this ISD-AS"
-    )
+
+    # Relations read by serialize_object(), fetched once per batch when deletions are logged in bulk
+    changelog_prefetch = ('tags', models.Prefetch('appliances', to_attr='changelog_appliances'))
 
     class Meta:
         verbose_name = "ISD-AS"
         verbose_name_plural = "ISD-ASes"
-        ordering = ['isd_as']
+        ordering = ['isd', 'asn', 'isd_as']
+        indexes = [
+            models.Index(fields=['isd', 'asn'], name='netbox_scion_isdas_isd_asn'),
+            models.Index(fields=['last_updated', 'id'], name='netbox_scion_isdas_updated'),
+        ]
 
     def __str__(self):
         return self.isd_as
 
+    def clean(self):
+        super().clean()
+        if self.isd_as:
+            try:
+                self.isd, self.asn = parse_isd_as(self.isd_as)
+            except ValueError as e:
+                raise ValidationError({'isd_as': str(e)})
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Peer references are re-resolved only when the identifier changes
+        instance._loaded_isd_as = instance.__dict__.get('isd_as')
+        return instance
+
+    def save(self, *args, **kwargs):
+        try:
+            self.isd, self.asn = parse_isd_as(self.isd_as)
+        except ValueError as e:
+            raise ValidationError({'isd_as': str(e)})
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'isd_as' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'isd', 'asn'}
+        previous = None if self._state.adding else getattr(self, '_loaded_isd_as', None)
+        changed = self._state.adding or (
+            previous != self.isd_as and (update_fields is None or 'isd_as' in update_fields)
+        )
+        super().save(*args, **kwargs)
+        if changed:
+            self.resolve_peer_references()
+        self._loaded_isd_as = self.isd_as
+
+    def resolve_peer_references(self):
+        """
+        Re-resolve the link assignments whose peer may have to point at this
+        ISD-AS, e.g. after it has been added or renamed: unresolved peers in its
+        ISD, links pointing at it and links pointing at other notations of its
+        AS. Uses `SCIONLinkAssignment.resolve_peers()`, so both paths match on
+        the parsed (ISD, AS) and agree on which links point where.
+        """
+        from .graph import invalidate_graph
+
+        same_as = ISDAS.objects.filter(isd=self.isd, asn=self.asn)
+        candidates = list(SCIONLinkAssignment.objects.filter(
+            # The ISD narrows unresolved peers down in SQL (allowing for whitespace and leading zeros)
+            models.Q(peer_isd_as__isnull=True, peer__regex=rf'^\s*0*{self.isd}-')
+            | models.Q(peer_isd_as=self)
+            | models.Q(peer_isd_as__in=same_as)
+        ).only('pk', 'peer', 'peer_isd_as', 'peer_interface_id'))
+        before = {assignment.pk: (assignment.peer_isd_as_id, assignment.peer_interface_id) for assignment in candidates}
+        SCIONLinkAssignment.resolve_peers(candidates)
+
+        now = timezone.now()
+        changed = []
+        for assignment in candidates:
+            if (assignment.peer_isd_as_id, assignment.peer_interface_id) != before[assignment.pk]:
+                # The serialized assignment changes, so it must show up as changed to API clients
+                assignment.last_updated = now
+                changed.append(assignment)
+        if changed:
+            SCIONLinkAssignment.objects.bulk_update(changed, ['peer_isd_as', 'peer_interface_id', 'last_updated'])
+            # bulk_update() sends no signals
+            invalidate_graph()
+
     @property
     def display(self):
         return self.isd_as
@@ -106,12 +210,142 @@ class ISDAS(NetBoxModel):
     def get_absolute_url(self):
         return reverse('plugins:netbox_scion:isdas', args=[self.pk])
 
+    @property
+    def appliance_names(self):
+        """Return the names of this ISD-AS's appliances (uses prefetched appliances if available)"""
+        return [appliance.name for appliance in self.appliances.all()]
+
     @property
     def appliances_display(self):
         """Return appliances as a comma-separated string for display"""
-        if isinstance(self.appliances, list):
-            return ', '.join(self.appliances)
-        return str(self.appliances)
+        return ', '.join(self.appliance_names)
+
+    @staticmethod
+    def interface_id_range():
+        """Return the (min, max) interface ID range configured for allocation."""
+        plugin_settings = settings.PLUGINS_CONFIG.get('netbox_scion', {})
+        return plugin_settings.get('interface_id_min', 1), plugin_settings.get('interface_id_max', 65535)
+
+    def get_free_interface_ids(self, count=1, start=None, end=None):
+        """
+        Return up to `count` unused interface IDs in [start, end] (defaults to the
+        configured range), lowest first. Gaps are found with a single window query
+        over the (isd_as, interface_id) index instead of loading every assignment.
+        """
+        default_start, default_end = self.interface_id_range()
+        start = default_start if start is None else start
+        end = default_end if end is None else end
+
+        used = SCIONLinkAssignment.objects.filter(
+            isd_as=self, interface_id__gte=start, interface_id__lte=end
+        )
+        lowest = used.order_by('interface_id').values_list('interface_id', flat=True).first()
+        if lowest is None:
+            return list(range(start, min(start + count, end + 1)))
+
+        # Used IDs followed by a gap, paired with the next used ID (end + 1 after the last one)
+        gaps = used.annotate(
+            next_id=Window(Lead('interface_id', default=end + 1), order_by=F('interface_id').asc())
+        ).filter(
+            next_id__gt=F('interface_id') + 1
+        ).order_by('interface_id').values_list('interface_id', 'next_id')
+
+        free = []
+        for previous_id, next_id in itertools.chain([(start - 1, lowest)], gaps.iterator()):
+            free.extend(range(previous_id + 1, min(next_id, previous_id + 1 + count - len(free))))
+            if len(free) >= count:
+                break
+        return free
+
+    def reserve_interface_ids(self, count, core, relationship, start=None, end=None, **fields):
+        """
+        Atomically allocate `count` free interface IDs on appliance `core` and create
+        RESERVED link assignments for them with a single INSERT. The ISD-AS row is
+        locked for the duration, serializing concurrent allocations.
+        """
+        from .changelog import ObjectChangeActionChoices, log_bulk_changes
+        from .search import SCIONLinkAssignmentIndex, reindex
+        from .summary import schedule_summary_refresh
+
+        if core.isd_as_id != self.pk:
+            raise ValidationError({'core': 'Appliance does not belong to this ISD-AS'})
+
+        with transaction.atomic():
+            ISDAS.objects.select_for_update().get(pk=self.pk)
+            interface_ids = self.get_free_interface_ids(count, start=start, end=end)
+            if len(interface_ids) < count:
+                raise ValidationError(
+                    f'Only {len(interface_ids)} free interface ID(s) available for {self} in the requested range'
+                )
+            assignments = [
+                SCIONLinkAssignment(
+                    isd_as=self,
+                    core=core,
+                    interface_id=interface_id,
+                    relationship=relationship,
+                    status=SCIONLinkAssignment.STATUS_RESERVED,
+                    **fields
+                )
+                for interface_id in interface_ids
+            ]
+            # bulk_create() bypasses save(), which keeps the parsed endpoints in sync
+            for assignment in assignments:
+                assignment.set_underlay_endpoints()
+            assignments = SCIONLinkAssignment.objects.bulk_create(assignments)
+            log_bulk_changes(assignments, ObjectChangeActionChoices.ACTION_CREATE)
+            # bulk_create() sends no signals
+            schedule_summary_refresh(self.pk)
+            reindex(SCIONLinkAssignmentIndex, SCIONLinkAssignment.objects.select_related('core').filter(
+                pk__in=[assignment.pk for assignment in assignments]
+            ))
+        return assignments
+
+    def delete(self, using=None, keep_parents=False):
+        # Record the cascade to appliances and link assignments in the changelog in bulk
+        from .changelog import delete_with_changelog
+        return delete_with_changelog([self], using=using)
+
+    def serialize_object(self, exclude=None):
+        # Appliances live in their own table; keep their names in the ISD-AS changelog
+        data = super().serialize_object(exclude=exclude)
+        appliances = getattr(self, 'changelog_appliances', None)
+        if appliances is not None:
+            data['appliances'] = [appliance.name for appliance in appliances]
+        else:
+            data['appliances'] = list(self.appliances.values_list('name', flat=True))
+        return data
+
+
+class Appliance(models.Model):
+    """
+    An appliance (e.g. border router) belonging to an ISD-AS. Link assignments
+    reference their appliance by foreign key, so renames touch a single row.
+    """
+    isd_as = models.ForeignKey(
+        ISDAS,
+        on_delete=models.CASCADE,
+        related_name='appliances',
+        verbose_name="ISD-AS",
+        help_text="ISD-AS this appliance belongs to"
+    )
+    name = models.CharField(
+        max_length=255,
+        help_text="Name of the appliance"
+    )
+
+    class Meta:
+        verbose_name = "Appliance"
+        verbose_name_plural = "Appliances"
+        ordering = ['isd_as', 'name']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['isd_as', 'name'],
+                name='unique_appliance_per_isdas'
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
 
 
 class SCIONLinkAssignment(NetBoxModel):
@@ -148,8 +382,10 @@ class SCIONLinkAssignment(NetBoxModel):
         verbose_name="ISD-AS",
         help_text="ISD-AS that owns this interface"
     )
-    core = models.CharField(
-        max_length=255,
+    core = models.ForeignKey(
+        Appliance,
+        on_delete=models.CASCADE,
+        related_name='link_assignments',
         verbose_name="Appliance",
         help_text="Appliance for this assignment"
     )
@@ -180,6 +416,23 @@ class SCIONLinkAssignment(NetBoxModel):
         null=True,  # Allow NULL values
         help_text="Peer identifier (optional) in format '{isd}-{as}#{interface_number}' when provided"
     )
+    # Structured form of `peer`, kept in sync on save; `peer_isd_as` is NULL when the peer is not in the inventory
+    peer_isd_as = models.ForeignKey(
+        ISDAS,
+        on_delete=SET_NULL_TOUCH,
+        related_name='inbound_link_assignments',
+        blank=True,
+        null=True,
+        editable=False,
+        db_index=False,  # Covered by the (peer_isd_as, peer_interface_id) index
+        verbose_name='Peer ISD-AS'
+    )
+    peer_interface_id = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Peer interface ID'
+    )
     local_underlay = models.CharField(
         max_length=300,
         blank=True,
@@ -190,6 +443,31 @@ class SCIONLinkAssignment(NetBoxModel):
         blank=True,
         help_text="Peer underlay endpoint in format ip:port (IPv4 or IPv6; bracketed IPv6 supported)"
     )
+    # Parsed forms of the underlay endpoints, kept in sync on save; NULL when unset
+    local_underlay_ip = IPAddressField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Local underlay IP'
+    )
+    local_underlay_port = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Local underlay port'
+    )
+    peer_underlay_ip = IPAddressField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Peer underlay IP'
+    )
+    peer_underlay_port = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Peer underlay port'
+    )
     # Store arbitrary user input meant to represent a URL. We intentionally do NOT validate
     # or constrain format so that any external system reference can be pasted (full URL,
     # partial path, ID, etc.). For display purposes we'll attempt to coerce it into a URL
@@ -204,6 +482,9 @@ class SCIONLinkAssignment(NetBoxModel):
         help_text="Free-form comments (internal notes)"
     )
 
+    # Relations read by serialize_object() and __str__(), fetched once per batch when deletions are logged in bulk
+    changelog_prefetch = ('tags', 'isd_as')
+
     class Meta:
         verbose_name = "SCION Link Assignment"
         verbose_name_plural = "SCION Link Assignments"
@@ -219,6 +500,24 @@ class SCIONLinkAssignment(NetBoxModel):
                 condition=models.Q(peer__isnull=False) & ~models.Q(peer='')
             )
         ]
+        indexes = [
+            models.Index(fields=['peer_isd_as', 'peer_interface_id'], name='netbox_scion_link_peer'),
+            # Peers that do not resolve to an ISD-AS in the inventory
+            models.Index(
+                fields=['peer'],
+                name='netbox_scion_link_dangling',
+                condition=models.Q(peer__isnull=False, peer_isd_as__isnull=True)
+            ),
+            models.Index(fields=['last_updated', 'id'], name='netbox_scion_link_updated'),
+            # Prefix lookups (`net_contained` etc.) on the underlay IPs
+            GistIndex(fields=['local_underlay_ip'], name='netbox_scion_link_local_ip', opclasses=['inet_ops']),
+            GistIndex(fields=['peer_underlay_ip'], name='netbox_scion_link_peer_ip', opclasses=['inet_ops']),
+            # Local endpoint conflicts on an appliance
+            models.Index(
+                fields=['core', 'local_underlay_ip', 'local_underlay_port'],
+                name='netbox_scion_link_local_ep'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.isd_as} - Interface {self.interface_id}"
@@ -230,6 +529,71 @@ class SCIONLinkAssignment(NetBoxModel):
     def get_absolute_url(self):
         return reverse('plugins:netbox_scion:scionlinkassignment', args=[self.pk])
 
+    @classmethod
+    def resolve_peers(cls, assignments):
+        """
+        Set `peer_isd_as` and `peer_interface_id` of `assignments` from their `peer`
+        strings, looking up all referenced ISD-ASes with a single query.
+        """
+        parsed = []
+        for assignment in assignments:
+            try:
+                parsed.append(parse_peer(assignment.peer) if assignment.peer else None)
+            except ValueError:
+                parsed.append(None)
+
+        keys = {(isd, asn) for isd, asn, _ in filter(None, parsed)}
+        isdases = {}
+        if keys:
+            # Of several notations of the same AS, the oldest ISD-AS (lowest ID) is the peer
+            isdases = {
+                (isdas.isd, isdas.asn): isdas
+                for isdas in ISDAS.objects.filter(
+                    isd__in={k[0] for k in keys}, asn__in={k[1] for k in keys}
+                ).order_by('-pk')
+            }
+
+        for assignment, peer in zip(assignments, parsed):
+            if peer is None:
+                assignment.peer_isd_as, assignment.peer_interface_id = None, None
+            else:
+                isd, asn, interface_id = peer
+                assignment.peer_isd_as, assignment.peer_interface_id = isdases.get((isd, asn)), interface_id
+
+    def set_underlay_endpoints(self):
+        """Set the underlay IP and port fields from `local_underlay` and `peer_underlay` (NULL if unset or invalid)."""
+        for prefix in ('local', 'peer'):
+            try:
+                ip, port = parse_underlay(getattr(self, f'{prefix}_underlay') or '')
+            except ValueError:
+                ip, port = None, None
+            setattr(self, f'{prefix}_underlay_ip', str(ip) if ip is not None else None)
+            setattr(self, f'{prefix}_underlay_port', port)
+
+    def get_underlay_conflicts(self):
+        """Other assignments of the appliance using the same local underlay IP and port."""
+        if not self.core_id or self.local_underlay_ip is None:
+            return SCIONLinkAssignment.objects.none()
+        return SCIONLinkAssignment.objects.filter(
+            core_id=self.core_id,
+            local_underlay_ip=self.local_underlay_ip,
+            local_underlay_port=self.local_underlay_port,
+        ).exclude(pk=self.pk)
+
+    def save(self, *args, **kwargs):
+        self.resolve_peers([self])
+        self.set_underlay_endpoints()
+        if kwargs.get('update_fields') is not None:
+            update_fields = set(kwargs['update_fields'])
+            if 'peer' in update_fields:
+                update_fields |= {'peer_isd_as', 'peer_interface_id'}
+            if 'local_underlay' in update_fields:
+                update_fields |= {'local_underlay_ip', 'local_underlay_port'}
+            if 'peer_underlay' in update_fields:
+                update_fields |= {'peer_underlay_ip', 'peer_underlay_port'}
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     def get_ticket_url(self):
         """Best-effort URL normalization of the stored ticket value.
 
@@ -253,31 +617,97 @@ class SCIONLinkAssignment(NetBoxModel):
             return f"https://{value}"
         return None
 
+    def clean_fields(self, exclude=None):
+        # ForeignKey validation queries for the related row even when the object has
+        # just been fetched (e.g. by a form field); skip it for loaded relations
+        exclude = set(exclude or ())
+        for name in ('isd_as', 'core'):
+            field = self._meta.get_field(name)
+            if field.is_cached(self) and field.get_cached_value(self) is not None:
+                exclude.add(name)
+        super().clean_fields(exclude=exclude)
+
     def clean(self):
         super().clean()
         
         # Convert empty peer to NULL for proper unique constraint handling
         if hasattr(self, 'peer') and self.peer == '':
             self.peer = None
+
+        # The appliance must belong to the assignment's ISD-AS
+        if self.core_id and self.isd_as_id and self.core.isd_as_id != self.isd_as_id:
+            raise ValidationError({'core': 'Appliance does not belong to the selected ISD-AS'})
         
         # Validate underlay fields if provided
         for field_name in ('local_underlay', 'peer_underlay'):
             value = getattr(self, field_name, '') or ''
             if value:
                 try:
-                    ip_part, port_part = value.rsplit(':', 1)
-                except ValueError:
-                    raise ValidationError({field_name: 'Must be in format ip:port'})
-                # Validate port
-                if not port_part.isdigit() or int(port_part) <= 0:
-                    raise ValidationError({field_name: 'Port must be a positive integer'})
-                # Validate IP (IPv4 or IPv6)
-                try:
-                    # Strip brackets for IPv6 like [2001:db8::1]
-                    if ip_part.startswith('[') and ip_part.endswith(']'):
-                        candidate_ip = ip_part[1:-1]
-                    else:
-                        candidate_ip = ip_part
-                    ipaddress.ip_address(candidate_ip)
-                except ValueError:
-                    raise ValidationError({field_name: 'Invalid IP address'})
+                    parse_underlay(value)
+                except ValueError as e:
+                    raise ValidationError({field_name: str(e)})
+
+        # Two links cannot share a local underlay endpoint on the same appliance
+        self.set_underlay_endpoints()
+        conflict = self.get_underlay_conflicts().select_related('isd_as').first()
+        if conflict is not None:
+            raise ValidationError({
+                'local_underlay': f'Underlay endpoint {self.local_underlay} is already used by {conflict} on this appliance'
+            })
+
+
+class ISDASLinkSummary(models.Model):
+    """
+    Link assignment counts of an ISD-AS, maintained by `netbox_scion.summary`
+    so that lists and dashboards read them from one row instead of aggregating
+    the link assignments. ISD-ASes without link assignments may have no row.
+    """
+    isd_as = models.OneToOneField(
+        ISDAS,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='link_summary',
+        verbose_name="ISD-AS"
+    )
+    link_count = models.PositiveIntegerField(default=0, verbose_name='Links')
+    active_count = models.PositiveIntegerField(default=0, verbose_name='Active')
+    reserved_count = models.PositiveIntegerField(default=0, verbose_name='Reserved')
+    planned_count = models.PositiveIntegerField(default=0, verbose_name='Planned')
+    parent_count = models.PositiveIntegerField(default=0, verbose_name='Parent links')
+    child_count = models.PositiveIntegerField(default=0, verbose_name='Child links')
+    core_count = models.PositiveIntegerField(default=0, verbose_name='Core links')
+    # Appliance ID (as a string) -> number of link assignments; keyed by ID so renames need no refresh
+    appliance_counts = models.JSONField(default=dict, blank=True)
+    last_updated = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "ISD-AS link summary"
+        verbose_name_plural = "ISD-AS link summaries"
+
+    def __str__(self):
+        return f"{self.isd_as_id}: {self.link_count} links"
+
+
+class Tombstone(models.Model):
+    """
+    Deletion of an organization, ISD-AS or link assignment, reported by the
+    changes API. Written by `netbox_scion.changes` whenever such an object is
+    deleted, with or without a request context.
+    """
+    object_type = models.ForeignKey(
+        to='contenttypes.ContentType',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    object_id = models.PositiveBigIntegerField()
+    time = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "tombstone"
+        verbose_name_plural = "tombstones"
+        indexes = [
+            models.Index(fields=['time', 'id'], name='netbox_scion_tombstone_time'),
+        ]
+
+    def __str__(self):
+        return f"{self.object_type_id}:{self.object_id} deleted at {self.time}"
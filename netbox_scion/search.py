@@ -1,4 +1,7 @@
+from django.contrib.contenttypes.models import ContentType
+from extras.models import CachedValue
 from netbox.search import SearchIndex, register_search
+from netbox.search.backends import search_backend
 from .models import Organization, ISDAS, SCIONLinkAssignment
 
 
@@ -21,6 +24,7 @@ class ISDAIndex(SearchIndex):
     )
 
 
+@register_search
 class SCIONLinkAssignmentIndex(SearchIndex):
     model = SCIONLinkAssignment
     fields = (
@@ -30,3 +34,41 @@ class SCIONLinkAssignmentIndex(SearchIndex):
         ('status', 50),
         ('ticket', 200),
     )
+
+
+# Loaded by NetBox from PluginConfig.search_indexes
+indexes = (OrganizationIndex, ISDAIndex, SCIONLinkAssignmentIndex)
+
+# Querysets used when (re)building the cache; related objects read by the indexes are selected up front
+INDEX_QUERYSETS = {
+    Organization: lambda: Organization.objects.all(),
+    ISDAS: lambda: ISDAS.objects.all(),
+    SCIONLinkAssignment: lambda: SCIONLinkAssignment.objects.select_related('core'),
+}
+
+
+def reindex(index, queryset=None, batch_size=1000):
+    """
+    Rebuild the cached search values of `index` for `queryset` (all objects by
+    default). Existing values are removed with one DELETE and objects are read
+    in batches of `batch_size`, so memory use does not depend on the table size.
+    Returns the number of cached values written.
+    """
+    full = queryset is None
+    if full:
+        queryset = INDEX_QUERYSETS[index.model]()
+    object_type = ContentType.objects.get_for_model(index.model)
+
+    stale = CachedValue.objects.filter(object_type=object_type)
+    if not full:
+        stale = stale.filter(object_id__in=queryset.values('pk'))
+    stale.delete()
+
+    return search_backend.cache(
+        queryset.order_by('pk').iterator(chunk_size=batch_size), indexer=index, remove_existing=False
+    )
+
+
+def reindex_link_assignments(appliance):
+    """Refresh the search cache of the link assignments terminating on `appliance` (e.g. after a rename)."""
+    return reindex(SCIONLinkAssignmentIndex, SCIONLinkAssignment.objects.select_related('core').filter(core=appliance))
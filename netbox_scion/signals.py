@@ -0,0 +1,85 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import graph
+from .appliances import invalidate_appliance_names
+from .changes import record_deletions
+from .models import ISDAS, Appliance, Organization, SCIONLinkAssignment
+from .summary import schedule_summary_refresh
+
+
+@receiver(post_save, sender=SCIONLinkAssignment)
+def update_graph_edge(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    edge = graph.edge_for(instance)
+    graph.on_commit('set_edge', edge)
+
+
+@receiver(post_delete, sender=SCIONLinkAssignment)
+def remove_graph_edge(sender, instance, **kwargs):
+    edge_id = instance.pk
+    graph.on_commit('remove_edge', edge_id)
+
+
+@receiver(post_save, sender=ISDAS)
+def update_graph_node(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    node = graph.node_for(instance)
+    graph.on_commit('set_node', node)
+
+
+@receiver(post_delete, sender=ISDAS)
+def remove_graph_node(sender, instance, **kwargs):
+    node_id = instance.pk
+    graph.on_commit('remove_node', node_id)
+
+
+@receiver(post_save, sender=ISDAS)
+def touch_organization_on_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    # The ISD-AS count is part of the organization's representation (and API ETags)
+    previous = (getattr(instance, '_prechange_snapshot', None) or {}).get('organization')
+    if created or (previous is not None and previous != instance.organization_id):
+        touch_organizations(instance.organization_id, previous)
+
+
+@receiver(post_delete, sender=ISDAS)
+def touch_organization_on_delete(sender, instance, **kwargs):
+    touch_organizations(instance.organization_id)
+
+
+def touch_organizations(*pks):
+    Organization.objects.filter(pk__in=[pk for pk in pks if pk]).update(last_updated=timezone.now())
+
+
+@receiver(post_save, sender=Appliance)
+@receiver(post_delete, sender=Appliance)
+def invalidate_appliances(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_appliance_names(instance.isd_as_id)
+
+
+@receiver(post_save, sender=SCIONLinkAssignment)
+def refresh_summary_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # The snapshot (taken by views and the API before edits) tells whether the assignment moved
+    previous = (getattr(instance, '_prechange_snapshot', None) or {}).get('isd_as')
+    schedule_summary_refresh(instance.isd_as_id, previous)
+
+
+@receiver(post_delete, sender=SCIONLinkAssignment)
+def refresh_summary_on_delete(sender, instance, **kwargs):
+    schedule_summary_refresh(instance.isd_as_id)
+
+
+@receiver(post_delete, sender=Organization)
+@receiver(post_delete, sender=ISDAS)
+@receiver(post_delete, sender=SCIONLinkAssignment)
+def record_tombstone(sender, instance, **kwargs):
+    # Deletions without a request context are not in the change log; the changes API reads tombstones
+    record_deletions([instance])
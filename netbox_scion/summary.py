@@ -0,0 +1,87 @@
+"""
+Maintained per-ISD-AS link assignment counts (`ISDASLinkSummary`).
+
+A refresh recomputes the summaries of the given ISD-ASes with two aggregate
+queries and writes them with one upsert. Model signals schedule a refresh of
+the affected ISD-ASes for when the transaction commits; the refreshes
+scheduled by one transaction are merged, so a cascading or bulk deletion
+costs one refresh. Code paths that bypass signals (bulk_create/bulk_update)
+call `schedule_summary_refresh()` themselves.
+"""
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import ISDAS, ISDASLinkSummary, SCIONLinkAssignment
+
+# Summary column -> condition on the ISD-AS's link assignments
+COUNTS = {
+    'link_count': None,
+    'active_count': Q(link_assignments__status=SCIONLinkAssignment.STATUS_ACTIVE),
+    'reserved_count': Q(link_assignments__status=SCIONLinkAssignment.STATUS_RESERVED),
+    'planned_count': Q(link_assignments__status=SCIONLinkAssignment.STATUS_PLANNED),
+    'parent_count': Q(link_assignments__relationship=SCIONLinkAssignment.RELATIONSHIP_PARENT),
+    'child_count': Q(link_assignments__relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD),
+    'core_count': Q(link_assignments__relationship=SCIONLinkAssignment.RELATIONSHIP_CORE),
+}
+
+# Batch size for full refreshes
+BATCH_SIZE = 1000
+
+# ISD-AS IDs awaiting a refresh, per thread (i.e. per connection and transaction)
+_state = threading.local()
+
+
+def refresh_summaries(isdas_ids=None):
+    """
+    Recompute the summaries of `isdas_ids` (all ISD-ASes by default, in
+    batches). IDs of ISD-ASes that no longer exist are ignored.
+    """
+    if isdas_ids is None:
+        ids = list(ISDAS.objects.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(ids), BATCH_SIZE):
+            refresh_summaries(ids[start:start + BATCH_SIZE])
+        return
+    isdas_ids = set(isdas_ids)
+    if not isdas_ids:
+        return
+
+    appliance_counts = defaultdict(dict)
+    for isdas_id, core_id, count in SCIONLinkAssignment.objects.filter(isd_as_id__in=isdas_ids).values(
+        'isd_as_id', 'core_id'
+    ).annotate(count=Count('pk')).order_by().values_list('isd_as_id', 'core_id', 'count'):
+        appliance_counts[isdas_id][str(core_id)] = count
+
+    now = timezone.now()
+    rows = ISDAS.objects.filter(pk__in=isdas_ids).annotate(**{
+        column: Count('link_assignments', filter=condition) for column, condition in COUNTS.items()
+    }).values_list('pk', *COUNTS)
+    summaries = [
+        ISDASLinkSummary(
+            isd_as_id=pk, appliance_counts=appliance_counts[pk], last_updated=now, **dict(zip(COUNTS, counts))
+        )
+        for pk, *counts in rows
+    ]
+    ISDASLinkSummary.objects.bulk_create(
+        summaries, update_conflicts=True, unique_fields=['isd_as'],
+        update_fields=[*COUNTS, 'appliance_counts', 'last_updated'],
+    )
+
+
+def _flush():
+    isdas_ids = getattr(_state, 'pending', set())
+    _state.pending = set()
+    refresh_summaries(isdas_ids)
+
+
+def schedule_summary_refresh(*isdas_ids):
+    """Refresh the summaries of `isdas_ids` once the current transaction commits."""
+    isdas_ids = {isdas_id for isdas_id in isdas_ids if isdas_id is not None}
+    if not isdas_ids:
+        return
+    _state.pending = getattr(_state, 'pending', set()) | isdas_ids
+    # Every change registers a callback; the first one run after a commit refreshes all pending IDs
+    transaction.on_commit(_flush)
@@ -1,6 +1,6 @@
 import django_tables2 as tables
 from django.utils.html import format_html
-from netbox.tables import NetBoxTable
+from netbox.tables import NetBoxTable, columns
 from .models import Organization, ISDAS, SCIONLinkAssignment
 
 
@@ -9,10 +9,11 @@ class OrganizationTable(NetBoxTable):
         linkify=True
     )
     full_name = tables.Column()
-    isd_ases_count = tables.Column(
-        verbose_name='ISD-ASes',
-        orderable=False,
-        empty_values=()
+    # Backed by the `isd_ases_count` annotation supplied by the list view
+    isd_ases_count = columns.LinkedCountColumn(
+        viewname='plugins:netbox_scion:isdas_list',
+        url_params={'organization': 'pk'},
+        verbose_name='ISD-ASes'
     )
 
     class Meta(NetBoxTable.Meta):
@@ -20,36 +21,52 @@ class OrganizationTable(NetBoxTable):
         fields = ('pk', 'id', 'short_name', 'full_name', 'description', 'isd_ases_count')
         default_columns = ('short_name', 'full_name', 'description', 'isd_ases_count')
 
-    def render_isd_ases_count(self, record):
-        return record.isd_ases.count()
-
 
 class ISDATable(NetBoxTable):
     isd_as = tables.Column(
-        linkify=True
+        linkify=True,
+        order_by=('isd', 'asn')
     )
     organization = tables.Column(
         linkify=True,
         empty_values=()
     )
+    # Backed by the `appliances_count` annotation supplied by the view
     appliances = tables.Column(
-        verbose_name='Appliances',
-        orderable=False,
-        empty_values=()
+        accessor='appliances_count',
+        verbose_name='Appliances'
+    )
+    # Backed by the `link_assignments_count` annotation supplied by the list view
+    link_assignments_count = columns.LinkedCountColumn(
+        viewname='plugins:netbox_scion:scionlinkassignment_list',
+        url_params={'isd_as': 'pk'},
+        verbose_name='Link Assignments'
     )
-    link_assignments_count = tables.Column(
-        verbose_name='Link Assignments',
+    # Backed by the maintained link summary (`link_summary`, selected by the views)
+    active_links = tables.Column(accessor='link_summary__active_count', default=0, verbose_name='Active')
+    reserved_links = tables.Column(accessor='link_summary__reserved_count', default=0, verbose_name='Reserved')
+    planned_links = tables.Column(accessor='link_summary__planned_count', default=0, verbose_name='Planned')
+    parent_links = tables.Column(accessor='link_summary__parent_count', default=0, verbose_name='Parent Links')
+    child_links = tables.Column(accessor='link_summary__child_count', default=0, verbose_name='Child Links')
+    core_links = tables.Column(accessor='link_summary__core_count', default=0, verbose_name='Core Links')
+    # Needs the ISD-AS's appliances prefetched
+    appliance_links = tables.Column(
+        accessor='link_summary__appliance_counts',
         orderable=False,
-        empty_values=()
+        verbose_name='Links per Appliance'
     )
 
     class Meta(NetBoxTable.Meta):
         model = ISDAS
-        fields = ('pk', 'id', 'isd_as', 'organization', 'description', 'appliances', 'link_assignments_count')
-        default_columns = ('isd_as', 'organization', 'description', 'appliances', 'link_assignments_count')
-
-    def render_appliances(self, record):
-        return len(record.appliances) if record.appliances else 0
+        fields = (
+            'pk', 'id', 'isd_as', 'organization', 'description', 'appliances', 'link_assignments_count',
+            'active_links', 'reserved_links', 'planned_links', 'parent_links', 'child_links', 'core_links',
+            'appliance_links',
+        )
+        default_columns = (
+            'isd_as', 'organization', 'description', 'appliances', 'link_assignments_count',
+            'active_links', 'reserved_links', 'planned_links',
+        )
 
     def render_organization(self, value, record):
         """Render organization with proper null handling"""
@@ -57,16 +74,21 @@ class ISDATable(NetBoxTable):
             return format_html('<a href="{}">{}</a>', value.get_absolute_url(), value.short_name)
         return '—'
 
-    def render_link_assignments_count(self, record):
-        return record.link_assignments.count()
+    def render_appliance_links(self, value, record):
+        names = {str(appliance.pk): appliance.name for appliance in record.appliances.all()}
+        return ', '.join(f"{names.get(pk, pk)}: {count}" for pk, count in sorted(
+            value.items(), key=lambda item: names.get(item[0], item[0])
+        )) or '—'
 
 
 class SCIONLinkAssignmentTable(NetBoxTable):
     isd_as = tables.Column(
-        linkify=True
+        linkify=True,
+        order_by=('isd_as__isd', 'isd_as__asn')
     )
     core = tables.Column(
-        verbose_name='Appliance'
+        verbose_name='Appliance',
+        order_by=('core__name',)
     )
     interface_id = tables.Column(
         verbose_name='Interface ID',
@@ -1,8 +1,14 @@
-from django.test import TestCase
+import importlib.util
+import unittest
+from pathlib import Path
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
 from django.urls import reverse
-from .models import Organization, ISDAS, SCIONLinkAssignment
+from .models import Organization, ISDAS, Appliance, SCIONLinkAssignment
 
 
 class OrganizationTestCase(TestCase):
@@ -35,9 +41,10 @@ class ISDATestCase(TestCase):
         self.isdas = ISDAS.objects.create(
             isd_as="1-ff00:0:110",
             organization=self.organization,
-            appliances=["core1.example.com", "core2.example.com"],
             description="Test ISD-AS"
         )
+        Appliance.objects.create(isd_as=self.isdas, name="core1.example.com")
+        Appliance.objects.create(isd_as=self.isdas, name="core2.example.com")
 
     def test_isdas_str(self):
         """Test ISDAS string representation"""
@@ -57,6 +64,66 @@ class ISDATestCase(TestCase):
             )
             isdas.full_clean()
 
+    def test_out_of_range_isd_as(self):
+        """Test that identifiers outside the ISD and AS ranges are validation errors, also on save()"""
+        for value in ("1-fffff:0:1", "99999-1", "1-4294967296"):
+            isdas = ISDAS(isd_as=value, organization=self.organization)
+            with self.assertRaises(ValidationError):
+                isdas.full_clean()
+            with self.assertRaises(ValidationError):
+                isdas.save()
+
+    def test_numeric_isd_and_as(self):
+        """Test ISD and AS numbers are derived from both AS formats"""
+        self.assertEqual((self.isdas.isd, self.isdas.asn), (1, 0xff0000000110))
+        isdas = ISDAS.objects.create(isd_as="2-64512", organization=self.organization)
+        self.assertEqual((isdas.isd, isdas.asn), (2, 64512))
+
+    def test_natural_ordering_and_range_filters(self):
+        """Test ISD-ASes sort numerically and can be filtered by AS range"""
+        from .filtersets import ISDAFilterSet
+        for isd_as in ("1-ff00:0:2", "1-ff00:0:10", "10-1", "2-1"):
+            ISDAS.objects.create(isd_as=isd_as, organization=self.organization)
+        self.assertEqual(
+            [str(isdas) for isdas in ISDAS.objects.all()],
+            ["1-ff00:0:2", "1-ff00:0:10", "1-ff00:0:110", "2-1", "10-1"]
+        )
+        qs = ISDAFilterSet({'isd': ['1'], 'asn__gte': 'ff00:0:3', 'asn__lte': 'ff00:0:100'}, ISDAS.objects.all()).qs
+        self.assertEqual([str(isdas) for isdas in qs], ["1-ff00:0:10"])
+
+
+class ApplianceTestCase(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdas = ISDAS.objects.create(isd_as="1-ff00:0:120", organization=self.organization)
+        self.appliance = Appliance.objects.create(isd_as=self.isdas, name="br1")
+        self.assignment = SCIONLinkAssignment.objects.create(
+            isd_as=self.isdas,
+            core=self.appliance,
+            interface_id=1,
+            relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD
+        )
+
+    def test_unique_name_per_isdas(self):
+        with self.assertRaises(Exception):
+            Appliance.objects.create(isd_as=self.isdas, name="br1")
+
+    def test_rename_is_reflected_on_assignments(self):
+        self.appliance.name = "br1-renamed"
+        self.appliance.save()
+        self.assignment.refresh_from_db()
+        self.assertEqual(str(self.assignment.core), "br1-renamed")
+
+    def test_delete_cascades_to_assignments(self):
+        self.appliance.delete()
+        self.assertFalse(SCIONLinkAssignment.objects.filter(pk=self.assignment.pk).exists())
+
+    def test_appliance_must_belong_to_isdas(self):
+        other = ISDAS.objects.create(isd_as="1-ff00:0:121", organization=self.organization)
+        self.assignment.core = Appliance.objects.create(isd_as=other, name="br9")
+        with self.assertRaises(ValidationError):
+            self.assignment.clean()
+
 
 class SCIONLinkAssignmentTestCase(TestCase):
     def setUp(self):
@@ -68,9 +135,10 @@ class SCIONLinkAssignmentTestCase(TestCase):
             isd_as="1-ff00:0:110",
             organization=self.organization
         )
+        self.appliance = Appliance.objects.create(isd_as=self.isdas, name="v1")
         self.assignment = SCIONLinkAssignment.objects.create(
             isd_as=self.isdas,
-            core="v1",
+            core=self.appliance,
             interface_id=1,
             relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD,
             customer_id="customer1",
@@ -137,7 +205,7 @@ class ChangeLogViewTests(TestCase):
         )
         self.assignment = SCIONLinkAssignment.objects.create(
             isd_as=self.isdas,
-            core="core1",
+            core=Appliance.objects.create(isd_as=self.isdas, name="core1"),
             interface_id=10,
             relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD
         )
@@ -156,3 +224,1487 @@ class ChangeLogViewTests(TestCase):
         url = reverse('plugins:netbox_scion:scionlinkassignment_changelog', kwargs={'pk': self.assignment.pk})
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
+
+
+class ViewQueryCountTests(TestCase):
+    """Page query counts must not grow with the number of (related) rows."""
+
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="listuser", password="testpass")
+        self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+        self.organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+
+    def _add_isdases(self, start, count):
+        for n in range(start, start + count):
+            isdas = ISDAS.objects.create(isd_as=f"1-ff00:0:{n:x}", organization=self.organization)
+            SCIONLinkAssignment.objects.create(
+                isd_as=isdas, core=Appliance.objects.create(isd_as=isdas, name="core1"), interface_id=1,
+                relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD
+            )
+
+    def _count_queries(self, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_list_views_constant_queries(self):
+        urls = {name: reverse(f'plugins:netbox_scion:{name}') for name in ('organization_list', 'isdas_list')}
+        self._add_isdases(0x100, 2)
+        baselines = {name: self._count_queries(url) for name, url in urls.items()}
+        self._add_isdases(0x200, 10)
+        for name, url in urls.items():
+            self.assertEqual(self._count_queries(url), baselines[name], name)
+
+    def test_detail_views_constant_queries(self):
+        isdas = ISDAS.objects.create(isd_as="2-ff00:0:1", organization=self.organization)
+        org_url = reverse('plugins:netbox_scion:organization', kwargs={'pk': self.organization.pk})
+        isdas_url = reverse('plugins:netbox_scion:isdas', kwargs={'pk': isdas.pk})
+        appliance = Appliance.objects.create(isd_as=isdas, name="core1")
+        self._add_isdases(0x100, 2)
+        SCIONLinkAssignment.objects.create(
+            isd_as=isdas, core=appliance, interface_id=1, relationship=SCIONLinkAssignment.RELATIONSHIP_CORE
+        )
+        baselines = (self._count_queries(org_url), self._count_queries(isdas_url))
+
+        self._add_isdases(0x200, 10)
+        for interface_id in range(2, 12):
+            SCIONLinkAssignment.objects.create(
+                isd_as=isdas, core=appliance, interface_id=interface_id,
+                relationship=SCIONLinkAssignment.RELATIONSHIP_CORE
+            )
+        self.assertEqual((self._count_queries(org_url), self._count_queries(isdas_url)), baselines)
+
+
+# The benchmark is a development script outside the plugin package
+BENCHMARK_SCRIPT = Path(__file__).resolve().parent.parent / 'scripts' / 'scion_benchmark.py'
+
+
+@unittest.skipUnless(BENCHMARK_SCRIPT.exists(), "benchmark script is only available in a source checkout")
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        spec = importlib.util.spec_from_file_location('scion_benchmark', BENCHMARK_SCRIPT)
+        cls.benchmark = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(cls.benchmark)
+
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="benchuser", password="testpass")
+        self.user.is_superuser = True
+        self.user.save()
+
+    def test_every_target_responds(self):
+        self.benchmark.seed_inventory(organizations=2, isdases=4, links=12)
+        results = self.benchmark.run_benchmark(self.user, repeat=1)
+        self.assertIn('plugins:netbox_scion:home', results)
+        self.assertIn('plugins-api:netbox_scion-api:scionlinkassignment-list', results)
+        for label, result in results.items():
+            self.assertLess(result['status'], 400, label)
+
+    def test_compare_flags_query_regression(self):
+        compare = self.benchmark.compare
+        baseline = {'view': {'status': 200, 'queries': 5, 'time_ms': 10.0, 'peak_kb': 100.0}}
+        results = {'view': {'status': 200, 'queries': 6, 'time_ms': 10.0, 'peak_kb': 100.0}}
+        self.assertEqual(len(compare(results, baseline)), 1)
+        results['view']['queries'] = 5
+        self.assertEqual(compare(results, baseline), [])
+
+
+class LinkAssignmentBulkTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="bulkuser", password="testpass")
+        self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+        self.url = reverse('plugins-api:netbox_scion-api:scionlinkassignment-bulk')
+
+        self.organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdases = [
+            ISDAS.objects.create(isd_as=f"1-ff00:0:{n}", organization=self.organization) for n in (1, 2)
+        ]
+        for isdas in self.isdases:
+            Appliance.objects.create(isd_as=isdas, name="br1")
+        SCIONLinkAssignment.objects.create(
+            isd_as=self.isdases[0], core=self.isdases[0].appliances.get(), interface_id=1,
+            relationship=SCIONLinkAssignment.RELATIONSHIP_CORE
+        )
+
+    def _item(self, isdas, interface_id, **kwargs):
+        return {
+            'isd_as': isdas.pk, 'core': 'br1', 'interface_id': interface_id,
+            'relationship': SCIONLinkAssignment.RELATIONSHIP_CHILD, **kwargs
+        }
+
+    def test_batch_validation_query_count(self):
+        from .bulk import LinkAssignmentBatch
+        rows = [self._item(isdas, n) for isdas in self.isdases for n in range(2, 12)]
+        batch = LinkAssignmentBatch(rows)
+        # ISD-ASes, appliances, and one uniqueness query per ISD-AS
+        with self.assertNumQueries(4):
+            self.assertTrue(batch.validate())
+
+    def test_bulk_create_reports_errors_per_item(self):
+        items = [
+            self._item(self.isdases[0], 1),  # already assigned
+            self._item(self.isdases[1], 5),
+            self._item(self.isdases[1], 5),  # duplicated in batch
+            self._item(self.isdases[1], 6, local_underlay='not-an-endpoint'),
+        ]
+        response = self.client.post(self.url, items, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertIn('interface_id', errors[0])
+        self.assertEqual(errors[1], {})
+        self.assertIn('interface_id', errors[2])
+        self.assertIn('local_underlay', errors[3])
+        self.assertEqual(SCIONLinkAssignment.objects.count(), 1)
+
+    def test_bulk_create_update_delete(self):
+        items = [self._item(isdas, n) for isdas in self.isdases for n in range(2, 5)]
+        response = self.client.post(self.url, items, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        ids = [item['id'] for item in response.json()]
+        self.assertEqual(len(ids), 6)
+
+        response = self.client.patch(
+            self.url, [{'id': pk, 'status': SCIONLinkAssignment.STATUS_PLANNED} for pk in ids],
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            SCIONLinkAssignment.objects.filter(status=SCIONLinkAssignment.STATUS_PLANNED).count(), 6
+        )
+
+        response = self.client.delete(self.url, [{'id': pk} for pk in ids], content_type='application/json')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(SCIONLinkAssignment.objects.count(), 1)
+
+
+class InterfaceAllocationTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="allocuser", password="testpass")
+        self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+        self.url = reverse('plugins-api:netbox_scion-api:scionlinkassignment-allocate')
+
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdas = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=organization)
+        self.appliance = Appliance.objects.create(isd_as=self.isdas, name="br1")
+        for interface_id in (1, 2, 4, 7):
+            SCIONLinkAssignment.objects.create(
+                isd_as=self.isdas, core=self.appliance, interface_id=interface_id,
+                relationship=SCIONLinkAssignment.RELATIONSHIP_CORE
+            )
+
+    def test_get_free_interface_ids(self):
+        self.assertEqual(self.isdas.get_free_interface_ids(5), [3, 5, 6, 8, 9])
+        self.assertEqual(self.isdas.get_free_interface_ids(2, start=4), [5, 6])
+        self.assertEqual(self.isdas.get_free_interface_ids(5, start=1, end=7), [3, 5, 6])
+        self.assertEqual(self.isdas.get_free_interface_ids(2, start=10, end=20), [10, 11])
+
+    def test_reserve_interface_ids(self):
+        assignments = self.isdas.reserve_interface_ids(
+            3, self.appliance, SCIONLinkAssignment.RELATIONSHIP_CHILD, peer_name="customer"
+        )
+        self.assertEqual([a.interface_id for a in assignments], [3, 5, 6])
+        self.assertTrue(all(a.status == SCIONLinkAssignment.STATUS_RESERVED for a in assignments))
+        with self.assertRaises(ValidationError):
+            self.isdas.reserve_interface_ids(3, self.appliance, SCIONLinkAssignment.RELATIONSHIP_CHILD, end=8)
+
+    def test_allocate_api(self):
+        response = self.client.get(self.url, {'isd_as': self.isdas.pk, 'count': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['interface_ids'], [3, 5])
+
+        data = {
+            'isd_as': self.isdas.pk, 'count': 2, 'core': 'br1',
+            'relationship': SCIONLinkAssignment.RELATIONSHIP_CHILD,
+        }
+        response = self.client.post(self.url, data, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([item['interface_id'] for item in response.json()], [3, 5])
+
+        response = self.client.post(self.url, {**data, 'end': 8}, content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+
+    def test_allocate_requires_isdas_view_permission(self):
+        from core.models import ObjectType
+        from users.models import ObjectPermission
+        other = ISDAS.objects.create(isd_as="1-ff00:0:111", organization=self.isdas.organization)
+        user = get_user_model().objects.create_user(username="allocviewer")
+        for model, constraints in ((ISDAS, {'pk': other.pk}), (SCIONLinkAssignment, None)):
+            permission = ObjectPermission.objects.create(
+                name=f"View {model._meta.model_name}", actions=['view', 'add'], constraints=constraints
+            )
+            permission.object_types.add(ObjectType.objects.get_for_model(model))
+            permission.users.add(user)
+        self.client.force_login(user)
+
+        response = self.client.get(self.url, {'isd_as': self.isdas.pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('isd_as', response.json())
+        self.assertEqual(self.client.get(self.url, {'isd_as': other.pk}).json()['interface_ids'], [1])
+        data = {'isd_as': self.isdas.pk, 'core': 'br1', 'relationship': SCIONLinkAssignment.RELATIONSHIP_CHILD}
+        self.assertEqual(self.client.post(self.url, data, content_type='application/json').status_code, 400)
+        self.assertEqual(SCIONLinkAssignment.objects.filter(isd_as=self.isdas).count(), 4)
+
+
+class StreamingExportTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="exportuser", password="testpass")
+        self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        for n in (1, 2):
+            isdas = ISDAS.objects.create(isd_as=f"1-ff00:0:{n}", organization=organization)
+            appliance = Appliance.objects.create(isd_as=isdas, name=f"br{n}")
+            SCIONLinkAssignment.objects.create(
+                isd_as=isdas, core=appliance, interface_id=n, peer_name=f"peer-{n}",
+                relationship=SCIONLinkAssignment.RELATIONSHIP_CORE
+            )
+
+    def _content(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_with_filters(self):
+        url = reverse('plugins:netbox_scion:scionlinkassignment_export')
+        lines = self._content(self.client.get(url, {'peer_name': 'peer-2'})).splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['ID', 'ISD-AS', 'Appliance'])
+        self.assertEqual(len(lines), 2)
+        self.assertIn('1-ff00:0:2,br2,2', lines[1])
+
+    def test_ndjson_export(self):
+        import json
+        url = reverse('plugins:netbox_scion:isdas_export')
+        rows = [json.loads(line) for line in self._content(self.client.get(url, {'export_format': 'ndjson'})).splitlines()]
+        self.assertEqual([row['appliances'] for row in rows], [['br1'], ['br2']])
+
+    def test_api_export(self):
+        url = reverse('plugins-api:netbox_scion-api:organization-export')
+        lines = self._content(self.client.get(url)).splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(self.client.get(url, {'export_format': 'xml'}).status_code, 400)
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdas = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=organization)
+        self.appliance = Appliance.objects.create(isd_as=self.isdas, name="br1")
+        self.other = Appliance.objects.create(isd_as=self.isdas, name="br2")
+        for interface_id, appliance in ((1, self.appliance), (2, self.appliance), (3, self.other)):
+            SCIONLinkAssignment.objects.create(
+                isd_as=self.isdas, core=appliance, interface_id=interface_id,
+                relationship=SCIONLinkAssignment.RELATIONSHIP_CORE
+            )
+
+    def _cached(self, value):
+        from extras.models import CachedValue
+        return CachedValue.objects.filter(object_type__model='scionlinkassignment', value=value).count()
+
+    def test_link_assignments_are_indexed(self):
+        from netbox.registry import registry
+        self.assertIn('netbox_scion.scionlinkassignment', registry['search'])
+
+    def test_reindex_command(self):
+        from django.core.management import call_command
+        from io import StringIO
+        call_command('scion_reindex', 'scionlinkassignment', batch_size=1, stdout=StringIO())
+        self.assertEqual(self._cached('br1'), 2)
+        self.assertEqual(self._cached('br2'), 1)
+
+    def test_appliance_rename_reindexes_its_assignments(self):
+        from .search import reindex, reindex_link_assignments, SCIONLinkAssignmentIndex
+        reindex(SCIONLinkAssignmentIndex)
+        self.appliance.name = "br1-new"
+        self.appliance.save()
+        reindex_link_assignments(self.appliance)
+        self.assertEqual(self._cached('br1'), 0)
+        self.assertEqual(self._cached('br1-new'), 2)
+        self.assertEqual(self._cached('br2'), 1)
+
+    def test_bulk_writes_are_indexed(self):
+        user = get_user_model().objects.create_user(username="indexer", is_superuser=True)
+        self.client.force_login(user)
+        url = reverse('plugins-api:netbox_scion-api:scionlinkassignment-bulk')
+        response = self.client.post(url, [{
+            'isd_as': self.isdas.pk, 'core': 'br1', 'interface_id': 10,
+            'relationship': SCIONLinkAssignment.RELATIONSHIP_CHILD, 'ticket': 'TICKET-1',
+        }], content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self._cached('TICKET-1'), 1)
+
+        pk = response.json()[0]['id']
+        response = self.client.patch(url, [{'id': pk, 'ticket': 'TICKET-2'}], content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((self._cached('TICKET-1'), self._cached('TICKET-2')), (0, 1))
+
+        self.isdas.reserve_interface_ids(2, self.other, SCIONLinkAssignment.RELATIONSHIP_CHILD, ticket='TICKET-3')
+        self.assertEqual(self._cached('TICKET-3'), 2)
+
+
+class FilterSetSearchTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        other = Organization.objects.create(short_name="Other", full_name="Other Networks")
+        self.isdas = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=organization)
+        ISDAS.objects.create(isd_as="2-ff00:0:220", organization=other)
+        appliance = Appliance.objects.create(isd_as=self.isdas, name="br-zurich")
+        self.assignment = SCIONLinkAssignment.objects.create(
+            isd_as=self.isdas, core=appliance, interface_id=1, peer_name="customer",
+            relationship=SCIONLinkAssignment.RELATIONSHIP_CORE, status=SCIONLinkAssignment.STATUS_PLANNED
+        )
+
+    def test_isdas_search_matches_organization(self):
+        from .filtersets import ISDAFilterSet
+        qs = ISDAFilterSet({'q': 'corporation'}, ISDAS.objects.all()).qs
+        self.assertEqual(list(qs), [self.isdas])
+
+    def test_link_assignment_search(self):
+        from .filtersets import SCIONLinkAssignmentFilterSet
+        for value in ('zurich', '0:110', 'CUSTOM', 'planned'):
+            qs = SCIONLinkAssignmentFilterSet({'q': value}, SCIONLinkAssignment.objects.all()).qs
+            self.assertEqual(list(qs), [self.assignment], value)
+        qs = SCIONLinkAssignmentFilterSet({'q': 'ff00:0:220'}, SCIONLinkAssignment.objects.all()).qs
+        self.assertFalse(qs.exists())
+
+
+class PeerReferenceTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.local = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=organization)
+        self.remote = ISDAS.objects.create(isd_as="1-ff00:0:111", organization=organization)
+        self.local_appliance = Appliance.objects.create(isd_as=self.local, name="br1")
+        self.remote_appliance = Appliance.objects.create(isd_as=self.remote, name="br1")
+
+    def _link(self, isdas, appliance, interface_id, peer):
+        return SCIONLinkAssignment.objects.create(
+            isd_as=isdas, core=appliance, interface_id=interface_id, peer=peer,
+            relationship=SCIONLinkAssignment.RELATIONSHIP_CORE
+        )
+
+    def test_peer_is_resolved_on_save(self):
+        link = self._link(self.local, self.local_appliance, 1, "1-ff00:0:111#2")
+        self.assertEqual((link.peer_isd_as, link.peer_interface_id), (self.remote, 2))
+        reverse_link = self._link(self.remote, self.remote_appliance, 2, "1-ff00:0:110#1")
+        # Both ends of the link join in SQL
+        other_side = SCIONLinkAssignment.objects.get(
+            isd_as=link.peer_isd_as, interface_id=link.peer_interface_id
+        )
+        self.assertEqual(other_side, reverse_link)
+        self.assertEqual(list(self.remote.inbound_link_assignments.all()), [link])
+
+    def test_dangling_peer_resolves_when_isdas_is_added(self):
+        link = self._link(self.local, self.local_appliance, 1, "2-ff00:0:1#5")
+        self.assertIsNone(link.peer_isd_as)
+        self.assertEqual(link.peer_interface_id, 5)
+        remote = ISDAS.objects.create(isd_as="2-ff00:0:1", organization=self.local.organization)
+        link.refresh_from_db()
+        self.assertEqual(link.peer_isd_as, remote)
+
+    def test_unparseable_peer(self):
+        link = self._link(self.local, self.local_appliance, 1, "customer-router")
+        self.assertIsNone(link.peer_isd_as)
+        self.assertIsNone(link.peer_interface_id)
+
+    def test_rename_re_resolves_peers(self):
+        old = self._link(self.local, self.local_appliance, 1, "1-ff00:0:111#2")
+        new = self._link(self.local, self.local_appliance, 2, "1-ff00:0:112#3")
+        remote = ISDAS.objects.get(pk=self.remote.pk)
+        remote.isd_as = "1-ff00:0:112"
+        remote.save()
+        old.refresh_from_db()
+        new.refresh_from_db()
+        self.assertIsNone(old.peer_isd_as)
+        self.assertEqual((new.peer_isd_as, new.peer_interface_id), (remote, 3))
+
+    def test_rename_matches_other_notations(self):
+        """Renames resolve peers by (ISD, AS) like saving a link does, whatever the notation"""
+        link = self._link(self.local, self.local_appliance, 1, "01-FF00:0:0112#3")
+        self.assertIsNone(link.peer_isd_as)
+        inbound = self._link(self.local, self.local_appliance, 2, "1-ff00:0:111#4")
+        remote = ISDAS.objects.get(pk=self.remote.pk)
+        remote.isd_as = "1-FF00:0:111"
+        remote.save()
+        inbound.refresh_from_db()
+        self.assertEqual(inbound.peer_isd_as, remote)
+
+        remote.isd_as = "1-ff00:0:112"
+        remote.save()
+        link.refresh_from_db()
+        inbound.refresh_from_db()
+        self.assertEqual((link.peer_isd_as, link.peer_interface_id), (remote, 3))
+        self.assertIsNone(inbound.peer_isd_as)
+        # Saving the link resolves it the same way
+        link.save()
+        link.refresh_from_db()
+        self.assertEqual(link.peer_isd_as, remote)
+
+    def test_unchanged_identifier_skips_resolution(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        remote = ISDAS.objects.get(pk=self.remote.pk)
+        with CaptureQueriesContext(connection) as queries:
+            remote.description = "Updated"
+            remote.save()
+        self.assertFalse([q for q in queries.captured_queries if 'netbox_scion_scionlinkassignment' in q['sql']])
+
+
+class LinkConsistencyTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.parent = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=organization)
+        self.child = ISDAS.objects.create(isd_as="1-ff00:0:111", organization=organization)
+        self.parent_br = Appliance.objects.create(isd_as=self.parent, name="br1")
+        self.child_br = Appliance.objects.create(isd_as=self.child, name="br1")
+
+    def _link(self, isdas, appliance, interface_id, relationship, peer, **kwargs):
+        return SCIONLinkAssignment.objects.create(
+            isd_as=isdas, core=appliance, interface_id=interface_id, relationship=relationship, peer=peer, **kwargs
+        )
+
+    def _issues(self):
+        from .consistency import check_links
+        return {(issue['check'], issue['id']) for issue in check_links()['issues']}
+
+    def test_consistent_link(self):
+        self._link(self.parent, self.parent_br, 1, SCIONLinkAssignment.RELATIONSHIP_CHILD, "1-ff00:0:111#2",
+                   local_underlay="10.0.0.1:50000", peer_underlay="10.0.0.2:50000")
+        self._link(self.child, self.child_br, 2, SCIONLinkAssignment.RELATIONSHIP_PARENT, "1-ff00:0:110#1",
+                   local_underlay="10.0.0.2:50000", peer_underlay="10.0.0.1:50000")
+        self.assertEqual(self._issues(), set())
+
+    def test_inconsistencies(self):
+        a = self._link(self.parent, self.parent_br, 1, SCIONLinkAssignment.RELATIONSHIP_CHILD, "1-ff00:0:111#2",
+                       local_underlay="10.0.0.1:50000")
+        b = self._link(self.child, self.child_br, 2, SCIONLinkAssignment.RELATIONSHIP_CHILD, "1-ff00:0:110#9",
+                       peer_underlay="10.0.0.9:50000")
+        c = self._link(self.parent, self.parent_br, 3, SCIONLinkAssignment.RELATIONSHIP_CORE, "1-ff00:0:111#7")
+        d = self._link(self.parent, self.parent_br, 4, SCIONLinkAssignment.RELATIONSHIP_CORE, "3-ff00:0:1#1")
+        issues = self._issues()
+        self.assertIn(('relationship_mismatch', a.pk), issues)
+        self.assertIn(('peer_mismatch', a.pk), issues)
+        self.assertIn(('underlay_mismatch', a.pk), issues)
+        self.assertIn(('missing_counterpart', b.pk), issues)
+        self.assertIn(('missing_counterpart', c.pk), issues)
+        self.assertIn(('dangling_peer', d.pk), issues)
+
+    def test_query_count_is_constant(self):
+        from .consistency import CHECKS, check_links
+        for n in range(1, 20):
+            self._link(self.parent, self.parent_br, n, SCIONLinkAssignment.RELATIONSHIP_CHILD, f"1-ff00:0:111#{n}")
+        with self.assertNumQueries(len(CHECKS)):
+            check_links()
+
+    def test_api_endpoint(self):
+        user = get_user_model().objects.create_user(username="checker", is_superuser=True)
+        self.client.force_login(user)
+        self._link(self.parent, self.parent_br, 1, SCIONLinkAssignment.RELATIONSHIP_CORE, "1-ff00:0:111#2")
+        url = reverse('plugins-api:netbox_scion-api:scionlinkassignment-consistency')
+        response = self.client.get(url, {'check': 'missing_counterpart'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['summary'], {'missing_counterpart': 1})
+        self.assertEqual(self.client.get(url, {'check': 'bogus'}).status_code, 400)
+
+
+class TopologyTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdas = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=organization)
+        self.remote = ISDAS.objects.create(isd_as="1-ff00:0:111", organization=organization)
+        self.br1 = Appliance.objects.create(isd_as=self.isdas, name="br1")
+        self.br2 = Appliance.objects.create(isd_as=self.isdas, name="br2")
+        SCIONLinkAssignment.objects.create(
+            isd_as=self.isdas, core=self.br1, interface_id=1, relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD,
+            peer="1-ff00:0:111#2", local_underlay="10.0.0.1:50000", peer_underlay="10.0.0.2:50000",
+            status=SCIONLinkAssignment.STATUS_ACTIVE
+        )
+        SCIONLinkAssignment.objects.create(
+            isd_as=self.isdas, core=self.br2, interface_id=2, relationship=SCIONLinkAssignment.RELATIONSHIP_CORE,
+            peer="2-ff00:0:1#1", status=SCIONLinkAssignment.STATUS_ACTIVE
+        )
+        SCIONLinkAssignment.objects.create(
+            isd_as=self.isdas, core=self.br2, interface_id=3, relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD,
+            status=SCIONLinkAssignment.STATUS_RESERVED
+        )
+
+    def test_build_topology(self):
+        from .topology import build_topology
+        with self.assertNumQueries(1):
+            topology = build_topology(self.isdas)
+        self.assertEqual(topology['attributes'], ['core'])
+        self.assertEqual(topology['border_routers']['br1']['interfaces']['1'], {
+            'underlay': {'local': '10.0.0.1:50000', 'remote': '10.0.0.2:50000'},
+            'isd_as': '1-ff00:0:111',
+            'link_to': 'child',
+        })
+        self.assertEqual(list(topology['border_routers']['br2']['interfaces']), ['2'])
+        self.assertEqual(list(build_topology(self.isdas, core=self.br1)['border_routers']), ['br1'])
+
+    def test_cached_topology_changes_with_data(self):
+        from .topology import render_topology
+        first = render_topology(self.isdas)
+        with self.assertNumQueries(1):
+            self.assertEqual(render_topology(self.isdas), first)
+        assignment = SCIONLinkAssignment.objects.get(interface_id=1)
+        assignment.relationship = SCIONLinkAssignment.RELATIONSHIP_PARENT
+        assignment.save()
+        self.assertEqual(render_topology(self.isdas)['border_routers']['br1']['interfaces']['1']['link_to'], 'parent')
+
+    def test_api_and_dump(self):
+        import json
+        import os
+        import tempfile
+        from .topology import dump_topologies
+        user = get_user_model().objects.create_user(username="topology", is_superuser=True)
+        self.client.force_login(user)
+        url = reverse('plugins-api:netbox_scion-api:isdas-topology', kwargs={'pk': self.isdas.pk})
+        response = self.client.get(url, {'core': 'br2', 'status': ['ACTIVE', 'RESERVED']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.json()['border_routers']['br2']['interfaces']), ['2', '3'])
+
+        with tempfile.TemporaryDirectory() as directory:
+            paths = dump_topologies(directory, workers=1)
+            self.assertEqual(len(paths), 2)
+            with open(os.path.join(directory, '1-ff00_0_110.json')) as fh:
+                self.assertEqual(json.load(fh)['isd_as'], '1-ff00:0:110')
+
+
+class LinkGraphTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.core_a = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=organization)
+        self.core_b = ISDAS.objects.create(isd_as="1-ff00:0:120", organization=organization)
+        self.core_c = ISDAS.objects.create(isd_as="1-ff00:0:130", organization=organization)
+        self.leaf = ISDAS.objects.create(isd_as="1-ff00:0:111", organization=organization)
+        self.links = {}
+        with self.captureOnCommitCallbacks(execute=True):
+            from .graph import invalidate_graph
+            invalidate_graph()
+        for isdas, interface_id, relationship, peer in (
+            (self.core_a, 1, SCIONLinkAssignment.RELATIONSHIP_CORE, "1-ff00:0:120#1"),
+            (self.core_b, 1, SCIONLinkAssignment.RELATIONSHIP_CORE, "1-ff00:0:110#1"),
+            (self.core_a, 2, SCIONLinkAssignment.RELATIONSHIP_CHILD, "1-ff00:0:111#1"),
+            (self.leaf, 1, SCIONLinkAssignment.RELATIONSHIP_PARENT, "1-ff00:0:110#2"),
+            (self.core_c, 1, SCIONLinkAssignment.RELATIONSHIP_CORE, "2-ff00:0:1#1"),
+        ):
+            appliance, _ = Appliance.objects.get_or_create(isd_as=isdas, name="br1")
+            self.links[isdas.isd_as, interface_id] = SCIONLinkAssignment.objects.create(
+                isd_as=isdas, core=appliance, interface_id=interface_id, relationship=relationship, peer=peer
+            )
+
+    def test_graph_queries(self):
+        from .graph import LinkGraph
+        with self.assertNumQueries(2):
+            graph = LinkGraph.from_database()
+        self.assertTrue(graph.is_core(self.core_a.pk))
+        self.assertFalse(graph.is_core(self.leaf.pk))
+        self.assertEqual(graph.reachable_cores(self.leaf.pk), {self.core_a.pk})
+        segments = graph.up_segments(self.leaf.pk, k=5)
+        # The PARENT link is declared by both ends, so two segments use different link IDs
+        self.assertEqual([hops for hops, _ in segments], [(self.leaf.pk, self.core_a.pk)] * 2)
+
+        mesh = graph.core_mesh(1)
+        self.assertEqual(mesh['cores'], [self.core_a.pk, self.core_b.pk, self.core_c.pk])
+        self.assertEqual(len(mesh['components']), 2)
+        self.assertIn((self.core_a.pk, self.core_c.pk), mesh['missing'])
+        self.assertNotIn((self.core_a.pk, self.core_b.pk), mesh['missing'])
+
+    def test_graph_follows_changes(self):
+        from .graph import link_graph
+        with link_graph() as graph:
+            self.assertEqual(len(graph.neighbors(self.leaf.pk)['outbound']), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.links["1-ff00:0:111", 1].delete()
+            self.links["1-ff00:0:110", 2].delete()
+        # Applied in place, no rebuild
+        with self.assertNumQueries(0), link_graph() as graph:
+            self.assertEqual(graph.neighbors(self.leaf.pk), {'outbound': [], 'inbound': []})
+            self.assertEqual(graph.reachable_cores(self.leaf.pk), set())
+
+    def test_other_processes_replay_changes(self):
+        from django.core.cache import cache
+        from . import graph as graph_module
+        from .graph import link_graph
+        with link_graph() as graph:
+            pass
+        link = self.links["1-ff00:0:111", 1]
+
+        # Another process changes a link; this process's graph is behind
+        graph_module._graph = None
+        graph_module._publish(('remove_edge', link.pk))
+        graph_module._graph = graph
+        with self.assertNumQueries(0), link_graph() as current:
+            self.assertIs(current, graph)
+            self.assertNotIn(link.pk, current.edges)
+
+        # A gap in the log forces a rebuild
+        graph_module._graph = None
+        graph_module._publish(('set_node', graph.nodes[self.leaf.pk]))
+        graph_module._graph = graph
+        cache.delete(graph_module._change_key(cache.get(graph_module.VERSION_KEY)))
+        with link_graph() as current:
+            self.assertIsNot(current, graph)
+
+    def test_api(self):
+        user = get_user_model().objects.create_user(username="graph", is_superuser=True)
+        self.client.force_login(user)
+        url = reverse('plugins-api:netbox_scion-api:isdas-neighbors', kwargs={'pk': self.leaf.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['outbound'][0]['peer_isd_as']['isd_as'], "1-ff00:0:110")
+        self.assertEqual(response.json()['inbound'][0]['isd_as']['isd_as'], "1-ff00:0:110")
+
+        url = reverse('plugins-api:netbox_scion-api:isdas-up-segments', kwargs={'pk': self.leaf.pk})
+        segments = self.client.get(url, {'k': 1}).json()['segments']
+        self.assertEqual([hop['isd_as'] for hop in segments[0]['hops']], ["1-ff00:0:111", "1-ff00:0:110"])
+
+        url = reverse('plugins-api:netbox_scion-api:isdas-reachability', kwargs={'pk': self.leaf.pk})
+        self.assertTrue(self.client.get(url).json()['reachable'])
+
+        url = reverse('plugins-api:netbox_scion-api:isdas-core-mesh')
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertFalse(self.client.get(url, {'isd': 1}).json()['fully_meshed'])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdas = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=organization)
+        self.appliance = Appliance.objects.create(isd_as=self.isdas, name="br1")
+        self.assignment = SCIONLinkAssignment.objects.create(
+            isd_as=self.isdas, core=self.appliance, interface_id=1, relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD
+        )
+        user = get_user_model().objects.create_user(username="conditional", is_superuser=True)
+        self.client.force_login(user)
+
+    def test_list_not_modified(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = reverse('plugins-api:netbox_scion-api:scionlinkassignment-list')
+        with CaptureQueriesContext(connection) as full:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as conditional:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        self.assertLess(len(conditional), len(full))
+
+        # Filters are part of the validator
+        self.assertEqual(self.client.get(url, {'interface_id': 1}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        self.assignment.relationship = SCIONLinkAssignment.RELATIONSHIP_PARENT
+        self.assignment.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_related_changes(self):
+        url = reverse('plugins-api:netbox_scion-api:isdas-detail', kwargs={'pk': self.isdas.pk})
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Deleting an assignment changes the ISD-AS's link assignment count (via its link summary)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assignment.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        url = reverse('plugins-api:netbox_scion-api:organization-list')
+        etag = self.client.get(url)['ETag']
+        ISDAS.objects.create(isd_as="1-ff00:0:111", organization=self.isdas.organization)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        missing = reverse('plugins-api:netbox_scion-api:isdas-detail', kwargs={'pk': 0})
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+    def test_invalid_lookup_not_found(self):
+        url = reverse('plugins-api:netbox_scion-api:isdas-detail', kwargs={'pk': 'abc'})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_validators_skip_related_counts(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = reverse('plugins-api:netbox_scion-api:organization-list')
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertFalse(any('netbox_scion_isdas' in query['sql'] for query in queries))
+
+
+class ChangesAPITests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdas = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=organization)
+        appliance = Appliance.objects.create(isd_as=self.isdas, name="br1")
+        self.assignment = SCIONLinkAssignment.objects.create(
+            isd_as=self.isdas, core=appliance, interface_id=1, relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD
+        )
+        user = get_user_model().objects.create_user(username="changes", is_superuser=True)
+        self.client.force_login(user)
+        self.url = reverse('plugins-api:netbox_scion-api:changes')
+
+    def test_changes_and_tombstones(self):
+        from django.test import override_settings
+        with override_settings(PLUGINS_CONFIG={'netbox_scion': {'changes_settle_time': 0}}):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertEqual(
+                [change['object_type'] for change in data['changes']],
+                ['netbox_scion.organization', 'netbox_scion.isdas', 'netbox_scion.scionlinkassignment']
+            )
+            self.assertEqual(data['changes'][1]['data']['isd_as'], "1-ff00:0:110")
+            self.assertFalse(data['has_more'])
+            cursor = data['next']
+
+            data = self.client.get(self.url, {'since': cursor}).json()
+            self.assertEqual(data['changes'], [])
+            # Caught up: the cursor moves to the end of the reported range
+            cursor = data['next']
+
+            detail = reverse('plugins-api:netbox_scion-api:scionlinkassignment-detail', kwargs={'pk': self.assignment.pk})
+            self.assertEqual(self.client.delete(detail).status_code, 204)
+            changes = self.client.get(self.url, {'since': cursor}).json()['changes']
+            self.assertEqual([(change['action'], change['id']) for change in changes], [('delete', self.assignment.pk)])
+
+    def test_paging(self):
+        from django.test import override_settings
+        with override_settings(PLUGINS_CONFIG={'netbox_scion': {'changes_settle_time': 0}}):
+            seen = []
+            cursor = None
+            while True:
+                data = self.client.get(self.url, {'limit': 1, **({'since': cursor} if cursor else {})}).json()
+                seen.extend(change['object_type'] for change in data['changes'])
+                cursor = data['next']
+                if not data['has_more']:
+                    break
+            self.assertEqual(len(seen), 3)
+
+        # Recent changes are held back until they have settled
+        self.assertEqual(self.client.get(self.url).json()['changes'], [])
+        self.assertEqual(self.client.get(self.url, {'since': 'invalid'}).status_code, 400)
+
+    def test_deletions_outside_requests(self):
+        from django.test import override_settings
+        from .changes import get_changes
+        pk = self.assignment.pk
+        # No request context: nothing is written to the change log
+        self.assignment.delete()
+        with override_settings(PLUGINS_CONFIG={'netbox_scion': {'changes_settle_time': 0}}):
+            changes, _, _ = get_changes({SCIONLinkAssignment: SCIONLinkAssignment.objects.all()})
+        self.assertEqual([(change.object, change.object_id) for change in changes][-1:], [(None, pk)])
+
+    def test_expired_cursor(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .changes import encode_cursor
+        cursor = encode_cursor(timezone.now() - timedelta(days=31), 0, 1)
+        self.assertEqual(self.client.get(self.url, {'since': cursor}).status_code, 410)
+        cursor = encode_cursor(timezone.now() - timedelta(days=29), 0, 1)
+        self.assertEqual(self.client.get(self.url, {'since': cursor}).status_code, 200)
+
+    def test_tombstones_are_pruned(self):
+        from datetime import timedelta
+        from django.contrib.contenttypes.models import ContentType
+        from django.utils import timezone
+        from .models import Tombstone
+        old = Tombstone.objects.create(
+            object_type=ContentType.objects.get_for_model(ISDAS), object_id=0,
+            time=timezone.now() - timedelta(days=31)
+        )
+        self.assignment.delete()
+        self.assertFalse(Tombstone.objects.filter(pk=old.pk).exists())
+        self.assertTrue(Tombstone.objects.filter(object_id=self.assignment.pk).exists())
+
+    def test_nested_deletions_recorded(self):
+        from .changes import deletions_recorded
+        from .models import Tombstone
+        pk = self.assignment.pk
+        with deletions_recorded():
+            with deletions_recorded():
+                pass
+            self.assignment.delete()
+        self.assertFalse(Tombstone.objects.filter(object_id=pk).exists())
+
+    def test_peer_cascade_is_a_change(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        peer = ISDAS.objects.create(isd_as="1-ff00:0:111", organization=self.isdas.organization)
+        SCIONLinkAssignment.objects.filter(pk=self.assignment.pk).update(
+            peer="1-ff00:0:111#1", peer_isd_as=peer, last_updated=timezone.now() - timedelta(days=1)
+        )
+        before = timezone.now()
+        peer.delete()
+        self.assignment.refresh_from_db()
+        self.assertIsNone(self.assignment.peer_isd_as_id)
+        self.assertGreaterEqual(self.assignment.last_updated, before)
+
+    def test_open_transactions_hold_back_changes(self):
+        from datetime import timedelta
+        from unittest import mock
+        from django.test import override_settings
+        from django.utils import timezone
+        from .changes import get_changes
+        querysets = {Organization: Organization.objects.all()}
+        with override_settings(PLUGINS_CONFIG={'netbox_scion': {'changes_settle_time': 0}}):
+            self.assertEqual(len(get_changes(querysets)[0]), 1)
+            # A transaction that started before the organization was written may still commit older rows
+            started = timezone.now() - timedelta(hours=1)
+            with mock.patch('netbox_scion.changes.oldest_open_transaction', return_value=started):
+                self.assertEqual(get_changes(querysets)[0], [])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdases = [
+            ISDAS.objects.create(isd_as=isd_as, organization=organization)
+            for isd_as in ("1-ff00:0:10", "1-ff00:0:2", "2-ff00:0:1")
+        ]
+        appliance = Appliance.objects.create(isd_as=self.isdases[0], name="br1")
+        for interface_id in range(1, 6):
+            SCIONLinkAssignment.objects.create(
+                isd_as=self.isdases[0], core=appliance, interface_id=interface_id,
+                relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD
+            )
+        user = get_user_model().objects.create_user(username="keyset", is_superuser=True)
+        self.client.force_login(user)
+
+    def _pages(self, url, field):
+        values = []
+        params = {'cursor': '', 'limit': 2}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.json())
+            values.extend(obj[field] for obj in response.json()['results'])
+            url, params = response.json()['next'], {}
+        return values
+
+    def test_link_assignments(self):
+        url = reverse('plugins-api:netbox_scion-api:scionlinkassignment-list')
+        self.assertEqual(self._pages(url, 'interface_id'), [1, 2, 3, 4, 5])
+
+    def test_isdases(self):
+        url = reverse('plugins-api:netbox_scion-api:isdas-list')
+        self.assertEqual(self._pages(url, 'isd_as'), ["1-ff00:0:2", "1-ff00:0:10", "2-ff00:0:1"])
+
+    def test_invalid_cursor(self):
+        url = reverse('plugins-api:netbox_scion-api:organization-list')
+        self.assertEqual(self.client.get(url, {'cursor': 'invalid'}).status_code, 400)
+        # Offset pagination remains the default
+        self.assertEqual(self.client.get(url).json()['count'], 1)
+
+
+class ApplianceLookupTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdas = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=organization)
+        self.other = ISDAS.objects.create(isd_as="1-ff00:0:111", organization=organization)
+        for name in ("br2", "br1"):
+            Appliance.objects.create(isd_as=self.isdas, name=name)
+
+    def test_cached_names(self):
+        from .appliances import get_appliance_names
+        with self.assertNumQueries(1):
+            names = get_appliance_names([self.isdas.pk, self.other.pk])
+        self.assertEqual(names, {self.isdas.pk: ["br1", "br2"], self.other.pk: []})
+        with self.assertNumQueries(0):
+            self.assertEqual(get_appliance_names([self.other.pk]), {self.other.pk: []})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            appliance = Appliance.objects.create(isd_as=self.other, name="br3")
+        self.assertEqual(get_appliance_names([self.other.pk]), {self.other.pk: ["br3"]})
+        with self.captureOnCommitCallbacks(execute=True):
+            appliance.delete()
+        self.assertEqual(get_appliance_names([self.other.pk]), {self.other.pk: []})
+
+    def test_view(self):
+        user = get_user_model().objects.create_user(username="appliances", is_superuser=True)
+        self.client.force_login(user)
+        url = reverse('plugins:netbox_scion:isdas_appliances_ajax')
+        response = self.client.get(url, {'isdas_id': f'{self.isdas.pk},{self.other.pk}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()['appliances_by_isdas'], {str(self.isdas.pk): ["br1", "br2"], str(self.other.pk): []}
+        )
+        # Same IDs in the other accepted notation
+        response = self.client.get(url, {'isdas_id': [self.isdas.pk, self.other.pk]}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get(url, {'isdas_id': 'x'}).status_code, 400)
+        # Single lookups keep returning a list
+        self.assertEqual(self.client.get(url, {'isdas_id': self.isdas.pk}).json()['appliances'], ["br1", "br2"])
+
+        url = reverse('plugins-api:netbox_scion-api:isdas-cores')
+        response = self.client.get(url, {'isdas_id': self.isdas.pk})
+        self.assertEqual(response.json(), {'cores': ["br1", "br2"]})
+        self.assertEqual(response['Deprecation'], 'true')
+
+    def test_object_permissions(self):
+        from core.models import ObjectType
+        from users.models import ObjectPermission
+        user = get_user_model().objects.create_user(username="restricted")
+        permission = ObjectPermission.objects.create(
+            name="View one ISD-AS", actions=['view'], constraints={'pk': self.other.pk}
+        )
+        permission.object_types.add(ObjectType.objects.get_for_model(ISDAS))
+        permission.users.add(user)
+        self.client.force_login(user)
+        url = reverse('plugins:netbox_scion:isdas_appliances_ajax')
+        response = self.client.get(url, {'isdas_id': f'{self.isdas.pk},{self.other.pk}'})
+        self.assertEqual(response.json()['appliances_by_isdas'], {str(self.other.pk): []})
+        response = self.client.get(url, {'isdas_id': self.isdas.pk}).json()
+        self.assertEqual((response['appliances'], response['error']), ([], 'ISD-AS not found'))
+        url = reverse('plugins-api:netbox_scion-api:isdas-cores')
+        self.assertEqual(self.client.get(url, {'isdas_id': self.isdas.pk}).json(), {'cores': []})
+
+
+class LinkAssignmentFormQueryTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdas = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=organization)
+        Appliance.objects.create(isd_as=self.isdas, name="br1")
+
+    def _data(self, interface_id):
+        return {
+            'isd_as': self.isdas.pk, 'core': "br1", 'interface_id': interface_id,
+            'relationship': SCIONLinkAssignment.RELATIONSHIP_CHILD, 'status': SCIONLinkAssignment.STATUS_ACTIVE,
+        }
+
+    def _table_queries(self, queries, table):
+        return [query for query in queries if f'FROM "{table}"' in query['sql']]
+
+    def test_isdas_fetched_once_per_form(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .forms import SCIONLinkAssignmentForm
+        with CaptureQueriesContext(connection) as queries:
+            form = SCIONLinkAssignmentForm(data=self._data(1))
+            self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(len(self._table_queries(queries.captured_queries, 'netbox_scion_isdas')), 1)
+        self.assertEqual(len(self._table_queries(queries.captured_queries, 'netbox_scion_appliance')), 1)
+
+    def test_shared_isdas_cache(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .forms import SCIONLinkAssignmentForm
+        isdas_cache = {}
+        with CaptureQueriesContext(connection) as queries:
+            for interface_id in (1, 2, 3):
+                form = SCIONLinkAssignmentForm(data=self._data(interface_id), isdas_cache=isdas_cache)
+                self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(len(self._table_queries(queries.captured_queries, 'netbox_scion_isdas')), 1)
+
+    def test_appliance_of_other_isdas_rejected(self):
+        from .forms import SCIONLinkAssignmentForm
+        other = ISDAS.objects.create(isd_as="1-ff00:0:111", organization=self.isdas.organization)
+        Appliance.objects.create(isd_as=other, name="br2")
+        form = SCIONLinkAssignmentForm(data={**self._data(1), 'core': "br2"})
+        self.assertFalse(form.is_valid())
+        self.assertIn('core', form.errors)
+
+
+class LinkAssignmentImportTests(TestCase):
+    CSV = (
+        "ISD-AS,Appliance,Interface ID,Relationship,Peer,Local Underlay\n"
+        "1-ff00:0:110,br1,1,CHILD,1-ff00:0:111#1,10.0.0.1:50000\n"
+        "1-ff00:0:110,br1,2,PARENT,,\n"
+    )
+
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdas = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=organization)
+        self.peer = ISDAS.objects.create(isd_as="1-ff00:0:111", organization=organization)
+        Appliance.objects.create(isd_as=self.isdas, name="br1")
+
+    def test_import_csv(self):
+        import io
+        from .importer import LinkAssignmentImporter
+        importer = LinkAssignmentImporter()
+        self.assertTrue(importer.run(io.StringIO(self.CSV), 'csv'))
+        self.assertEqual(importer.created, 2)
+        assignment = SCIONLinkAssignment.objects.get(interface_id=1)
+        self.assertEqual((assignment.core.name, assignment.status), ("br1", SCIONLinkAssignment.STATUS_ACTIVE))
+        self.assertEqual((assignment.peer_isd_as, assignment.peer_interface_id), (self.peer, 1))
+        self.assertIsNone(SCIONLinkAssignment.objects.get(interface_id=2).peer)
+
+    def test_all_errors_reported_and_rolled_back(self):
+        import io
+        from .importer import LinkAssignmentImporter
+        records = "\n".join((
+            '{"isd_as": "1-ff00:0:110", "core": "br1", "interface_id": 1, "relationship": "CHILD"}',
+            '{"isd_as": "1-ff00:0:999", "core": "br1", "interface_id": 2, "relationship": "CHILD"}',
+            '{"isd_as": "1-ff00:0:110", "core": "br9", "interface_id": 3, "relationship": "CHILD"}',
+            '{"isd_as": "1-ff00:0:110", "core": "br1", "interface_id": 4, "relationship": "CHILD", '
+            '"local_underlay": "invalid"}',
+            '{"isd_as": "1-ff00:0:110", "core": "br1", "interface_id": 1, "relationship": "CHILD"}',
+            'not json',
+        ))
+        # One record per chunk: the duplicate is caught against the row written by an earlier chunk
+        importer = LinkAssignmentImporter(chunk_size=1)
+        self.assertFalse(importer.run(io.StringIO(records), 'ndjson'))
+        self.assertEqual([(number, sorted(errors)) for number, errors in importer.errors], [
+            (2, ['isd_as']), (3, ['core']), (4, ['local_underlay']), (5, ['interface_id']), (6, ['__all__']),
+        ])
+        self.assertEqual(importer.created, 0)
+        self.assertFalse(SCIONLinkAssignment.objects.exists())
+
+    def test_json_and_yaml_are_streamed(self):
+        import io
+        import json
+        from .importer import iter_json, iter_records
+        records = [{'interface_id': n, 'peer': "1-ff00:0:111#1"} for n in range(1, 6)]
+        # Records are decoded across reads of a few characters
+        self.assertEqual(list(iter_json(io.StringIO(json.dumps(records)), read_size=3)), records)
+        self.assertEqual(list(iter_json(io.StringIO(json.dumps(records[0])))), records[:1])
+        stream = io.StringIO('[{"interface_id": 1}, {"interface_id": 2} {"interface_id": 3}]')
+        with self.assertRaises(ValueError):
+            for number, record in iter_records(stream, 'json'):
+                self.assertEqual(record, {'interface_id': number})
+        documents = "interface_id: 1\n---\n- {interface_id: 2}\n- {interface_id: 3}\n"
+        self.assertEqual(
+            list(iter_records(io.StringIO(documents), 'yaml')),
+            [(1, {'interface_id': 1}), (2, {'interface_id': 2}), (3, {'interface_id': 3})]
+        )
+
+    def test_yaml_and_command(self):
+        import os
+        import tempfile
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as fh:
+            fh.write("- {isd_as: 1-ff00:0:110, core: br1, interface_id: 7, relationship: CORE}\n")
+        self.addCleanup(os.unlink, fh.name)
+        call_command('scion_import_links', fh.name, '--dry-run')
+        self.assertFalse(SCIONLinkAssignment.objects.exists())
+        call_command('scion_import_links', fh.name)
+        self.assertEqual(SCIONLinkAssignment.objects.get().interface_id, 7)
+        with self.assertRaises(CommandError):
+            call_command('scion_import_links', fh.name)
+
+    def test_view(self):
+        user = get_user_model().objects.create_user(username="importer", is_superuser=True)
+        self.client.force_login(user)
+        url = reverse('plugins:netbox_scion:scionlinkassignment_bulk_import')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.post(url, {'data': self.CSV, 'format': 'csv'})
+        self.assertRedirects(response, reverse('plugins:netbox_scion:scionlinkassignment_list'))
+        self.assertEqual(SCIONLinkAssignment.objects.count(), 2)
+        response = self.client.post(url, {'data': self.CSV, 'format': 'csv'})
+        self.assertContains(response, "2 invalid records")
+
+
+class UnderlayEndpointTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdas = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=organization)
+        self.br1 = Appliance.objects.create(isd_as=self.isdas, name="br1")
+        self.br2 = Appliance.objects.create(isd_as=self.isdas, name="br2")
+
+    def _link(self, appliance, interface_id, local_underlay, **kwargs):
+        return SCIONLinkAssignment.objects.create(
+            isd_as=self.isdas, core=appliance, interface_id=interface_id,
+            relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD, local_underlay=local_underlay, **kwargs
+        )
+
+    def test_endpoints_are_stored_on_save(self):
+        link = self._link(self.br1, 1, "[2001:db8::1]:50000", peer_underlay="10.0.0.2:40000")
+        link.refresh_from_db()
+        self.assertEqual(str(link.local_underlay_ip.ip), "2001:db8::1")
+        self.assertEqual(link.local_underlay_port, 50000)
+        self.assertEqual(str(link.peer_underlay_ip.ip), "10.0.0.2")
+        self.assertEqual(link.peer_underlay_port, 40000)
+        link.local_underlay = ""
+        link.save(update_fields=['local_underlay'])
+        link.refresh_from_db()
+        self.assertIsNone(link.local_underlay_ip)
+        self.assertIsNone(link.local_underlay_port)
+
+    def test_conflict_on_same_appliance(self):
+        self._link(self.br1, 1, "10.0.0.1:50000")
+        other_appliance = SCIONLinkAssignment(
+            isd_as=self.isdas, core=self.br2, interface_id=2,
+            relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD, local_underlay="10.0.0.1:50000"
+        )
+        other_appliance.full_clean()
+        conflicting = SCIONLinkAssignment(
+            isd_as=self.isdas, core=self.br1, interface_id=3,
+            relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD, local_underlay="10.0.0.1:50000"
+        )
+        with self.assertRaises(ValidationError) as cm:
+            conflicting.full_clean()
+        self.assertIn('local_underlay', cm.exception.message_dict)
+
+    def test_batch_conflicts(self):
+        from .bulk import LinkAssignmentBatch
+        self._link(self.br1, 1, "10.0.0.1:50000")
+        rows = [
+            {'isd_as': self.isdas.pk, 'core': "br1", 'interface_id': 2, 'local_underlay': "10.0.0.1:50000",
+             'relationship': SCIONLinkAssignment.RELATIONSHIP_CHILD},
+            {'isd_as': self.isdas.pk, 'core': "br2", 'interface_id': 3, 'local_underlay': "10.0.0.3:50000",
+             'relationship': SCIONLinkAssignment.RELATIONSHIP_CHILD},
+            {'isd_as': self.isdas.pk, 'core': "br2", 'interface_id': 4, 'local_underlay': "10.0.0.3:50000",
+             'relationship': SCIONLinkAssignment.RELATIONSHIP_CHILD},
+        ]
+        batch = LinkAssignmentBatch(rows)
+        with self.assertNumQueries(3):
+            self.assertFalse(batch.validate())
+        self.assertIn('local_underlay', batch.errors[0])
+        self.assertEqual(batch.errors[1], {})
+        self.assertIn('local_underlay', batch.errors[2])
+
+    def test_filters(self):
+        from .filtersets import SCIONLinkAssignmentFilterSet
+        a = self._link(self.br1, 1, "10.1.0.1:50000")
+        b = self._link(self.br1, 2, "10.2.0.1:50000")
+        c = self._link(self.br2, 3, "[2001:db8::1]:50001")
+        queryset = SCIONLinkAssignment.objects.all()
+
+        def filtered(**params):
+            return set(SCIONLinkAssignmentFilterSet(params, queryset).qs)
+
+        self.assertEqual(filtered(local_underlay_ip__net_contained="10.0.0.0/8"), {a, b})
+        self.assertEqual(filtered(local_underlay_ip__net_contained="10.2.0.0/16"), {b})
+        self.assertEqual(filtered(local_underlay_ip__net_contained="2001:db8::/32"), {c})
+        self.assertEqual(filtered(local_underlay_ip__net_contained="not-a-prefix"), set())
+        self.assertEqual(filtered(local_underlay_ip=["10.1.0.1"]), {a})
+        self.assertEqual(filtered(local_underlay_port=[50001]), {c})
+
+    def test_consistency_check(self):
+        from .consistency import check_links
+        a = self._link(self.br1, 1, "10.0.0.1:50000")
+        # Written in bulk, bypassing validation
+        b, = SCIONLinkAssignment.objects.bulk_create([SCIONLinkAssignment(
+            isd_as=self.isdas, core=self.br1, interface_id=2, relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD,
+            local_underlay="10.0.0.1:50000", local_underlay_ip="10.0.0.1", local_underlay_port=50000,
+        )])
+        self._link(self.br2, 3, "10.0.0.1:50000")
+        issues = check_links(checks=['underlay_conflict'])['issues']
+        self.assertEqual({issue['id'] for issue in issues}, {a.pk, b.pk})
+
+
+class ApplianceOperationTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdas = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=organization)
+        self.appliance = Appliance.objects.create(isd_as=self.isdas, name="br1")
+        Appliance.objects.create(isd_as=self.isdas, name="br2")
+        for n in range(1, 6):
+            SCIONLinkAssignment.objects.create(
+                isd_as=self.isdas, core=self.appliance, interface_id=n,
+                relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD
+            )
+
+    def _url(self, name):
+        return reverse('plugins-api:netbox_scion-api:appliance', kwargs={'pk': self.isdas.pk, 'name': name})
+
+    def test_rename(self):
+        from .appliances import rename_appliance
+        before = self.isdas.last_updated
+        rename_appliance(self.isdas, "br1", "br1-new")
+        self.assertEqual(set(SCIONLinkAssignment.objects.values_list('core__name', flat=True)), {"br1-new"})
+        self.isdas.refresh_from_db()
+        self.assertGreater(self.isdas.last_updated, before)
+        with self.assertRaises(ValidationError):
+            rename_appliance(self.isdas, "br1-new", "br2")
+        with self.assertRaises(Appliance.DoesNotExist):
+            rename_appliance(self.isdas, "br1", "br3")
+
+    def test_remove(self):
+        from .appliances import remove_appliance
+        self.assertEqual(remove_appliance(self.isdas, "br1"), 5)
+        self.assertFalse(SCIONLinkAssignment.objects.exists())
+        self.assertEqual(list(self.isdas.appliances.values_list('name', flat=True)), ["br2"])
+
+    def test_api(self):
+        from core.models import ObjectChange
+        user = get_user_model().objects.create_user(username="operator", is_superuser=True)
+        self.client.force_login(user)
+
+        response = self.client.patch(self._url("br1"), {'name': "br2"}, content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        response = self.client.patch(self._url("br1"), {'name': "br1-new"}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['link_assignments_count'], 5)
+        self.assertEqual(self.client.delete(self._url("br1")).status_code, 404)
+
+        response = self.client.delete(self._url("br1-new"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'deleted_link_assignments': 5})
+        self.assertEqual(ObjectChange.objects.filter(action='delete').count(), 5)
+        self.assertFalse(SCIONLinkAssignment.objects.exists())
+
+
+class BulkChangeLogTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="cleaner", is_superuser=True)
+        self.client.force_login(self.user)
+        self.organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        for n in (1, 2):
+            isdas = ISDAS.objects.create(isd_as=f"1-ff00:0:{n}", organization=self.organization)
+            appliance = Appliance.objects.create(isd_as=isdas, name="br1")
+            for interface_id in range(1, 6):
+                SCIONLinkAssignment.objects.create(
+                    isd_as=isdas, core=appliance, interface_id=interface_id,
+                    relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD
+                )
+
+    def _changelog_inserts(self, queries):
+        return [query for query in queries if query['sql'].startswith('INSERT INTO "core_objectchange"')]
+
+    def test_cascade_is_logged_in_bulk(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from core.models import ObjectChange
+        url = reverse('plugins-api:netbox_scion-api:organization-detail', kwargs={'pk': self.organization.pk})
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(len(self._changelog_inserts(queries.captured_queries)), 1)
+        deleted = ObjectChange.objects.filter(action='delete')
+        self.assertEqual(deleted.count(), 1 + 2 + 10)
+        self.assertEqual(
+            set(deleted.filter(changed_object_type__model='isdas').values_list('object_repr', flat=True)),
+            {"1-ff00:0:1", "1-ff00:0:2"}
+        )
+        self.assertEqual(
+            deleted.filter(changed_object_type__model='isdas').first().prechange_data['appliances'], ["br1"]
+        )
+        self.assertFalse(SCIONLinkAssignment.objects.exists())
+
+    def test_bulk_delete_view(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from core.models import ObjectChange
+        pks = list(SCIONLinkAssignment.objects.values_list('pk', flat=True)[:7])
+        url = reverse('plugins:netbox_scion:scionlinkassignment_bulk_delete')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {'pk': pks, '_confirm': True, 'confirm': True})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(self._changelog_inserts(queries.captured_queries)), 1)
+        self.assertEqual(ObjectChange.objects.filter(action='delete').count(), 7)
+        self.assertEqual(SCIONLinkAssignment.objects.count(), 3)
+
+    def test_delete_triggers_event_rules(self):
+        from unittest import mock
+        from core.events import OBJECT_DELETED
+        from core.models import ObjectType
+        from extras.models import EventRule, Webhook
+        webhook = Webhook.objects.create(name="inventory", payload_url="http://localhost/")
+        rule = EventRule.objects.create(
+            name="Organization deleted", event_types=[OBJECT_DELETED], action_type='webhook',
+            action_object_type=ObjectType.objects.get_for_model(Webhook), action_object_id=webhook.pk,
+        )
+        rule.object_types.set([ObjectType.objects.get_for_model(Organization)])
+        url = reverse('plugins-api:netbox_scion-api:organization-detail', kwargs={'pk': self.organization.pk})
+        with mock.patch('extras.events.process_event_rules') as process_event_rules:
+            self.assertEqual(self.client.delete(url).status_code, 204)
+        fired = [
+            call.kwargs for call in process_event_rules.call_args_list if rule in list(call.kwargs['event_rules'])
+        ]
+        self.assertEqual(len(fired), 1)
+        self.assertEqual(fired[0]['data']['short_name'], "ACME")
+
+
+class LinkSummaryTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdases = [
+            ISDAS.objects.create(isd_as=f"1-ff00:0:{n}", organization=organization) for n in (1, 2)
+        ]
+        self.appliances = [Appliance.objects.create(isd_as=isdas, name="br1") for isdas in self.isdases]
+
+    def _link(self, interface_id, relationship, status=SCIONLinkAssignment.STATUS_ACTIVE, index=0):
+        return SCIONLinkAssignment.objects.create(
+            isd_as=self.isdases[index], core=self.appliances[index], interface_id=interface_id,
+            relationship=relationship, status=status
+        )
+
+    def _summary(self, index=0):
+        from .models import ISDASLinkSummary
+        return ISDASLinkSummary.objects.get(isd_as=self.isdases[index])
+
+    def test_summary_follows_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._link(1, SCIONLinkAssignment.RELATIONSHIP_CORE)
+            self._link(2, SCIONLinkAssignment.RELATIONSHIP_CHILD, status=SCIONLinkAssignment.STATUS_RESERVED)
+            link = self._link(3, SCIONLinkAssignment.RELATIONSHIP_CHILD, status=SCIONLinkAssignment.STATUS_PLANNED)
+        summary = self._summary()
+        self.assertEqual(
+            (summary.link_count, summary.active_count, summary.reserved_count, summary.planned_count),
+            (3, 1, 1, 1)
+        )
+        self.assertEqual((summary.parent_count, summary.child_count, summary.core_count), (0, 2, 1))
+        self.assertEqual(summary.appliance_counts, {str(self.appliances[0].pk): 3})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            link.delete()
+        self.assertEqual(self._summary().link_count, 2)
+
+    def test_bulk_deletion_refreshes_once(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .appliances import remove_appliance
+        with self.captureOnCommitCallbacks(execute=True):
+            for n in range(1, 11):
+                self._link(n, SCIONLinkAssignment.RELATIONSHIP_CHILD)
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            remove_appliance(self.isdases[0], "br1")
+        upserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "netbox_scion_isdaslinksummary"')]
+        self.assertEqual(len(upserts), 1)
+        self.assertEqual(self._summary().link_count, 0)
+
+    def test_api_and_table(self):
+        from utilities.query import count_related
+        from .tables import ISDATable
+        with self.captureOnCommitCallbacks(execute=True):
+            self._link(1, SCIONLinkAssignment.RELATIONSHIP_PARENT)
+        user = get_user_model().objects.create_user(username="viewer", is_superuser=True)
+        self.client.force_login(user)
+        url = reverse('plugins-api:netbox_scion-api:isdas-detail', kwargs={'pk': self.isdases[0].pk})
+        summary = self.client.get(url).json()['link_summary']
+        self.assertEqual(summary['links'], 1)
+        self.assertEqual(summary['relationship']['PARENT'], 1)
+        self.assertEqual(summary['appliances'], {"br1": 1})
+        # ISD-ASes without links have no summary row yet
+        url = reverse('plugins-api:netbox_scion-api:isdas-detail', kwargs={'pk': self.isdases[1].pk})
+        self.assertEqual(self.client.get(url).json()['link_summary']['links'], 0)
+
+        table = ISDATable(ISDAS.objects.select_related('link_summary').prefetch_related('appliances').annotate(
+            appliances_count=count_related(Appliance, 'isd_as'),
+            link_assignments_count=count_related(SCIONLinkAssignment, 'isd_as'),
+        ))
+        rows = {row.record.pk: row for row in table.rows}
+        self.assertEqual(rows[self.isdases[0].pk].get_cell_value('active_links'), 1)
+        self.assertEqual(rows[self.isdases[1].pk].get_cell_value('active_links'), 0)
+
+
+class DashboardWidgetTests(TestCase):
+    def setUp(self):
+        from django.test import RequestFactory
+        self.organization = Organization.objects.create(short_name="ACME", full_name="ACME Corporation")
+        self.isdas = ISDAS.objects.create(isd_as="1-ff00:0:110", organization=self.organization)
+        appliance = Appliance.objects.create(isd_as=self.isdas, name="br1")
+        with self.captureOnCommitCallbacks(execute=True):
+            for interface_id in range(1, 10):
+                SCIONLinkAssignment.objects.create(
+                    isd_as=self.isdas, core=appliance, interface_id=interface_id,
+                    relationship=SCIONLinkAssignment.RELATIONSHIP_CHILD,
+                    status=SCIONLinkAssignment.STATUS_RESERVED if interface_id > 6 else SCIONLinkAssignment.STATUS_ACTIVE
+                )
+        self.request = RequestFactory().get('/')
+        self.request.user = get_user_model().objects.create_user(username="viewer", is_superuser=True)
+
+    def _render(self, widget_class, **config):
+        from django.core.cache import caches
+        from django.test import override_settings
+        with override_settings(
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+            PLUGINS_CONFIG={'netbox_scion': {'interface_id_min': 1, 'interface_id_max': 10}},
+        ):
+            caches['default'].clear()
+            widget = widget_class(config=config)
+            first = widget.render(self.request)
+            with self.assertNumQueries(0):
+                self.assertEqual(widget.render(self.request), first)
+        return first
+
+    def test_widgets(self):
+        from .widgets import InterfaceIDUsageWidget, LinkStatusWidget, RecentLinkAssignmentsWidget, TopISDASWidget
+        status = self._render(LinkStatusWidget)
+        self.assertInHTML('<h6 class="mb-1">9</h6>', status)
+        self.assertInHTML('<h6 class="mb-1">6</h6>', status)
+        self.assertIn("1-ff00:0:110", self._render(TopISDASWidget, count=5))
+        usage = self._render(InterfaceIDUsageWidget, count=5, threshold=80)
+        self.assertIn("90% used, 1 free", usage)
+        self.assertIn("br1 (9)", usage)
+        self.assertNotIn("1-ff00:0:110", self._render(InterfaceIDUsageWidget, count=5, threshold=95))
+        self.assertEqual(self._render(RecentLinkAssignmentsWidget, count=3).count("1-ff00:0:110 #"), 3)
+
+    def test_permission_required(self):
+        from .widgets import NO_PERMISSION, LinkStatusWidget
+        self.request.user = get_user_model().objects.create_user(username="nobody")
+        self.assertEqual(LinkStatusWidget(config={}).render(self.request), NO_PERMISSION)
+
+    def _grant_view(self, user, model, constraints=None):
+        from core.models import ObjectType
+        from users.models import ObjectPermission
+        permission = ObjectPermission.objects.create(
+            name=f"View {model._meta.model_name}", actions=['view'], constraints=constraints
+        )
+        permission.object_types.add(ObjectType.objects.get_for_model(model))
+        permission.users.add(user)
+
+    def test_link_counts_require_link_permission(self):
+        from .widgets import NO_PERMISSION, LinkStatusWidget, TopISDASWidget
+        user = get_user_model().objects.create_user(username="isdas-viewer")
+        self._grant_view(user, ISDAS)
+        self.request.user = user
+        self.assertEqual(LinkStatusWidget(config={}).render(self.request), NO_PERMISSION)
+        self.assertEqual(TopISDASWidget(config={}).render(self.request), NO_PERMISSION)
+
+    def test_constrained_link_permission(self):
+        from .widgets import LinkStatusWidget, TopISDASWidget
+        user = get_user_model().objects.create_user(username="active-viewer")
+        self._grant_view(user, ISDAS)
+        self._grant_view(user, SCIONLinkAssignment, constraints={'status': SCIONLinkAssignment.STATUS_RESERVED})
+        self.request.user = user
+        status = self._render(LinkStatusWidget)
+        self.assertInHTML('<h6 class="mb-1">3</h6>', status)
+        self.assertNotIn('<h6 class="mb-1">9</h6>', status)
+        top = self._render(TopISDASWidget, count=5)
+        self.assertIn("1-ff00:0:110", top)
+        self.assertIn('title="0 active">3</h6>', top)
+
+
+class ApplianceMigrationTests(TransactionTestCase):
+    migrate_from = [('netbox_scion', '0019_add_appliance_model')]
+    migrate_to = [('netbox_scion', '0021_link_assignment_appliance_fk')]
+
+    def _migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        self._migrate(executor.loader.graph.leaf_nodes('netbox_scion'))
+
+    def test_appliances_become_rows(self):
+        apps = self._migrate(self.migrate_from)
+        organization = apps.get_model('netbox_scion', 'Organization').objects.create(
+            short_name="ACME", full_name="ACME Corporation"
+        )
+        isdas = apps.get_model('netbox_scion', 'ISDAS').objects.create(
+            isd_as="1-ff00:0:110", organization=organization, appliances=["br1", "br2"]
+        )
+        apps.get_model('netbox_scion', 'SCIONLinkAssignment').objects.create(
+            isd_as=isdas, core="br3", interface_id=1, relationship='CHILD', peer_name="peer"
+        )
+
+        apps = self._migrate(self.migrate_to)
+        Appliance = apps.get_model('netbox_scion', 'Appliance')
+        self.assertEqual(
+            sorted(Appliance.objects.filter(isd_as_id=isdas.pk).values_list('name', flat=True)),
+            ["br1", "br2", "br3"]
+        )
+        assignment = apps.get_model('netbox_scion', 'SCIONLinkAssignment').objects.get(isd_as_id=isdas.pk)
+        self.assertEqual(assignment.core.name, "br3")
+        self.assertEqual(apps.get_model('netbox_scion', 'ISDAS').objects.get(pk=isdas.pk).appliances.count(), 3)
@@ -0,0 +1,131 @@
+"""
+SCION topology.json generation.
+
+Renders the `border_routers` section of an ISD-AS's topology.json from its
+link assignments with a single query. Rendered documents are cached under a
+key that includes the latest `last_updated` and the number of contributing
+rows, so any change to the data produces a new key and stale entries expire.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Count, Max
+
+from .models import ISDAS, SCIONLinkAssignment
+
+CACHE_PREFIX = 'netbox_scion:topology'
+
+# Statuses of link assignments that are rendered unless requested otherwise
+DEFAULT_STATUSES = (SCIONLinkAssignment.STATUS_ACTIVE,)
+
+
+def _cache_timeout():
+    return settings.PLUGINS_CONFIG.get('netbox_scion', {}).get('topology_cache_timeout', 86400)
+
+
+def topology_queryset(isdas, core=None, statuses=DEFAULT_STATUSES):
+    """Link assignments contributing to the topology of `isdas` (optionally a single appliance)."""
+    queryset = SCIONLinkAssignment.objects.filter(isd_as=isdas, status__in=statuses)
+    if core is not None:
+        queryset = queryset.filter(core=core)
+    return queryset
+
+
+def _remote_isd_as(assignment):
+    if assignment.peer_isd_as is not None:
+        return assignment.peer_isd_as.isd_as
+    if assignment.peer and '#' in assignment.peer:
+        return assignment.peer.rsplit('#', 1)[0]
+    return None
+
+
+def build_topology(isdas, core=None, statuses=DEFAULT_STATUSES):
+    """Return the topology.json document (as a dict) for `isdas`, uncached."""
+    assignments = topology_queryset(isdas, core, statuses).select_related('core', 'peer_isd_as').order_by(
+        'core__name', 'interface_id'
+    )
+
+    border_routers = {}
+    is_core = False
+    for assignment in assignments:
+        interface = {}
+        if assignment.local_underlay or assignment.peer_underlay:
+            interface['underlay'] = {
+                key: value for key, value in (
+                    ('local', assignment.local_underlay), ('remote', assignment.peer_underlay)
+                ) if value
+            }
+        remote = _remote_isd_as(assignment)
+        if remote:
+            interface['isd_as'] = remote
+        interface['link_to'] = assignment.relationship.lower()
+        if assignment.relationship == SCIONLinkAssignment.RELATIONSHIP_CORE:
+            is_core = True
+
+        router = border_routers.setdefault(assignment.core.name, {'interfaces': {}})
+        router['interfaces'][str(assignment.interface_id)] = interface
+
+    topology = {'isd_as': isdas.isd_as}
+    if is_core:
+        topology['attributes'] = ['core']
+    topology['border_routers'] = border_routers
+    return topology
+
+
+def _cache_key(isdas, core, statuses):
+    version = topology_queryset(isdas, core, statuses).aggregate(
+        count=Count('pk'),
+        last_updated=Max('last_updated'),
+        peer_last_updated=Max('peer_isd_as__last_updated'),
+    )
+    # Appliance renames are recorded on the ISD-AS, so its timestamp is part of the key
+    parts = (
+        isdas.pk, core.pk if core else '*', ','.join(sorted(statuses)), isdas.last_updated,
+        version['count'], version['last_updated'], version['peer_last_updated'],
+    )
+    return ':'.join([CACHE_PREFIX, *(str(part) for part in parts)])
+
+
+def render_topology(isdas, core=None, statuses=DEFAULT_STATUSES):
+    """Return the topology.json document for `isdas`, from the cache when the data is unchanged."""
+    key = _cache_key(isdas, core, statuses)
+    topology = cache.get(key)
+    if topology is None:
+        topology = build_topology(isdas, core, statuses)
+        cache.set(key, topology, _cache_timeout())
+    return topology
+
+
+def topology_filename(isdas):
+    return f"{isdas.isd_as.replace(':', '_')}.json"
+
+
+def _write_topology(isdas, directory, statuses):
+    path = os.path.join(directory, topology_filename(isdas))
+    with open(path, 'w') as fh:
+        json.dump(render_topology(isdas, statuses=statuses), fh, indent=2)
+        fh.write('\n')
+    return path
+
+
+def _write_topology_in_thread(isdas, directory, statuses):
+    try:
+        return _write_topology(isdas, directory, statuses)
+    finally:
+        # Worker threads open their own database connections
+        connections.close_all()
+
+
+def dump_topologies(directory, isdases=None, statuses=DEFAULT_STATUSES, workers=4):
+    """Write the topology.json of every ISD-AS in `isdases` (default: all) to `directory` in parallel."""
+    os.makedirs(directory, exist_ok=True)
+    if isdases is None:
+        isdases = ISDAS.objects.all()
+    if workers <= 1:
+        return [_write_topology(isdas, directory, statuses) for isdas in isdases]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda isdas: _write_topology_in_thread(isdas, directory, statuses), isdases))
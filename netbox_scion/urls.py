@@ -12,6 +12,7 @@ urlpatterns = (
     # Organization URLs
     path('organizations/', views.OrganizationListView.as_view(), name='organization_list'),
     path('organizations/add/', views.OrganizationEditView.as_view(), name='organization_add'),
+    path('organizations/export/', views.OrganizationExportView.as_view(), name='organization_export'),
     path('organizations/delete/', views.OrganizationBulkDeleteView.as_view(), name='organization_bulk_delete'),
     path('organizations/<int:pk>/', views.OrganizationView.as_view(), name='organization'),
     path('organizations/<int:pk>/edit/', views.OrganizationEditView.as_view(), name='organization_edit'),
@@ -21,6 +22,7 @@ urlpatterns = (
     # ISD-AS URLs
     path('isd-ases/', views.ISDAListView.as_view(), name='isdas_list'),
     path('isd-ases/add/', views.ISDAEditView.as_view(), name='isdas_add'),
+    path('isd-ases/export/', views.ISDAExportView.as_view(), name='isdas_export'),
     path('isd-ases/delete/', views.ISDABulkDeleteView.as_view(), name='isdas_bulk_delete'),
     path('isd-ases/<int:pk>/', views.ISDAView.as_view(), name='isdas'),
     path('isd-ases/<int:pk>/edit/', views.ISDAEditView.as_view(), name='isdas_edit'),
@@ -34,6 +36,8 @@ urlpatterns = (
     # SCION Link Assignment URLs
     path('link-assignments/', views.SCIONLinkAssignmentListView.as_view(), name='scionlinkassignment_list'),
     path('link-assignments/add/', views.SCIONLinkAssignmentEditView.as_view(), name='scionlinkassignment_add'),
+    path('link-assignments/export/', views.SCIONLinkAssignmentExportView.as_view(), name='scionlinkassignment_export'),
+    path('link-assignments/import/', views.SCIONLinkAssignmentImportView.as_view(), name='scionlinkassignment_bulk_import'),
     path('link-assignments/delete/', views.SCIONLinkAssignmentBulkDeleteView.as_view(), name='scionlinkassignment_bulk_delete'),
     path('link-assignments/<int:pk>/', views.SCIONLinkAssignmentView.as_view(), name='scionlinkassignment'),
     path('link-assignments/<int:pk>/edit/', views.SCIONLinkAssignmentEditView.as_view(), name='scionlinkassignment_edit'),
@@ -0,0 +1,74 @@
+import ipaddress
+
+
+def parse_underlay(value):
+    """
+    Parse an underlay endpoint in format ip:port (IPv6 may be bracketed, e.g.
+    '[2001:db8::1]:50000'). Returns (ip, port) with `ip` as an ipaddress
+    object. Raises ValueError with a user-facing message when invalid.
+    """
+    try:
+        ip_part, port_part = value.rsplit(':', 1)
+    except ValueError:
+        raise ValueError('Must be in format ip:port')
+    # Validate port
+    if not port_part.isdigit() or int(port_part) <= 0:
+        raise ValueError('Port must be a positive integer')
+    # Strip brackets for IPv6 like [2001:db8::1]
+    if ip_part.startswith('[') and ip_part.endswith(']'):
+        ip_part = ip_part[1:-1]
+    # Validate IP (IPv4 or IPv6)
+    try:
+        ip = ipaddress.ip_address(ip_part)
+    except ValueError:
+        raise ValueError('Invalid IP address')
+    return ip, int(port_part)
+
+
+def parse_as(value):
+    """
+    Parse a SCION AS identifier into its 48-bit integer value. Accepts the
+    colon-separated hex form ('ff00:0:110') and the decimal form used for
+    BGP-compatible AS numbers ('64512'). Raises ValueError when invalid.
+    """
+    value = str(value).strip()
+    if ':' in value:
+        groups = value.split(':')
+        if len(groups) != 3:
+            raise ValueError('AS must have three colon-separated hex groups')
+        try:
+            numbers = [int(group, 16) for group in groups]
+        except ValueError:
+            raise ValueError('AS groups must be hexadecimal')
+        if any(number > 0xffff for number in numbers):
+            raise ValueError('AS groups must be at most ffff')
+        return (numbers[0] << 32) | (numbers[1] << 16) | numbers[2]
+    if not value.isdigit():
+        raise ValueError('AS must be decimal or in format ffff:ffff:ffff')
+    number = int(value)
+    if number >= 2 ** 32:
+        raise ValueError('Decimal AS numbers must be below 2^32')
+    return number
+
+
+def parse_isd_as(value):
+    """Parse '{isd}-{as}' (e.g. '1-ff00:0:110' or '1-1') into (isd, as) integers. Raises ValueError."""
+    try:
+        isd_part, as_part = str(value).strip().split('-', 1)
+    except ValueError:
+        raise ValueError("ISD-AS must be in format '{isd}-{as}'")
+    if not isd_part.isdigit() or int(isd_part) > 0xffff:
+        raise ValueError('ISD must be a number between 0 and 65535')
+    return int(isd_part), parse_as(as_part)
+
+
+def parse_peer(value):
+    """Parse a peer reference '{isd}-{as}#{interface}' into (isd, as, interface) integers. Raises ValueError."""
+    try:
+        isd_as, interface = str(value).strip().rsplit('#', 1)
+    except ValueError:
+        raise ValueError("Peer must be in format '{isd}-{as}#{interface}'")
+    if not interface.isdigit():
+        raise ValueError('Peer interface must be a number')
+    isd, asn = parse_isd_as(isd_as)
+    return isd, asn, int(interface)
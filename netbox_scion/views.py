@@ -1,14 +1,63 @@
-from django.http import JsonResponse
+import hashlib
+import io
+
+from django.core.exceptions import ValidationError
+from django.db.models import ProtectedError, RestrictedError
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views import View
 from django.views.generic.base import RedirectView
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from netbox.views import generic
+from utilities.permissions import get_permission_for_model
+from utilities.error_handlers import handle_protectederror
+from utilities.query import count_related
+from utilities.views import ObjectPermissionRequiredMixin
 from . import forms, models, tables, filtersets
+from .appliances import get_appliance_names, remove_appliance, rename_appliance
+from .changelog import delete_with_changelog
+from .export import EXPORT_FORMATS, streaming_export
+from .importer import LinkAssignmentImporter
+
+
+class ChangeLoggedBulkDeleteMixin:
+    """
+    Deletes the confirmed selection with `delete_with_changelog()`: the objects
+    and everything their deletion cascades to are collected once and recorded
+    in the changelog with one bulk INSERT per request instead of one per object.
+    """
+
+    def post(self, request, **kwargs):
+        form = self.get_form()(request.POST)
+        if '_confirm' not in request.POST or not form.is_valid():
+            return super().post(request, **kwargs)
+
+        model = self.queryset.model
+        if request.POST.get('_all'):
+            queryset = model.objects.all()
+            if self.filterset is not None:
+                queryset = self.filterset(request.GET, queryset).qs
+            pk_list = queryset.values('pk')
+        else:
+            pk_list = [int(pk) for pk in request.POST.getlist('pk')]
+
+        # `queryset` is restricted to the objects the user may delete
+        objects = list(self.queryset.filter(pk__in=pk_list))
+        try:
+            delete_with_changelog(objects, request)
+        except (ProtectedError, RestrictedError) as e:
+            handle_protectederror(objects, request, e)
+            return redirect(self.get_return_url(request))
+
+        messages.success(request, f"Deleted {len(objects)} {model._meta.verbose_name_plural}")
+        return redirect(self.get_return_url(request))
 
 
 class PluginHomeView(generic.ObjectListView):
     """Home view for the SCION plugin showing all main sections."""
-    queryset = models.SCIONLinkAssignment.objects.select_related('isd_as', 'isd_as__organization')
+    queryset = models.SCIONLinkAssignment.objects.select_related('isd_as', 'isd_as__organization', 'core')
     table = tables.SCIONLinkAssignmentTable
     filterset = filtersets.SCIONLinkAssignmentFilterSet
     filterset_form = forms.SCIONLinkAssignmentFilterForm
@@ -16,46 +65,95 @@ class PluginHomeView(generic.ObjectListView):
 
 
 def get_isdas_appliances(request):
-    """AJAX view to get appliances for a specific ISD-AS"""
-    isdas_id = request.GET.get('isdas_id')
-    
-    if isdas_id:
-        try:
-            isdas = models.ISDAS.objects.get(pk=isdas_id)
-            appliances = isdas.appliances or []
-            
-            return JsonResponse({
-                'appliances': appliances
-            })
-        except models.ISDAS.DoesNotExist:
-            return JsonResponse({
-                'error': 'ISD-AS not found',
-                'appliances': []
-            })
-        except Exception as e:
-            return JsonResponse({
-                'error': str(e),
-                'appliances': []
-            })
-    
-    return JsonResponse({
-        'error': 'No ISD-AS ID provided',
-        'appliances': []
-    })
+    """
+    AJAX view returning the appliance names of one or more ISD-ASes
+    (`?isdas_id=1&isdas_id=2` or `?isdas_id=1,2`) as
+    {"appliances_by_isdas": {"<id>": [...]}}; a lookup of a single ISD-AS also
+    returns its names as the list `appliances`, as before. ISD-ASes the user
+    may not view are left out. Names are served from the appliance cache and
+    browsers revalidate them with the ETag, so repeated lookups cost one query.
+    """
+    if not request.user.has_perm('netbox_scion.view_isdas'):
+        return JsonResponse({'error': 'Permission denied', 'appliances': []}, status=403)
+    try:
+        isdas_ids = sorted({int(pk) for value in request.GET.getlist('isdas_id') for pk in value.split(',') if pk})
+    except ValueError:
+        return JsonResponse({'error': 'Invalid ISD-AS ID', 'appliances': []}, status=400)
+    if not isdas_ids:
+        return JsonResponse({'error': 'No ISD-AS ID provided', 'appliances': []}, status=400)
+
+    visible = sorted(
+        models.ISDAS.objects.restrict(request.user, 'view').filter(pk__in=isdas_ids).values_list('pk', flat=True)
+    )
+    appliances = get_appliance_names(visible)
+    data = {'appliances_by_isdas': {str(pk): names for pk, names in appliances.items()}}
+    if len(isdas_ids) == 1:
+        data['appliances'] = appliances.get(isdas_ids[0], [])
+        if not visible:
+            data['error'] = 'ISD-AS not found'
+    response = JsonResponse(data)
+    etag = quote_etag(hashlib.sha256(response.content).hexdigest()[:32])
+    response = get_conditional_response(request, etag=etag, response=response)
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ObjectStreamExportView(ObjectPermissionRequiredMixin, View):
+    """
+    Stream all objects matching the list filters as CSV (default) or NDJSON
+    (`?export_format=ndjson`) without loading them into memory.
+    """
+    queryset = None
+    filterset = None
+
+    def get_required_permission(self):
+        return get_permission_for_model(self.queryset.model, 'view')
+
+    def get(self, request):
+        export_format = request.GET.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest(f"Unsupported export format: {export_format}")
+        queryset = self.filterset(request.GET, self.queryset).qs
+        return streaming_export(queryset, export_format)
 
 
 class OrganizationView(generic.ObjectView):
-    queryset = models.Organization.objects.prefetch_related('isd_ases')
+    queryset = models.Organization.objects.all()
     template_name = 'netbox_scion/organization_detail.html'
 
+    def get_extra_context(self, request, instance):
+        # Paginated, pre-annotated table so the page cost does not grow with the number of ISD-ASes
+        isd_ases_table = tables.ISDATable(
+            models.ISDAS.objects.filter(organization=instance).select_related(
+                'organization', 'link_summary'
+            ).prefetch_related('appliances').annotate(
+                appliances_count=count_related(models.Appliance, 'isd_as'),
+                link_assignments_count=count_related(models.SCIONLinkAssignment, 'isd_as'),
+            )
+        )
+        isd_ases_table.columns.hide('organization')
+        isd_ases_table.configure(request)
+
+        return {
+            'isd_ases_table': isd_ases_table,
+        }
+
 
 class OrganizationListView(generic.ObjectListView):
-    queryset = models.Organization.objects.prefetch_related('isd_ases')
+    queryset = models.Organization.objects.annotate(
+        isd_ases_count=count_related(models.ISDAS, 'organization')
+    )
     table = tables.OrganizationTable
     filterset = filtersets.OrganizationFilterSet
     filterset_form = forms.OrganizationFilterForm
 
 
+class OrganizationExportView(ObjectStreamExportView):
+    queryset = models.Organization.objects.all()
+    filterset = filtersets.OrganizationFilterSet
+
+
 class OrganizationEditView(generic.ObjectEditView):
     queryset = models.Organization.objects.all()
     form = forms.OrganizationForm
@@ -65,8 +163,10 @@ class OrganizationDeleteView(generic.ObjectDeleteView):
     queryset = models.Organization.objects.all()
 
 
-class OrganizationBulkDeleteView(generic.BulkDeleteView):
-    queryset = models.Organization.objects.all()
+class OrganizationBulkDeleteView(ChangeLoggedBulkDeleteMixin, generic.BulkDeleteView):
+    queryset = models.Organization.objects.annotate(
+        isd_ases_count=count_related(models.ISDAS, 'organization')
+    )
     table = tables.OrganizationTable
 
 
@@ -80,14 +180,42 @@ class ISDAView(generic.ObjectView):
     queryset = models.ISDAS.objects.select_related('organization')
     template_name = 'netbox_scion/isdas_detail.html'
 
+    def get_extra_context(self, request, instance):
+        # Paginated table so the page cost does not grow with the number of link assignments
+        link_assignments_table = tables.SCIONLinkAssignmentTable(
+            models.SCIONLinkAssignment.objects.filter(isd_as=instance).select_related('isd_as', 'core')
+        )
+        link_assignments_table.columns.hide('isd_as')
+        link_assignments_table.configure(request)
+
+        appliances = instance.appliances.annotate(
+            link_assignments_count=count_related(models.SCIONLinkAssignment, 'core')
+        )
+
+        return {
+            'appliances': appliances,
+            'inbound_links_count': instance.inbound_link_assignments.count(),
+            'link_assignments_table': link_assignments_table,
+        }
+
 
 class ISDAListView(generic.ObjectListView):
-    queryset = models.ISDAS.objects.select_related('organization').prefetch_related('link_assignments')
+    queryset = models.ISDAS.objects.select_related('organization', 'link_summary').prefetch_related(
+        'appliances'
+    ).annotate(
+        appliances_count=count_related(models.Appliance, 'isd_as'),
+        link_assignments_count=count_related(models.SCIONLinkAssignment, 'isd_as'),
+    )
     table = tables.ISDATable
     filterset = filtersets.ISDAFilterSet
     filterset_form = forms.ISDAFilterForm
 
 
+class ISDAExportView(ObjectStreamExportView):
+    queryset = models.ISDAS.objects.select_related('organization').prefetch_related('appliances')
+    filterset = filtersets.ISDAFilterSet
+
+
 class ISDAEditView(generic.ObjectEditView):
     queryset = models.ISDAS.objects.all()
     form = forms.ISDAForm
@@ -97,8 +225,13 @@ class ISDADeleteView(generic.ObjectDeleteView):
     queryset = models.ISDAS.objects.all()
 
 
-class ISDABulkDeleteView(generic.BulkDeleteView):
-    queryset = models.ISDAS.objects.all()
+class ISDABulkDeleteView(ChangeLoggedBulkDeleteMixin, generic.BulkDeleteView):
+    queryset = models.ISDAS.objects.select_related('organization', 'link_summary').prefetch_related(
+        'appliances'
+    ).annotate(
+        appliances_count=count_related(models.Appliance, 'isd_as'),
+        link_assignments_count=count_related(models.SCIONLinkAssignment, 'isd_as'),
+    )
     table = tables.ISDATable
 
 
@@ -116,11 +249,11 @@ def add_appliance_to_isdas(request, pk):
         form = forms.ApplianceManagementForm(request.POST)
         if form.is_valid():
             appliance_name = form.cleaned_data['appliance_name']
-            appliances = isdas.appliances or []
             
-            if appliance_name not in appliances:
-                appliances.append(appliance_name)
-                isdas.appliances = appliances
+            if not isdas.appliances.filter(name=appliance_name).exists():
+                isdas.snapshot()
+                models.Appliance.objects.create(isd_as=isdas, name=appliance_name)
+                # Save the ISD-AS so the change is recorded in its changelog
                 isdas.save()
                 messages.success(request, f'Appliance "{appliance_name}" added successfully.')
             else:
@@ -141,9 +274,8 @@ def add_appliance_to_isdas(request, pk):
 def edit_appliance_in_isdas(request, pk, appliance_name):
     """Edit an appliance name in an ISD-AS"""
     isdas = get_object_or_404(models.ISDAS, pk=pk)
-    appliances = isdas.appliances or []
     
-    if appliance_name not in appliances:
+    if not isdas.appliances.filter(name=appliance_name).exists():
         messages.error(request, f'Appliance "{appliance_name}" not found.')
         return redirect('plugins:netbox_scion:isdas', pk=pk)
     
@@ -153,21 +285,13 @@ def edit_appliance_in_isdas(request, pk, appliance_name):
             new_appliance_name = form.cleaned_data['appliance_name']
             
             if new_appliance_name != appliance_name:
-                if new_appliance_name in appliances:
-                    messages.error(request, f'Appliance "{new_appliance_name}" already exists.')
+                try:
+                    rename_appliance(isdas, appliance_name, new_appliance_name)
+                except models.Appliance.DoesNotExist:
+                    messages.error(request, f'Appliance "{appliance_name}" not found.')
+                except ValidationError as e:
+                    messages.error(request, ' '.join(e.messages))
                 else:
-                    # Update appliance name in the list
-                    appliance_index = appliances.index(appliance_name)
-                    appliances[appliance_index] = new_appliance_name
-                    isdas.appliances = appliances
-                    isdas.save()
-                    
-                    # Update all SCION link assignments that use this appliance
-                    assignments = models.SCIONLinkAssignment.objects.filter(
-                        isd_as=isdas, core=appliance_name
-                    )
-                    assignments.update(core=new_appliance_name)
-                    
                     messages.success(request, f'Appliance renamed from "{appliance_name}" to "{new_appliance_name}".')
             else:
                 messages.info(request, 'No changes made.')
@@ -189,22 +313,13 @@ def remove_appliance_from_isdas(request, pk, appliance_name):
     """Remove an appliance from an ISD-AS and all associated SCION link assignments"""
     isdas = get_object_or_404(models.ISDAS, pk=pk)
     
-    appliances = isdas.appliances or []
-    if appliance_name in appliances:
-        # Check how many SCION link assignments will be deleted
-        assignments_to_delete = models.SCIONLinkAssignment.objects.filter(
-            isd_as=isdas, core=appliance_name
-        )
-        assignments_count = assignments_to_delete.count()
-        
-        # Remove the appliance
-        appliances.remove(appliance_name)
-        isdas.appliances = appliances
-        isdas.save()
-        
-        # Delete all associated SCION link assignments
+    try:
+        # Its SCION link assignments are deleted in the same transaction
+        assignments_count = remove_appliance(isdas, appliance_name)
+    except models.Appliance.DoesNotExist:
+        messages.error(request, f'Appliance "{appliance_name}" not found.')
+    else:
         if assignments_count > 0:
-            assignments_to_delete.delete()
             messages.warning(
                 request, 
                 f'Appliance "{appliance_name}" removed successfully. '
@@ -212,26 +327,72 @@ def remove_appliance_from_isdas(request, pk, appliance_name):
             )
         else:
             messages.success(request, f'Appliance "{appliance_name}" removed successfully.')
-    else:
-        messages.error(request, f'Appliance "{appliance_name}" not found.')
     
     return redirect('plugins:netbox_scion:isdas', pk=pk)
 
 
 class SCIONLinkAssignmentView(generic.ObjectView):
-    queryset = models.SCIONLinkAssignment.objects.select_related('isd_as', 'isd_as__organization')
+    queryset = models.SCIONLinkAssignment.objects.select_related('isd_as', 'isd_as__organization', 'core', 'peer_isd_as')
     template_name = 'netbox_scion/scionlinkassignment_detail.html'
 
 
 class SCIONLinkAssignmentListView(generic.ObjectListView):
-    queryset = models.SCIONLinkAssignment.objects.select_related('isd_as', 'isd_as__organization')
+    queryset = models.SCIONLinkAssignment.objects.select_related('isd_as', 'isd_as__organization', 'core')
     table = tables.SCIONLinkAssignmentTable
     filterset = filtersets.SCIONLinkAssignmentFilterSet
     filterset_form = forms.SCIONLinkAssignmentFilterForm
 
 
-class SCIONLinkAssignmentEditView(generic.ObjectEditView):
+class SCIONLinkAssignmentImportView(ObjectPermissionRequiredMixin, View):
+    """
+    Import link assignments from pasted or uploaded CSV/JSON/NDJSON/YAML in
+    validated chunks instead of one model form per row. Nothing is written
+    unless every record is valid.
+    """
     queryset = models.SCIONLinkAssignment.objects.all()
+    template_name = 'netbox_scion/scionlinkassignment_import.html'
+    # Errors listed on the page; the total is always shown
+    max_errors = 200
+
+    def get_required_permission(self):
+        return get_permission_for_model(self.queryset.model, 'add')
+
+    def get(self, request):
+        return render(request, self.template_name, {'form': forms.LinkAssignmentImportForm()})
+
+    def post(self, request):
+        form = forms.LinkAssignmentImportForm(request.POST, request.FILES)
+        errors = []
+        if form.is_valid():
+            upload = form.cleaned_data['upload_file']
+            if upload:
+                stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            else:
+                stream = io.StringIO(form.cleaned_data['data'], newline='')
+            importer = LinkAssignmentImporter(request=request, queryset=self.queryset)
+            if importer.run(stream, form.cleaned_data['format']):
+                messages.success(request, f"Imported {importer.created} SCION link assignment(s).")
+                return redirect('plugins:netbox_scion:scionlinkassignment_list')
+            errors = importer.errors
+
+        return render(request, self.template_name, {
+            'form': form,
+            'errors': [
+                (number, field, message)
+                for number, row_errors in errors[:self.max_errors]
+                for field, field_messages in row_errors.items() for message in field_messages
+            ],
+            'errors_count': len(errors),
+        })
+
+
+class SCIONLinkAssignmentExportView(ObjectStreamExportView):
+    queryset = models.SCIONLinkAssignment.objects.select_related('isd_as', 'core')
+    filterset = filtersets.SCIONLinkAssignmentFilterSet
+
+
+class SCIONLinkAssignmentEditView(generic.ObjectEditView):
+    queryset = models.SCIONLinkAssignment.objects.select_related('core')
     form = forms.SCIONLinkAssignmentForm
     template_name = 'netbox_scion/scionlinkassignment_edit.html'
 
@@ -240,8 +401,8 @@ class SCIONLinkAssignmentDeleteView(generic.ObjectDeleteView):
     queryset = models.SCIONLinkAssignment.objects.all()
 
 
-class SCIONLinkAssignmentBulkDeleteView(generic.BulkDeleteView):
-    queryset = models.SCIONLinkAssignment.objects.all()
+class SCIONLinkAssignmentBulkDeleteView(ChangeLoggedBulkDeleteMixin, generic.BulkDeleteView):
+    queryset = models.SCIONLinkAssignment.objects.select_related('isd_as', 'core')
     table = tables.SCIONLinkAssignmentTable
 
 
@@ -0,0 +1,241 @@
+"""
+NetBox dashboard widgets giving an overview of the SCION inventory.
+
+Each widget computes its data with one or two aggregate queries and caches
+the result for the `dashboard_cache_timeout` plugin setting (in seconds), so
+dashboard loads by many users cost at most one computation per widget
+configuration and TTL. Data is restricted to the objects the user may view;
+users with the same object permissions share a cache entry, which is keyed by
+the SQL of their restricted querysets. Link counts are read from the ISD-AS
+link summaries unless the user's view permission on link assignments is
+limited by constraints; they are then counted from the permitted assignments.
+"""
+import hashlib
+import math
+
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Count, Q, Sum
+from django.template.loader import render_to_string
+from extras.dashboard.utils import register_widget
+from extras.dashboard.widgets import DashboardWidget, WidgetConfigForm
+
+from .models import ISDAS, ISDASLinkSummary, SCIONLinkAssignment
+
+CACHE_PREFIX = 'netbox_scion:dashboard'
+
+NO_PERMISSION = 'You do not have permission to view this content.'
+
+# Link summary column -> condition on link assignments
+LINK_COUNTS = {
+    'link_count': None,
+    **{f'{value.lower()}_count': Q(status=value) for value, _ in SCIONLinkAssignment.STATUS_CHOICES},
+    **{f'{value.lower()}_count': Q(relationship=value) for value, _ in SCIONLinkAssignment.RELATIONSHIP_CHOICES},
+}
+
+
+def _cache_timeout():
+    return settings.PLUGINS_CONFIG.get('netbox_scion', {}).get('dashboard_cache_timeout', 60)
+
+
+def _scope(queryset):
+    """Identify the rows `queryset` can see; equal for users with the same object permissions."""
+    try:
+        sql = str(queryset.query)
+    except EmptyResultSet:
+        return 'none'
+    return hashlib.sha256(sql.encode()).hexdigest()[:16]
+
+
+def cached(name, querysets, compute, *params):
+    """Return `compute()` for `querysets`, cached per widget, parameters and permission scope."""
+    key = ':'.join(str(part) for part in (CACHE_PREFIX, name, *params, *(_scope(qs) for qs in querysets)))
+    data = cache.get(key)
+    if data is None:
+        data = compute()
+        cache.set(key, data, _cache_timeout())
+    return data
+
+
+def has_link_permissions(user):
+    """Whether `user` may view ISD-ASes and link assignments (both are needed for link counts)."""
+    return user.has_perm('netbox_scion.view_isdas') and user.has_perm('netbox_scion.view_scionlinkassignment')
+
+
+def links_constrained(user):
+    """
+    Whether the user's view permission on link assignments is limited by
+    object constraints (read from the permission cache filled by `has_perm()`).
+    """
+    if user.is_superuser:
+        return False
+    constraints = getattr(user, '_object_perm_cache', {}).get('netbox_scion.view_scionlinkassignment', [])
+    return all(constraints)
+
+
+class CountConfigForm(WidgetConfigForm):
+    count = forms.IntegerField(
+        min_value=1,
+        max_value=100,
+        initial=10,
+        help_text="Number of rows to display"
+    )
+
+
+@register_widget
+class LinkStatusWidget(DashboardWidget):
+    """Link assignments by status and relationship, summed over the ISD-AS link summaries."""
+    default_title = 'SCION Links by Status'
+    description = 'Number of SCION link assignments by status and relationship.'
+    template_name = 'netbox_scion/widgets/link_status.html'
+    width = 4
+    height = 3
+
+    def render(self, request):
+        if not has_link_permissions(request.user):
+            return NO_PERMISSION
+        isdases = ISDAS.objects.restrict(request.user, 'view')
+        assignments = SCIONLinkAssignment.objects.restrict(request.user, 'view')
+
+        def compute():
+            if links_constrained(request.user):
+                totals = assignments.filter(isd_as__in=isdases).aggregate(**{
+                    column: Count('pk', filter=condition) for column, condition in LINK_COUNTS.items()
+                })
+            else:
+                totals = ISDASLinkSummary.objects.filter(isd_as__in=isdases).aggregate(**{
+                    column: Sum(column) for column in LINK_COUNTS
+                })
+            return {column: total or 0 for column, total in totals.items()}
+
+        totals = cached('link_status', (isdases, assignments), compute)
+        return render_to_string(self.template_name, {
+            'total': totals['link_count'],
+            'statuses': [
+                (value, label, totals[f'{value.lower()}_count'])
+                for value, label in SCIONLinkAssignment.STATUS_CHOICES
+            ],
+            'relationships': [
+                (value, label, totals[f'{value.lower()}_count'])
+                for value, label in SCIONLinkAssignment.RELATIONSHIP_CHOICES
+            ],
+        })
+
+
+@register_widget
+class TopISDASWidget(DashboardWidget):
+    """ISD-ASes with the most link assignments, read from their link summaries."""
+    default_title = 'Top ISD-ASes by Links'
+    description = 'ISD-ASes with the most SCION link assignments.'
+    template_name = 'netbox_scion/widgets/top_isdases.html'
+    default_config = {'count': 10}
+    width = 4
+    height = 4
+
+    class ConfigForm(CountConfigForm):
+        pass
+
+    def render(self, request):
+        if not has_link_permissions(request.user):
+            return NO_PERMISSION
+        isdases = ISDAS.objects.restrict(request.user, 'view')
+        assignments = SCIONLinkAssignment.objects.restrict(request.user, 'view')
+        count = self.config.get('count', 10)
+        fields = ('isd_as_id', 'isd_as__isd_as', 'isd_as__organization__short_name')
+
+        def compute():
+            if links_constrained(request.user):
+                rows = assignments.filter(isd_as__in=isdases).values(*fields).annotate(
+                    link_count=Count('pk'), active_count=Count('pk', filter=LINK_COUNTS['active_count'])
+                )
+            else:
+                rows = ISDASLinkSummary.objects.filter(isd_as__in=isdases, link_count__gt=0).values(
+                    *fields, 'link_count', 'active_count'
+                )
+            return list(rows.order_by('-link_count', 'isd_as__isd', 'isd_as__asn')[:count])
+
+        rows = cached('top_isdases', (isdases, assignments), compute, count)
+        return render_to_string(self.template_name, {'rows': rows})
+
+
+@register_widget
+class InterfaceIDUsageWidget(DashboardWidget):
+    """
+    ISD-ASes whose appliances are running out of interface IDs. IDs are unique
+    per ISD-AS, so the appliances of an ISD-AS share the configured range.
+    """
+    default_title = 'SCION Interface ID Usage'
+    description = 'Appliances of ISD-ASes that use most of the configured interface ID range.'
+    template_name = 'netbox_scion/widgets/interface_id_usage.html'
+    default_config = {'count': 10, 'threshold': 80}
+    width = 4
+    height = 4
+
+    class ConfigForm(CountConfigForm):
+        threshold = forms.IntegerField(
+            min_value=1,
+            max_value=100,
+            initial=80,
+            help_text="Show ISD-ASes using at least this percentage of the interface ID range"
+        )
+
+    def render(self, request):
+        if not request.user.has_perm('netbox_scion.view_scionlinkassignment'):
+            return NO_PERMISSION
+        assignments = SCIONLinkAssignment.objects.restrict(request.user, 'view')
+        count = self.config.get('count', 10)
+        threshold = self.config.get('threshold', 80)
+        start, end = ISDAS.interface_id_range()
+        size = end - start + 1
+
+        def compute():
+            in_range = assignments.filter(interface_id__range=(start, end))
+            rows = list(in_range.values('isd_as_id', 'isd_as__isd_as').annotate(used=Count('pk')).filter(
+                used__gte=math.ceil(size * threshold / 100)
+            ).order_by('-used', 'isd_as__isd_as')[:count])
+            appliances = {}
+            for isdas_id, name, used in in_range.filter(isd_as_id__in=[row['isd_as_id'] for row in rows]).values(
+                'isd_as_id', 'core__name'
+            ).annotate(used=Count('pk')).order_by('core__name').values_list('isd_as_id', 'core__name', 'used'):
+                appliances.setdefault(isdas_id, []).append((name, used))
+            for row in rows:
+                row['free'] = size - row['used']
+                row['percent'] = row['used'] * 100 // size
+                row['appliances'] = appliances.get(row['isd_as_id'], [])
+            return rows
+
+        rows = cached('interface_id_usage', (assignments,), compute, count, threshold, start, end)
+        return render_to_string(self.template_name, {'rows': rows, 'threshold': threshold})
+
+
+@register_widget
+class RecentLinkAssignmentsWidget(DashboardWidget):
+    """The most recently created or changed link assignments."""
+    default_title = 'Recently Changed SCION Links'
+    description = 'SCION link assignments created or changed most recently.'
+    template_name = 'netbox_scion/widgets/recent_link_assignments.html'
+    default_config = {'count': 10}
+    width = 4
+    height = 4
+
+    class ConfigForm(CountConfigForm):
+        pass
+
+    def render(self, request):
+        if not request.user.has_perm('netbox_scion.view_scionlinkassignment'):
+            return NO_PERMISSION
+        assignments = SCIONLinkAssignment.objects.restrict(request.user, 'view')
+        count = self.config.get('count', 10)
+
+        def compute():
+            # Served by the (last_updated, id) index
+            return list(assignments.order_by('-last_updated', '-pk').values(
+                'pk', 'isd_as__isd_as', 'interface_id', 'core__name', 'status', 'last_updated'
+            )[:count])
+
+        return render_to_string(self.template_name, {
+            'rows': cached('recent_link_assignments', (assignments,), compute, count),
+            'statuses': dict(SCIONLinkAssignment.STATUS_CHOICES),
+        })
@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+"""
+Query-count and latency benchmarks for the plugin's UI views and API endpoints.
+
+Seeds a synthetic SCION inventory, requests every named URL exposed by
+``urls.py`` and ``api/urls.py`` and records queries-per-request, wall time and
+peak Python memory. Results can be stored as a JSON baseline and later runs
+compared against it. This is a development tool and is not part of the
+installed plugin; run it from the NetBox directory (next to ``manage.py``):
+
+    python /path/to/netbox-scion/scripts/scion_benchmark.py --help
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import django
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.getcwd())
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'netbox.settings')
+    django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import URLPattern, URLResolver, reverse  # noqa: E402
+
+from netbox_scion import urls as ui_urls  # noqa: E402
+from netbox_scion.api import urls as api_urls  # noqa: E402
+from netbox_scion.models import Organization, ISDAS, Appliance, SCIONLinkAssignment  # noqa: E402
+from netbox_scion.summary import refresh_summaries  # noqa: E402
+from netbox_scion.utils import parse_isd_as  # noqa: E402
+
+UI_NAMESPACE = 'plugins:netbox_scion'
+API_NAMESPACE = 'plugins-api:netbox_scion-api'
+
+# URL name prefixes (UI) and router basenames (API) mapped to the model used to resolve `pk`
+URL_MODELS = {
+    'organization': Organization,
+    'isdas': ISDAS,
+    'add_appliance': ISDAS,
+    'edit_appliance': ISDAS,
+    'scionlinkassignment': SCIONLinkAssignment,
+}
+
+# Views that change state on GET or do not accept GET
+SKIPPED_URLS = {
+    'remove_appliance',
+    'organization_bulk_delete',
+    'isdas_bulk_delete',
+    'scionlinkassignment_bulk_delete',
+    'scionlinkassignment-bulk',
+    'appliance',
+}
+
+# Query strings needed for endpoints that expect parameters
+URL_QUERY_PARAMS = {
+    'isdas_appliances_ajax': 'isdas_id={isdas}',
+    'scionlinkassignment-allocate': 'isd_as={isdas}&count=10',
+    'isdas-core-mesh': 'isd=1',
+}
+
+# Additional (namespace, URL name, query string) targets, e.g. free-text searches on the list views
+EXTRA_TARGETS = (
+    (UI_NAMESPACE, 'organization_list', 'q=Organization+1'),
+    (UI_NAMESPACE, 'isdas_list', 'q=ff00:0:1'),
+    (UI_NAMESPACE, 'scionlinkassignment_list', 'q=peer-1-'),
+    (UI_NAMESPACE, 'scionlinkassignment_list', 'q=br1.'),
+    (API_NAMESPACE, 'scionlinkassignment-list', 'q=peer-1-'),
+    (API_NAMESPACE, 'scionlinkassignment-list', 'local_underlay_ip__net_contained=10.0.0.0/16'),
+)
+
+APPLIANCES_PER_ISDAS = 2
+
+
+def seed_inventory(organizations=10, isdases=100, links=1000, batch_size=5000):
+    """
+    Bulk-create a synthetic inventory. Links are spread evenly across the
+    ISD-ASes, each peering with another seeded ISD-AS. Signals are bypassed.
+    """
+    orgs = Organization.objects.bulk_create([
+        Organization(short_name=f'bench-org-{n}', full_name=f'Benchmark Organization {n}')
+        for n in range(organizations)
+    ], batch_size=batch_size)
+    org_ids = [org.pk for org in orgs]
+
+    names = [f'{1 + n // 0x10000}-ff00:0:{n % 0x10000:x}' for n in range(isdases)]
+    # bulk_create() bypasses save(), so derive the numeric ISD and AS here
+    isdases_created = ISDAS.objects.bulk_create([
+        ISDAS(isd_as=name, isd=isd, asn=asn, organization_id=org_ids[n % len(org_ids)])
+        for n, (name, (isd, asn)) in enumerate(zip(names, map(parse_isd_as, names)))
+    ], batch_size=batch_size)
+    isdas_ids = {isdas.isd_as: isdas.pk for isdas in isdases_created}
+
+    appliances = Appliance.objects.bulk_create([
+        Appliance(isd_as_id=isdas_ids[name], name=f'br{i}.{name}')
+        for name in names for i in range(APPLIANCES_PER_ISDAS)
+    ], batch_size=batch_size)
+    appliance_ids = {(appliance.isd_as_id, appliance.name): appliance.pk for appliance in appliances}
+
+    relationships = [choice[0] for choice in SCIONLinkAssignment.RELATIONSHIP_CHOICES]
+    statuses = [choice[0] for choice in SCIONLinkAssignment.STATUS_CHOICES]
+    per_isdas, remainder = divmod(links, max(isdases, 1))
+
+    batch = []
+    for n, name in enumerate(names):
+        for i in range(per_isdas + (1 if n < remainder else 0)):
+            peer = names[(n + 1 + i) % len(names)]
+            batch.append(SCIONLinkAssignment(
+                isd_as_id=isdas_ids[name],
+                core_id=appliance_ids[(isdas_ids[name], f'br{i % APPLIANCES_PER_ISDAS}.{name}')],
+                interface_id=i + 1,
+                relationship=relationships[i % len(relationships)],
+                status=statuses[i % len(statuses)],
+                peer_name=f'peer-{n}-{i}',
+                peer=f'{peer}#{i + 1}',
+                peer_isd_as_id=isdas_ids[peer],
+                peer_interface_id=i + 1,
+                local_underlay=f'10.{n // 256 % 256}.{n % 256}.1:{30000 + i % 30000}',
+                local_underlay_ip=f'10.{n // 256 % 256}.{n % 256}.1',
+                local_underlay_port=30000 + i % 30000,
+                peer_underlay=f'10.{n // 256 % 256}.{n % 256}.2:{30000 + i % 30000}',
+                peer_underlay_ip=f'10.{n // 256 % 256}.{n % 256}.2',
+                peer_underlay_port=30000 + i % 30000,
+            ))
+            if len(batch) >= batch_size:
+                SCIONLinkAssignment.objects.bulk_create(batch)
+                batch = []
+    if batch:
+        SCIONLinkAssignment.objects.bulk_create(batch)
+    # bulk_create() sends no signals
+    refresh_summaries()
+
+
+def _iter_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _iter_patterns(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern
+
+
+def _pattern_kwargs(pattern):
+    route = pattern.pattern
+    if hasattr(route, 'converters'):
+        return set(route.converters)
+    return set(route.regex.groupindex)
+
+
+def _model_for(name):
+    for prefix, model in URL_MODELS.items():
+        if name == prefix or name.startswith(f'{prefix}_') or name.startswith(f'{prefix}-'):
+            return model
+    return None
+
+
+def iter_targets():
+    """Yield (label, url) for every benchmarked plugin URL."""
+    samples = {model: model.objects.order_by('pk').first() for model in set(URL_MODELS.values())}
+    isdas = samples[ISDAS]
+
+    for namespace, patterns in ((UI_NAMESPACE, ui_urls.urlpatterns), (API_NAMESPACE, api_urls.urlpatterns)):
+        seen = set()
+        for pattern in _iter_patterns(patterns):
+            name = pattern.name
+            if name in seen or name in SKIPPED_URLS:
+                continue
+            params = _pattern_kwargs(pattern)
+            if 'format' in params:
+                continue
+            seen.add(name)
+
+            kwargs = {}
+            if 'pk' in params:
+                obj = samples.get(_model_for(name))
+                if obj is None:
+                    continue
+                kwargs['pk'] = obj.pk
+            if 'appliance_name' in params:
+                appliance = isdas.appliances.first() if isdas else None
+                if appliance is None:
+                    continue
+                kwargs['appliance_name'] = appliance.name
+
+            url = reverse(f'{namespace}:{name}', kwargs=kwargs)
+            if name in URL_QUERY_PARAMS and isdas:
+                url = f"{url}?{URL_QUERY_PARAMS[name].format(isdas=isdas.pk)}"
+            yield f'{namespace}:{name}', url
+
+    for namespace, name, query in EXTRA_TARGETS:
+        yield f'{namespace}:{name}?{query}', f"{reverse(f'{namespace}:{name}')}?{query}"
+
+
+def _get(client, url):
+    response = client.get(url)
+    if response.streaming:
+        # Streamed rows are only fetched while the body is consumed
+        b''.join(response.streaming_content)
+    return response
+
+
+def measure(client, url, repeat=3):
+    """
+    Request `url` once to warm caches, then `repeat` more times. Returns the
+    query count, median wall time (ms) and peak traced memory (KiB).
+    """
+    _get(client, url)
+    timings = []
+    peak = 0
+    queries = 0
+    status = None
+    for _ in range(max(repeat, 1)):
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            response = _get(client, url)
+            timings.append((time.perf_counter() - start) * 1000)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        queries = max(queries, len(ctx.captured_queries))
+        status = response.status_code
+    return {
+        'status': status,
+        'queries': queries,
+        'time_ms': round(statistics.median(timings), 2),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmark(user, repeat=3):
+    """Measure every target as `user`. Returns {label: {url, status, queries, time_ms, peak_kb}}."""
+    client = Client()
+    client.force_login(user)
+    results = {}
+    for label, url in iter_targets():
+        results[label] = {'url': url, **measure(client, url, repeat=repeat)}
+    return results
+
+
+def compare(results, baseline, time_tolerance=0.5, memory_tolerance=0.5):
+    """
+    Compare `results` against `baseline` (same shape). Query counts must not
+    increase; time and memory may exceed the baseline by the given fraction.
+    Returns a list of human-readable regression messages.
+    """
+    regressions = []
+    for label, result in results.items():
+        expected = baseline.get(label)
+        if not expected:
+            continue
+        if result['status'] != expected.get('status', result['status']):
+            regressions.append(f"{label}: status {expected['status']} -> {result['status']}")
+        if result['queries'] > expected['queries']:
+            regressions.append(f"{label}: queries {expected['queries']} -> {result['queries']}")
+        if result['time_ms'] > expected['time_ms'] * (1 + time_tolerance):
+            regressions.append(f"{label}: time {expected['time_ms']}ms -> {result['time_ms']}ms")
+        if result['peak_kb'] > expected['peak_kb'] * (1 + memory_tolerance):
+            regressions.append(f"{label}: peak memory {expected['peak_kb']}KiB -> {result['peak_kb']}KiB")
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as fh:
+        return json.load(fh).get('results', {})
+
+
+def write_baseline(path, results, scale):
+    with open(path, 'w') as fh:
+        json.dump({'scale': scale, 'results': results}, fh, indent=2, sort_keys=True)
+        fh.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=(
+        "Seed a synthetic SCION inventory and record queries, wall time and peak memory "
+        "for every plugin view and API endpoint, optionally comparing against a stored baseline."
+    ))
+    parser.add_argument('--organizations', type=int, default=10, help="Organizations to seed")
+    parser.add_argument('--isdases', type=int, default=100, help="ISD-ASes to seed")
+    parser.add_argument('--links', type=int, default=1000, help="Link assignments to seed")
+    parser.add_argument('--repeat', type=int, default=3, help="Measured requests per URL")
+    parser.add_argument('--baseline', help="Baseline JSON file to compare against (or write)")
+    parser.add_argument(
+        '--write-baseline', action='store_true',
+        help="Store the results as the new baseline instead of comparing"
+    )
+    parser.add_argument(
+        '--time-tolerance', type=float, default=0.5,
+        help="Allowed fractional wall time increase over the baseline (default: 0.5)"
+    )
+    parser.add_argument(
+        '--memory-tolerance', type=float, default=0.5,
+        help="Allowed fractional peak memory increase over the baseline (default: 0.5)"
+    )
+    parser.add_argument(
+        '--keep-data', action='store_true',
+        help="Commit the seeded inventory instead of rolling it back"
+    )
+    options = parser.parse_args(argv)
+    if options.write_baseline and not options.baseline:
+        parser.error("--write-baseline requires --baseline")
+
+    scale = {
+        'organizations': options.organizations,
+        'isdases': options.isdases,
+        'links': options.links,
+    }
+
+    with transaction.atomic():
+        print(
+            f"Seeding {scale['organizations']} organizations, {scale['isdases']} ISD-ASes "
+            f"and {scale['links']} link assignments..."
+        )
+        seed_inventory(**scale)
+        user = get_user_model().objects.create_user(
+            username='scion-benchmark', is_staff=True, is_superuser=True
+        )
+        results = run_benchmark(user, repeat=options.repeat)
+        if options.keep_data:
+            user.delete()
+        else:
+            transaction.set_rollback(True)
+
+    for label, result in results.items():
+        print(
+            f"{label:<60} {result['status']:>4} {result['queries']:>5}q "
+            f"{result['time_ms']:>10.2f}ms {result['peak_kb']:>10.1f}KiB"
+        )
+
+    if not options.baseline:
+        return 0
+    if options.write_baseline:
+        write_baseline(options.baseline, results, scale)
+        print(f"Baseline written to {options.baseline}")
+        return 0
+
+    regressions = compare(
+        results,
+        load_baseline(options.baseline),
+        time_tolerance=options.time_tolerance,
+        memory_tolerance=options.memory_tolerance,
+    )
+    if regressions:
+        print("Performance regressions detected:\n" + "\n".join(regressions), file=sys.stderr)
+        return 1
+    print("No regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())